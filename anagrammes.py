@@ -0,0 +1,140 @@
+from array import array
+from tp4.lexique import GrapheMots, ORD_A
+
+
+class IndexAnagrammes:
+    """
+    Index d'anagrammes d'un lexique, permettant de trouver rapidement les mots formables avec les jetons d'un chevalet.
+
+    Chaque mot est indexé par sa signature, soit ses lettres triées (ex: AIMNOS pour MAISON). Les signatures sont
+    stockées dans un GrapheMots: une recherche ne parcourt donc que les signatures réellement compatibles avec les
+    lettres disponibles, sans jamais balayer tout le lexique. Le rang alphabétique d'une signature, calculé pendant le
+    parcours, donne directement l'emplacement de ses mots.
+
+    Un index a pour attributs:
+    - graphe: GrapheMots, le graphe des signatures.
+    - nombres: memoryview d'int, le nombre de signatures atteignables à partir de chaque noeud du graphe.
+    - mots: str, les mots groupés par signature (en ordre de signature), séparés par des espaces.
+    - positions: int array, la position dans mots du premier mot de chaque signature.
+    """
+
+    def __init__(self, mots):
+        """
+        Construit l'index à partir des mots d'un lexique.
+        :param mots: str iterable, les mots (en majuscules) à indexer.
+        """
+        groupes = {}
+        for mot in mots:
+            groupes.setdefault(IndexAnagrammes.signature(mot), []).append(mot)
+        signatures = sorted(groupes)
+
+        self.graphe = GrapheMots(signatures)
+        self.nombres = self.graphe.nombres_sequences()
+        self.positions = array('I', [0])
+        morceaux = []
+        for signature in signatures:
+            morceaux.append(' '.join(groupes[signature]))
+            self.positions.append(self.positions[-1] + len(morceaux[-1]) + 1)
+        self.mots = ' '.join(morceaux)
+
+    @staticmethod
+    def signature(lettres):
+        """
+        :param lettres: str, un mot ou un ensemble de lettres.
+        :return: str, les lettres triées en ordre alphabétique.
+        """
+        return ''.join(sorted(lettres))
+
+    @staticmethod
+    def vecteur(lettres):
+        """
+        :param lettres: str, un mot ou un ensemble de lettres (de A à Z).
+        :return: int list, le nombre d'occurrences de chaque lettre de A à Z.
+        """
+        compte = [0] * 26
+        for lettre in lettres:
+            compte[ord(lettre) - ORD_A] += 1
+        return compte
+
+    def __mots_de_rang(self, rang):
+        return self.mots[self.positions[rang]:self.positions[rang + 1] - 1].split(' ')
+
+    def anagrammes(self, lettres):
+        """
+        :param lettres: str, les lettres à utiliser.
+        :return: str list, les mots utilisant exactement toutes ces lettres.
+        """
+        graphe, rang, noeud = self.graphe, 0, self.graphe.racine
+        for lettre in IndexAnagrammes.signature(lettres):
+            rang += graphe.terminaux[noeud]
+            i = graphe.debuts[noeud]
+            fin = graphe.debuts[noeud + 1]
+            while i < fin and graphe.lettres[i] != ord(lettre):
+                rang += self.nombres[graphe.cibles[i]]
+                i += 1
+            if i == fin:
+                return []
+            noeud = graphe.cibles[i]
+        return self.__mots_de_rang(rang) if graphe.terminaux[noeud] else []
+
+    def taille_memoire(self):
+        """
+        :return: int, nombre d'octets occupés par l'index.
+        """
+        return self.graphe.taille_memoire() + self.nombres.nbytes + len(self.mots) + memoryview(self.positions).nbytes
+
+    def formables(self, lettres, nb_lettres_plateau=0, lettres_plateau=None, utiliser_tout=False, longueur_min=2):
+        """
+        Permet de trouver tous les mots formables avec une partie des lettres d'un chevalet, complétées d'au plus
+            nb_lettres_plateau lettres déjà posées sur le plateau.
+        :param lettres: str, les lettres du chevalet.
+        :param nb_lettres_plateau: (int, optionnel) nombre maximal de lettres du plateau pouvant compléter le mot.
+        :param lettres_plateau: (str, optionnel) les lettres du plateau utilisables. Par défaut, n'importe quelle lettre.
+        :param utiliser_tout: (bool, optionnel) si True, seuls les mots utilisant toutes les lettres du chevalet sont
+                retournés.
+        :param longueur_min: (int, optionnel) longueur minimale des mots retournés.
+        :return: list de tuples (str, str), chaque mot trouvé et les lettres du plateau qu'il requiert.
+        """
+        chevalet = IndexAnagrammes.vecteur(lettres)
+        if lettres_plateau is None:
+            plateau = [nb_lettres_plateau] * 26
+        else:
+            plateau = IndexAnagrammes.vecteur(lettres_plateau)
+        nb_chevalet = len(lettres) if utiliser_tout else 0
+        debuts, codes, cibles = self.graphe.debuts, self.graphe.lettres, self.graphe.cibles
+        terminaux, nombres = self.graphe.terminaux, self.nombres
+
+        resultats = []
+
+        def parcourir(noeud, rang, longueur, nb_utilises, restant_plateau, requises):
+            if terminaux[noeud]:
+                if longueur >= longueur_min and nb_utilises >= nb_chevalet:
+                    resultats.extend((mot, requises) for mot in self.__mots_de_rang(rang))
+                rang += 1
+
+            for i in range(debuts[noeud], debuts[noeud + 1]):
+                # Une lettre du chevalet est toujours préférable à une lettre du plateau identique
+                index = codes[i] - ORD_A
+                if chevalet[index] > 0:
+                    chevalet[index] -= 1
+                    parcourir(cibles[i], rang, longueur + 1, nb_utilises + 1, restant_plateau, requises)
+                    chevalet[index] += 1
+                elif restant_plateau > 0 and plateau[index] > 0:
+                    plateau[index] -= 1
+                    parcourir(cibles[i], rang, longueur + 1, nb_utilises, restant_plateau - 1,
+                              requises + chr(codes[i]))
+                    plateau[index] += 1
+                rang += nombres[cibles[i]]
+
+        parcourir(self.graphe.racine, 0, 0, 0, nb_lettres_plateau, '')
+        return resultats
+
+    def bingos(self, lettres, nb_lettres_plateau=0, lettres_plateau=None):
+        """
+        Permet de trouver les mots utilisant toutes les lettres d'un chevalet (un « bingo » avec 7 jetons).
+        :param lettres: str, les lettres du chevalet.
+        :param nb_lettres_plateau: (int, optionnel) nombre maximal de lettres du plateau pouvant compléter le mot.
+        :param lettres_plateau: (str, optionnel) les lettres du plateau utilisables. Par défaut, n'importe quelle lettre.
+        :return: list de tuples (str, str), chaque mot trouvé et les lettres du plateau qu'il requiert.
+        """
+        return self.formables(lettres, nb_lettres_plateau, lettres_plateau, utiliser_tout=True)
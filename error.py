@@ -45,6 +45,12 @@ class NomVideError(ScrabbleError):
         super().__init__("Le nom du joueur ne doit pas être non vide.")
 
 
+class DictionnaireNonChargeError(ScrabbleError):
+
+    def __init__(self, message="Le dictionnaire est encore en cours de chargement, réessayez dans un instant."):
+        super().__init__(message)
+
+
 class ScrabbleSystemError(Exception):
 
     def __init__(self, message):
@@ -0,0 +1,525 @@
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from threading import Lock
+from time import perf_counter
+from weakref import WeakKeyDictionary
+from tp4.lexique import RegistreLexiques, ORD_A
+from tp4.plateau import Plateau
+
+TOUTES_LETTRES = (1 << 26) - 1
+
+
+class Coup:
+    """
+    Cette classe représente un coup légal: des jetons du chevalet placés sur le plateau en formant uniquement des mots
+    du lexique.
+
+    Les attributs d'un coup sont:
+    - positions_chevalet: int list, les index des jetons joués sur le chevalet.
+    - positions_plateau: str list, les codes des cases où ces jetons sont placés (même ordre que positions_chevalet).
+    - lettres: str, les lettres des jetons joués (même ordre que positions_chevalet).
+    - mots: str list, les mots formés, comme retournés par Plateau.mots_score_obtenus.
+    - score: int, le score obtenu, comme calculé par Plateau.mots_score_obtenus.
+    """
+
+    def __init__(self, positions_chevalet, positions_plateau, lettres, mots, score):
+        self.positions_chevalet = positions_chevalet
+        self.positions_plateau = positions_plateau
+        self.lettres = lettres
+        self.mots = mots
+        self.score = score
+
+    @property
+    def index_plateau(self):
+        """
+        :return: int list, les index des cases où les jetons sont placés (voir Plateau.index_position).
+        """
+        return [Plateau.index_position(position) for position in self.positions_plateau]
+
+    @property
+    def moves(self):
+        """
+        :return: dict, le coup au format de Joueur.moves (position du chevalet -> code de la case du plateau).
+        """
+        return dict(zip(self.positions_chevalet, self.positions_plateau))
+
+    def __str__(self):
+        return "{} ({} points): {}".format(", ".join(self.mots), self.score,
+                                           " ".join("{}{}".format(l, p) for l, p in zip(self.lettres,
+                                                                                      self.positions_plateau)))
+
+
+class CacheCoups:
+    """
+    Cache des coups générés, indexé par l'empreinte de Zobrist du plateau (voir Plateau.empreinte) et les lettres du
+    chevalet triées: une position déjà rencontrée (suggestion redemandée, réflexion reprise après l'annulation d'un
+    coup, simulation repassant par le même plateau) ne coûte qu'une consultation.
+
+    Les coups d'une entrée désignent les jetons du chevalet qui les a produits. Lors d'une consultation par un
+    chevalet portant les mêmes lettres dans un autre ordre, leurs positions sur le chevalet sont converties: la k-ième
+    lettre dans l'ordre trié d'un chevalet correspond à la k-ième de l'autre.
+
+    Le cache est borné par le nombre total de coups conservés; les entrées les moins récemment utilisées sont
+    évincées les premières. Il peut être partagé entre fils d'exécution.
+
+    Un cache a pour attributs:
+    - taille_max: int, le nombre maximal de coups conservés.
+    - nb_succes: int, le nombre de consultations ayant trouvé leurs coups.
+    - nb_echecs: int, le nombre de consultations infructueuses.
+    """
+    TAILLE_MAX = 50000
+
+    __caches = WeakKeyDictionary()
+    __verrou_caches = Lock()
+
+    def __init__(self, taille_max=TAILLE_MAX):
+        """
+        :param taille_max: (int, optionnel) le nombre maximal de coups conservés.
+        """
+        self.taille_max = taille_max
+        self.nb_succes = 0
+        self.nb_echecs = 0
+        self.__entrees = OrderedDict()
+        self.__nb_coups = 0
+        self.__verrou = Lock()
+
+    @staticmethod
+    def partage(lexique):
+        """
+        Permet d'obtenir le cache partagé par tous les générateurs d'un même lexique dans le processus.
+        :param lexique: Lexique, le lexique des coups mis en cache.
+        :return: CacheCoups, le cache associé au lexique.
+        """
+        with CacheCoups.__verrou_caches:
+            cache = CacheCoups.__caches.get(lexique)
+            if cache is None:
+                cache = CacheCoups()
+                CacheCoups.__caches[lexique] = cache
+            return cache
+
+    @staticmethod
+    def __ordre(joueur):
+        # Positions des jetons du chevalet, triées par lettre
+        jetons = joueur.jetons
+        return sorted((i for i, jeton in enumerate(jetons) if jeton is not None), key=lambda i: (jetons[i].lettre, i))
+
+    @staticmethod
+    def __cle(plateau, joueur):
+        return plateau.empreinte, ''.join(sorted(jeton.lettre for jeton in joueur.jetons if jeton is not None))
+
+    def __len__(self):
+        return len(self.__entrees)
+
+    def obtenir(self, plateau, joueur):
+        """
+        :param plateau: Plateau, le plateau de la partie.
+        :param joueur: Joueur, le joueur dont le chevalet est utilisé.
+        :return: Coup list, les coups légaux déjà générés pour ce plateau et ces lettres, adaptés au chevalet du
+                joueur; None s'ils ne sont pas dans le cache.
+        """
+        cle = CacheCoups.__cle(plateau, joueur)
+        with self.__verrou:
+            entree = self.__entrees.get(cle)
+            if entree is None:
+                self.nb_echecs += 1
+                return None
+            self.__entrees.move_to_end(cle)
+            self.nb_succes += 1
+
+        ordre, coups = entree
+        nouvel_ordre = CacheCoups.__ordre(joueur)
+        if nouvel_ordre == ordre:
+            return list(coups)
+        conversion = dict(zip(ordre, nouvel_ordre))
+        return [Coup([conversion[i] for i in coup.positions_chevalet], coup.positions_plateau, coup.lettres, coup.mots,
+                     coup.score) for coup in coups]
+
+    def ajouter(self, plateau, joueur, coups):
+        """
+        Conserve les coups générés pour un plateau et un chevalet, en évinçant au besoin les entrées les plus anciennes.
+        :param plateau: Plateau, le plateau de la partie.
+        :param joueur: Joueur, le joueur dont le chevalet a été utilisé.
+        :param coups: Coup list, tous les coups légaux du joueur (ne doivent plus être modifiés).
+        :return: rien
+        """
+        if len(coups) > self.taille_max:
+            return
+        cle = CacheCoups.__cle(plateau, joueur)
+        entree = (CacheCoups.__ordre(joueur), list(coups))
+        with self.__verrou:
+            ancienne = self.__entrees.pop(cle, None)
+            if ancienne is not None:
+                self.__nb_coups -= len(ancienne[1])
+            self.__entrees[cle] = entree
+            self.__nb_coups += len(coups)
+            while self.__nb_coups > self.taille_max:
+                _, (_, evinces) = self.__entrees.popitem(last=False)
+                self.__nb_coups -= len(evinces)
+
+    def vider(self):
+        """
+        Oublie tous les coups conservés.
+        :return: rien
+        """
+        with self.__verrou:
+            self.__entrees.clear()
+            self.__nb_coups = 0
+
+
+class GenerateurCoups:
+    """
+    Générateur de tous les coups légaux d'un chevalet sur un plateau (algorithme d'Appel et Jacobson).
+
+    Pour chaque direction, le générateur:
+    - obtient du plateau les ancres, soit les cases vides adjacentes à un jeton (ou le centre d'un plateau vide). Tout
+        coup légal couvre au moins une ancre;
+    - obtient du plateau, pour chaque case vide, l'ensemble des lettres qui y forment un mot perpendiculaire valide
+        (vérifications croisées) et le score de ce mot perpendiculaire hors de la lettre posée;
+    - construit à partir de chaque ancre une partie gauche puis l'étend vers la droite en suivant le graphe du lexique,
+        de sorte que seuls les préfixes de mots existants soient explorés.
+
+    Un générateur a pour attributs:
+    - lexique: Lexique, le lexique dont le graphe est parcouru.
+    - cache: CacheCoups, le cache consulté avant chaque génération (None si les coups ne sont pas conservés).
+    - depuis_cache: bool, True si les coups de la dernière génération ont été lus dans le cache.
+    """
+
+    def __init__(self, lexique, cache=None):
+        self.lexique = lexique
+        self.cache = cache
+        self.depuis_cache = False
+
+    def generer(self, plateau, joueur):
+        """
+        Permet d'énumérer tous les coups légaux d'un joueur, tels qu'acceptés par Scrabble.jouer_un_tour.
+        :param plateau: Plateau, le plateau de la partie. Ses jetons ne sont pas modifiés, mais ses vérifications
+                croisées sont mises à jour (voir Plateau.verifications_croisees): depuis un autre fil d'exécution que
+                celui de la partie, passer une copie (voir Plateau.copier).
+        :param joueur: Joueur, le joueur dont le chevalet est utilisé (n'est pas modifié).
+        :return: Coup list, tous les coups légaux (dans aucun ordre particulier).
+        """
+        self.depuis_cache = False
+        if self.cache is not None:
+            coups = self.cache.obtenir(plateau, joueur)
+            if coups is not None:
+                self.depuis_cache = True
+                return coups
+
+        preparation = self.preparer(plateau, joueur)
+        coups = []
+        for horizontal in (True, False):
+            coups += self.generer_rangees(preparation, horizontal, range(Plateau.DIMENSION))
+
+        if self.cache is not None:
+            self.cache.ajouter(plateau, joueur, coups)
+        return coups
+
+    def preparer(self, plateau, joueur):
+        """
+        Permet d'extraire du plateau et du chevalet tout ce dont la génération a besoin, sous une forme indépendante
+            du plateau (elle peut être transmise à un autre processus).
+        :param plateau: Plateau, le plateau de la partie. Ses jetons ne sont pas modifiés, mais ses vérifications
+                croisées sont mises à jour (voir Plateau.verifications_croisees): depuis un autre fil d'exécution que
+                celui de la partie, passer une copie (voir Plateau.copier).
+        :param joueur: Joueur, le joueur dont le chevalet est utilisé (n'est pas modifié).
+        :return: tuple (dict, dict), les grilles de chaque orientation (True pour les lignes, False pour les colonnes)
+                et le chevalet (lettre -> liste de (index, valeur)).
+        """
+        chevalet = {}
+        for index, jeton in enumerate(joueur.jetons):
+            if jeton is not None:
+                chevalet.setdefault(jeton.lettre, []).append((index, jeton.valeur))
+
+        # Les deux orientations sont lues de la même façon, dans les rangées du plateau ou de sa vue transposée, puis
+        # copiées dans des listes: la préparation doit pouvoir être transmise à un autre processus, ce que ne permettent
+        # pas les memoryview de la vue. Les vérifications croisées du plateau sont réordonnées selon les rangées.
+        ancres = plateau.ancres()
+        grilles = {}
+        for horizontal in (True, False):
+            vue = plateau.rangees(horizontal)
+            verifications = plateau.verifications_croisees(self.lexique, horizontal)
+            grilles[horizontal] = ([[chr(code) if code else None for code in rangee] for rangee in vue.lettres],
+                                   [list(rangee) for rangee in vue.valeurs],
+                                   [list(rangee) for rangee in vue.bonus_lettre],
+                                   [list(rangee) for rangee in vue.bonus_mot],
+                                   {vue.coordonnees[index] for index in ancres},
+                                   [verifications[index] for rangee in vue.index for index in rangee])
+        return grilles, chevalet
+
+    def generer_rangees(self, preparation, horizontal, rangees):
+        """
+        Permet de générer les coups dont le mot principal est sur certaines lignes (ou colonnes) du plateau.
+        :param preparation: tuple, le résultat de GenerateurCoups.preparer.
+        :param horizontal: bool, True pour les lignes, False pour les colonnes.
+        :param rangees: int iterable, les index des lignes (ou colonnes) à traiter.
+        :return: Coup list, les coups trouvés (dans aucun ordre particulier).
+        """
+        grilles, chevalet = preparation
+        coups = []
+        self.__passe(*grilles[horizontal], chevalet, horizontal, rangees, coups)
+        return coups
+
+    def __passe(self, lignes, valeurs, bonus_lettre, bonus_mot, ancres, verifications, chevalet, horizontal, rangees,
+                coups):
+        """
+        Génère les coups dont le mot principal est sur une des rangées données de la grille. Pour la passe verticale,
+            les grilles sont copiées de la vue transposée du plateau (voir Plateau.rangees): ses colonnes y sont des
+            lignes.
+        """
+        n = len(lignes)
+        graphe = self.lexique.graphe
+        debuts, codes, cibles, terminaux = graphe.debuts, graphe.lettres, graphe.cibles, graphe.terminaux
+
+        positions = [[Plateau.code_position(index) for index in rangee]
+                     for rangee in Plateau.index_rangees(horizontal)]
+
+        for r in rangees:
+            ligne, valeurs_ligne = lignes[r], valeurs[r]
+            bl, bm, positions_ligne = bonus_lettre[r], bonus_mot[r], positions[r]
+            masques = [TOUTES_LETTRES] * n
+            croisements = [None] * n
+            for c in range(n):
+                verification = verifications[r * n + c]
+                if verification is not None:
+                    masques[c] = verification[0]
+                    croisements[c] = verification[1:]
+
+            gauche = []
+            places = []
+
+            def enregistrer(mot, fin, ancre):
+                tuiles = [(ancre - len(gauche) + k, lettre, index, valeur)
+                          for k, (lettre, index, valeur) in enumerate(gauche)] + places
+
+                # Un jeton seul formant aussi un mot sur la ligne perpendiculaire est produit par la passe horizontale
+                if not horizontal and len(tuiles) == 1 and croisements[tuiles[0][0]] is not None:
+                    return
+
+                debut = fin - len(mot)
+                score, multiplicateur = 0, 1
+                for c in range(debut, fin):
+                    score += valeurs_ligne[c]
+                mots_croises, score_croise = [], 0
+                for c, lettre, index, valeur in tuiles:
+                    score += valeur * bl[c]
+                    multiplicateur *= bm[c]
+                    croisement = croisements[c]
+                    if croisement is not None:
+                        somme, avant, apres = croisement
+                        mots_croises.append(avant + lettre + apres)
+                        score_croise += (somme + valeur * bl[c]) * bm[c]
+
+                mots = [mot] + mots_croises if horizontal else mots_croises + [mot]
+                coups.append(Coup([t[2] for t in tuiles], [positions_ligne[t[0]] for t in tuiles],
+                                  ''.join(t[1] for t in tuiles), mots, score * multiplicateur + score_croise))
+
+            def etendre(mot, noeud, c, ancre):
+                if c < n and ligne[c] is not None:
+                    i = codes.find(ord(ligne[c]), debuts[noeud], debuts[noeud + 1])
+                    if i >= 0:
+                        etendre(mot + ligne[c], cibles[i], c + 1, ancre)
+                    return
+
+                if c > ancre and terminaux[noeud]:
+                    enregistrer(mot, c, ancre)
+                if c == n:
+                    return
+
+                masque = masques[c]
+                for i in range(debuts[noeud], debuts[noeud + 1]):
+                    code = codes[i]
+                    if not masque >> (code - ORD_A) & 1:
+                        continue
+                    lettre = chr(code)
+                    pile = chevalet.get(lettre)
+                    if not pile:
+                        continue
+                    index, valeur = pile.pop()
+                    places.append((c, lettre, index, valeur))
+                    etendre(mot + lettre, cibles[i], c + 1, ancre)
+                    places.pop()
+                    pile.append((index, valeur))
+
+            def partie_gauche(mot, noeud, limite, ancre):
+                etendre(mot, noeud, ancre, ancre)
+                if limite == 0:
+                    return
+                for i in range(debuts[noeud], debuts[noeud + 1]):
+                    lettre = chr(codes[i])
+                    pile = chevalet.get(lettre)
+                    if not pile:
+                        continue
+                    index, valeur = pile.pop()
+                    gauche.append((lettre, index, valeur))
+                    partie_gauche(mot + lettre, cibles[i], limite - 1, ancre)
+                    gauche.pop()
+                    pile.append((index, valeur))
+
+            for ancre in range(n):
+                if (r, ancre) not in ancres:
+                    continue
+
+                if ancre > 0 and ligne[ancre - 1] is not None:
+                    # La partie gauche est formée des jetons déjà sur le plateau
+                    debut = ancre
+                    while debut > 0 and ligne[debut - 1] is not None:
+                        debut -= 1
+                    prefixe = ''.join(ligne[debut:ancre])
+                    noeud = graphe.suivre(prefixe)
+                    if noeud is not None:
+                        etendre(prefixe, noeud, ancre, ancre)
+                else:
+                    # La partie gauche est formée de jetons du chevalet, sur des cases vides qui ne sont pas des ancres
+                    limite = 0
+                    while ancre - limite > 0 and ligne[ancre - limite - 1] is None \
+                            and (r, ancre - limite - 1) not in ancres:
+                        limite += 1
+                    partie_gauche('', graphe.racine, limite, ancre)
+
+
+# Générateur propre à chaque processus de travail (voir GenerateurParallele)
+_generateur_processus = None
+
+
+def _initialiser_processus(langue):
+    global _generateur_processus
+    _generateur_processus = GenerateurCoups(RegistreLexiques.obtenir(langue))
+
+
+def _generer_rangees_processus(preparation, horizontal, rangees):
+    coups = _generateur_processus.generer_rangees(preparation, horizontal, rangees)
+    coups.sort(key=lambda coup: coup.score, reverse=True)
+    return coups
+
+
+class GenerateurParallele:
+    """
+    Générateur de coups qui répartit les lignes et les colonnes du plateau entre plusieurs processus.
+
+    Chaque processus obtient son lexique du RegistreLexiques une seule fois, à son démarrage: le lexique compilé est
+    projeté en mémoire (mmap) et ses pages sont donc partagées entre les processus. Pour chaque génération, seules les
+    grilles préparées par GenerateurCoups.preparer (quelques kilo-octets) sont transmises. Les rangées sont réparties en
+    alternance (0, k, 2k, ...) afin que les rangées centrales, souvent les plus chargées, ne tombent pas toutes dans le
+    même groupe. Chaque processus retourne ses coups triés par score, puis les listes sont fusionnées.
+
+    Avec un seul processus, aucun processus de travail n'est démarré: les coups sont générés dans le fil appelant. Les
+    processus sont démarrés à la première génération et arrêtés par fermer (ou à la sortie d'un bloc with).
+
+    Un générateur parallèle a pour attributs:
+    - langue: str, la langue du lexique utilisé.
+    - nb_processus: int, le nombre de processus de travail.
+    - generateur: GenerateurCoups, le générateur local utilisé pour préparer les grilles (et pour générer les coups
+        s'il n'y a qu'un processus).
+    - depuis_cache: bool, True si les coups de la dernière génération ont été lus dans le cache.
+    """
+    TACHES_PAR_PROCESSUS = 2
+
+    def __init__(self, langue, nb_processus=None, cache=None):
+        """
+        :param langue: str, FR ou EN.
+        :param nb_processus: (int, optionnel) le nombre de processus, par défaut le nombre de coeurs de la machine.
+        :param cache: (CacheCoups, optionnel) le cache consulté avant chaque génération (voir GenerateurCoups).
+        """
+        self.langue = langue
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.generateur = GenerateurCoups(RegistreLexiques.obtenir(langue), cache)
+        self.depuis_cache = False
+        self.__executeur = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+    def __demarrer(self):
+        if self.__executeur is None:
+            self.__executeur = ProcessPoolExecutor(self.nb_processus, initializer=_initialiser_processus,
+                                                   initargs=(self.langue,))
+        return self.__executeur
+
+    def generer(self, plateau, joueur):
+        """
+        Permet d'énumérer tous les coups légaux d'un joueur, comme GenerateurCoups.generer.
+        :param plateau: Plateau, le plateau de la partie. Ses jetons ne sont pas modifiés, mais ses vérifications
+                croisées sont mises à jour (voir Plateau.verifications_croisees): depuis un autre fil d'exécution que
+                celui de la partie, passer une copie (voir Plateau.copier).
+        :param joueur: Joueur, le joueur dont le chevalet est utilisé (n'est pas modifié).
+        :return: Coup list, tous les coups légaux, en ordre décroissant de score.
+        """
+        if self.nb_processus == 1:
+            coups = self.generateur.generer(plateau, joueur)
+            self.depuis_cache = self.generateur.depuis_cache
+            return sorted(coups, key=lambda coup: coup.score, reverse=True)
+
+        cache = self.generateur.cache
+        coups = None if cache is None else cache.obtenir(plateau, joueur)
+        self.depuis_cache = coups is not None
+        if coups is not None:
+            return sorted(coups, key=lambda coup: coup.score, reverse=True)
+
+        preparation = self.generateur.preparer(plateau, joueur)
+        n = Plateau.DIMENSION
+        nb_groupes = max(1, min(n, self.nb_processus * GenerateurParallele.TACHES_PAR_PROCESSUS // 2))
+
+        executeur = self.__demarrer()
+        resultats = [executeur.submit(_generer_rangees_processus, preparation, horizontal, range(debut, n, nb_groupes))
+                     for horizontal in (True, False) for debut in range(nb_groupes)]
+        coups = list(merge(*(resultat.result() for resultat in resultats), key=lambda coup: coup.score, reverse=True))
+        if cache is not None:
+            cache.ajouter(plateau, joueur, coups)
+        return coups
+
+    def fermer(self):
+        """
+        Arrête les processus de travail.
+        :return: rien
+        """
+        if self.__executeur is not None:
+            self.__executeur.shutdown()
+            self.__executeur = None
+
+
+if __name__ == '__main__':
+    # Banc d'essai: python -m tp4.generateur [FR|EN] [nombre de positions]
+    import pickle
+    from tp4.scrabble import Scrabble
+
+    langue = sys.argv[1] if len(sys.argv) > 1 else 'FR'
+    nb_positions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    lexique = RegistreLexiques.obtenir(langue)
+    generateur = GenerateurCoups(lexique)
+
+    # Positions de milieu de partie obtenues en jouant le meilleur coup à chaque tour
+    positions = []
+    partie = Scrabble(None, interactif=False)
+    partie.initialiser_jeu(2, langue)
+    while len(positions) < nb_positions and not partie.partie_terminee():
+        joueur = partie.joueur_actif
+        coups = generateur.generer(partie.plateau, joueur)
+        positions.append(pickle.loads(pickle.dumps((partie.plateau, joueur))))
+        if coups:
+            joueur.moves = max(coups, key=lambda coup: coup.score).moves
+            partie.jouer_un_tour()
+        partie.joueur_suivant()
+
+    debut = perf_counter()
+    attendus = [len(generateur.generer(plateau, joueur)) for plateau, joueur in positions]
+    reference = perf_counter() - debut
+    print("{} positions, 1 processus (séquentiel): {:.1f} ms par position".format(
+        len(positions), reference / len(positions) * 1000))
+
+    nb_processus = 1
+    while nb_processus <= (os.cpu_count() or 1):
+        with GenerateurParallele(langue, nb_processus) as parallele:
+            parallele.generer(*positions[0])
+            debut = perf_counter()
+            obtenus = [len(parallele.generer(plateau, joueur)) for plateau, joueur in positions]
+            duree = perf_counter() - debut
+        assert obtenus == attendus
+        print("{} processus: {:.1f} ms par position, accélération x{:.2f}".format(
+            nb_processus, duree / len(positions) * 1000, reference / duree))
+        nb_processus *= 2
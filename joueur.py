@@ -102,7 +102,7 @@ class Joueur:
         :exception Lève une exception si la position est spécifiée mais n'est pas valide
                     ou si elle n'est pas vide pour y déposer un jeton.
         """
-        if pos:
+        if pos is not None:
             assert Joueur.position_est_valide(pos), "Position invalide."
             assert self.position_est_vide(pos), "Position déjà occupée."
             self.__chevalet[pos] = jeton
@@ -0,0 +1,448 @@
+from functools import partial
+from threading import Thread, Event, Lock
+from time import perf_counter
+from tp4.joueur import Joueur
+from tp4.generateur import GenerateurCoups, GenerateurParallele, CacheCoups
+from tp4.restes import TableRestes, TAILLE_MAX
+from tp4.simulation import Simulateur, EvaluationCoup
+from tp4.error import *
+
+
+def jetons_inconnus(partie, joueur):
+    """
+    :param partie: Scrabble, la partie en cours.
+    :param joueur: Joueur, un joueur de la partie.
+    :return: Jeton list, les jetons que le joueur ne voit pas, soit ceux du sac et des chevalets des autres joueurs.
+    """
+    inconnus = list(partie.jetons_libres)
+    for autre in partie.joueurs:
+        if autre is not joueur:
+            inconnus += [jeton for jeton in autre.jetons if jeton is not None]
+    return inconnus
+
+
+def copie_chevalet(joueur):
+    """
+    :param joueur: Joueur, un joueur.
+    :return: Joueur, un joueur ayant les mêmes jetons aux mêmes positions (le chevalet peut ensuite changer sans
+            affecter la copie).
+    """
+    copie = Joueur(joueur.nom)
+    for position, jeton in enumerate(joueur.jetons):
+        copie.jetons[position] = jeton
+    return copie
+
+
+class ContexteTour:
+    """
+    Informations mises à la disposition d'une stratégie pour choisir un coup.
+
+    Les attributs d'un contexte sont:
+    - joueur: Joueur, une copie du joueur qui réfléchit (son chevalet ne change pas pendant la réflexion).
+    - plateau: Plateau, le plateau sur lequel choisir, une copie du plateau de la partie si la réflexion a lieu dans
+        un autre fil d'exécution (la stratégie peut le modifier temporairement).
+    - lexique: Lexique, le lexique de la partie.
+    - generateur: GenerateurCoups (ou GenerateurParallele), le générateur de coups associé au lexique (et à son cache
+        partagé).
+    - inconnus: Jeton list, les jetons que le joueur ne voit pas (sac et chevalets adverses).
+    - echeance: float, l'instant (selon time.perf_counter) où un coup doit avoir été choisi.
+    - langue: str, la langue de la partie (None si inconnue).
+    - annulation: Event, signalé si la réflexion doit être abandonnée (None si elle ne peut pas l'être).
+    """
+
+    def __init__(self, joueur, plateau, lexique, inconnus, echeance, annulation=None, langue=None, generateur=None):
+        self.joueur = joueur
+        self.plateau = plateau
+        self.lexique = lexique
+        self.generateur = GenerateurCoups(lexique, CacheCoups.partage(lexique)) if generateur is None else generateur
+        self.inconnus = inconnus
+        self.echeance = echeance
+        self.annulation = annulation
+        self.langue = langue
+
+    def temps_restant(self):
+        """
+        :return: float, le nombre de secondes avant l'échéance (0 si la réflexion est annulée).
+        """
+        if self.est_annule():
+            return 0.0
+        return self.echeance - perf_counter()
+
+    def est_annule(self):
+        """
+        :return: bool, True si la réflexion a été annulée.
+        """
+        return self.annulation is not None and self.annulation.is_set()
+
+
+class Strategie:
+    """
+    Stratégie de choix d'un coup parmi les coups légaux. Par défaut, le coup qui rapporte le plus de points.
+    """
+
+    def choisir(self, coups, contexte):
+        """
+        :param coups: Coup list, les coups légaux du joueur (non vide).
+        :param contexte: ContexteTour, les informations du tour.
+        :return: Coup, le coup choisi.
+        """
+        return max(coups, key=lambda coup: coup.score)
+
+    def fermer(self):
+        """
+        Libère les ressources de la stratégie (ex: processus de travail). Elle reste utilisable.
+        :return: rien
+        """
+        pass
+
+
+class StrategieReste(Strategie):
+    """
+    Stratégie qui ajoute au score d'un coup la valeur des lettres qui restent sur le chevalet (le « reste »): garder un
+    S ou un E est avantageux, garder un Q ou deux U ne l'est pas. La valeur est lue dans la table des restes de la
+    langue (voir restes.TableRestes) si elle a été générée, et estimée lettre par lettre sinon.
+    """
+    VALEURS_LETTRES = {'A': 1.0, 'B': -1.5, 'C': 0.0, 'D': 0.0, 'E': 1.5, 'F': -1.5, 'G': -1.0, 'H': -0.5,
+                       'I': -0.5, 'J': -2.0, 'K': -2.0, 'L': 0.5, 'M': 0.0, 'N': 0.5, 'O': -0.5, 'P': -0.5,
+                       'Q': -6.0, 'R': 1.0, 'S': 3.0, 'T': 0.5, 'U': -3.0, 'V': -4.0, 'W': -4.0, 'X': 2.0,
+                       'Y': -1.0, 'Z': 2.0}
+    PENALITE_DOUBLON = 2.0
+    PENALITE_DESEQUILIBRE = 1.0
+    VOYELLES = 'AEIOUY'
+
+    @staticmethod
+    def reste(joueur, coup):
+        """
+        :return: str, les lettres qui restent sur le chevalet du joueur après le coup.
+        """
+        joues = set(coup.positions_chevalet)
+        return ''.join(jeton.lettre for i, jeton in enumerate(joueur.jetons) if jeton is not None and i not in joues)
+
+    def valeur_reste(self, lettres, langue=None):
+        """
+        :param lettres: str, les lettres restant sur le chevalet.
+        :param langue: (str, optionnel) la langue de la partie, pour consulter sa table des restes.
+        :return: float, la valeur estimée de ces lettres pour les prochains tours.
+        """
+        table = None if langue is None else TableRestes.obtenir(langue)
+        if table is not None and len(lettres) <= TAILLE_MAX:
+            return table.valeur(lettres)
+
+        valeur = sum(StrategieReste.VALEURS_LETTRES.get(lettre, 0.0) for lettre in lettres)
+        valeur -= StrategieReste.PENALITE_DOUBLON * (len(lettres) - len(set(lettres)))
+        voyelles = sum(1 for lettre in lettres if lettre in StrategieReste.VOYELLES)
+        valeur -= StrategieReste.PENALITE_DESEQUILIBRE * abs(2 * voyelles - len(lettres))
+        return valeur
+
+    def equite(self, coup, contexte):
+        """
+        :return: float, le score du coup plus la valeur de son reste.
+        """
+        return coup.score + self.valeur_reste(StrategieReste.reste(contexte.joueur, coup), contexte.langue)
+
+    def choisir(self, coups, contexte):
+        return max(coups, key=lambda coup: self.equite(coup, contexte))
+
+
+class StrategieSimulation(StrategieReste):
+    """
+    Stratégie qui retient les meilleurs candidats selon StrategieReste, puis les classe par simulation Monte-Carlo
+    (voir simulation.Simulateur): des chevalets adverses sont tirés au hasard parmi les lettres inconnues et la partie
+    est prolongée de nb_plis coups. Le coup choisi maximise l'équité moyenne; les candidats que le temps n'a pas permis
+    de simuler ne passent qu'après les autres, dans l'ordre de StrategieReste (voir EvaluationCoup.classer). La
+    simulation s'arrête à l'échéance du tour, donc au plus tard JoueurIA.MARGE secondes avant la fin du tour.
+
+    Avec nb_processus > 1, les processus de travail de chaque langue sont conservés d'un tour à l'autre, jusqu'à
+    l'appel de fermer (voir Scrabble.liberer_ressources).
+    """
+
+    def __init__(self, nb_candidats=10, nb_plis=2, nb_processus=1):
+        self.nb_candidats = nb_candidats
+        self.nb_plis = nb_plis
+        self.nb_processus = nb_processus
+        self.__simulateurs = {}
+
+    def __getstate__(self):
+        etat = self.__dict__.copy()
+        etat['_StrategieSimulation__simulateurs'] = {}
+        return etat
+
+    def choisir(self, coups, contexte):
+        candidats = sorted(coups, key=lambda coup: self.equite(coup, contexte), reverse=True)[:self.nb_candidats]
+        if contexte.langue is None:
+            return candidats[0]
+
+        simulateur = self.__simulateurs.get(contexte.langue)
+        if simulateur is None:
+            simulateur = Simulateur(contexte.langue, self.nb_candidats, self.nb_plis, self.nb_processus)
+            self.__simulateurs[contexte.langue] = simulateur
+        evaluations = simulateur.evaluer(contexte.plateau, contexte.joueur, contexte.inconnus, candidats,
+                                         contexte.temps_restant(), partial(self.valeur_reste, langue=contexte.langue),
+                                         contexte.est_annule, partial(self.equite, contexte=contexte))
+        return evaluations[0].coup if evaluations else candidats[0]
+
+    def fermer(self):
+        for simulateur in self.__simulateurs.values():
+            simulateur.fermer()
+        self.__simulateurs = {}
+
+
+class JoueurIA(Joueur):
+    """
+    Joueur contrôlé par l'ordinateur.
+
+    Au début de son tour (voir Scrabble.joueur_suivant), le joueur réfléchit dans un fil d'exécution séparé: il
+    génère tous ses coups légaux, en choisit un selon sa stratégie et remplit moves. Le délai de réflexion est de
+    delai_max secondes au plus, et se termine JoueurIA.MARGE secondes avant la fin du temps restant du tour
+    (Scrabble.temps_restant).
+
+    Seules les stratégies qui cherchent au-delà de la génération respectent ce délai: StrategieSimulation arrête ses
+    simulations à l'échéance, alors que Strategie et StrategieReste choisissent dès que les coups sont générés. La
+    génération des coups légaux ne peut pas être interrompue: elle peut à elle seule dépasser l'échéance.
+
+    Avec nb_processus différent de 1, les coups sont générés par un GenerateurParallele, dont les processus sont
+    conservés d'un tour à l'autre jusqu'à l'appel de fermer. La langue de la partie doit alors être connue.
+
+    En plus des attributs d'un Joueur, un JoueurIA a pour attributs:
+    - strategie: Strategie, la stratégie de choix du coup.
+    - delai_max: float, le nombre maximal de secondes de réflexion par tour.
+    - nb_processus: int, le nombre de processus générant les coups (1: dans le fil de réflexion, 0: un par coeur).
+    - nb_candidats: int, le nombre de coups légaux examinés lors du dernier tour.
+    - duree_reflexion: float, la durée en secondes de la dernière réflexion.
+    - duree_generation: float, la durée en secondes de la génération des coups légaux lors de la dernière réflexion.
+    - generation_en_cache: bool, True si ces coups ont été lus dans le cache plutôt que générés (voir CacheCoups).
+    """
+    MARGE = 2.0
+
+    def __init__(self, nom, strategie=None, delai_max=5.0, nb_processus=1):
+        super().__init__(nom)
+        self.strategie = Strategie() if strategie is None else strategie
+        self.delai_max = delai_max
+        self.nb_processus = nb_processus
+        self.nb_candidats = 0
+        self.duree_reflexion = 0.0
+        self.duree_generation = 0.0
+        self.generation_en_cache = False
+        self.__annulation = None
+        self.__verrou = Lock()
+        self.__generateurs = {}
+
+    def __getstate__(self):
+        # Une réflexion en cours et les processus de travail ne sont jamais sauvegardés
+        etat = self.__dict__.copy()
+        etat['_JoueurIA__annulation'] = None
+        etat['_JoueurIA__generateurs'] = {}
+        del etat['_JoueurIA__verrou']
+        return etat
+
+    def __setstate__(self, etat):
+        self.__dict__.update(etat)
+        self.__dict__.setdefault('nb_processus', 1)
+        self.__dict__.setdefault('_JoueurIA__generateurs', {})
+        self.__verrou = Lock()
+
+    def __generateur(self, lexique, langue):
+        # Générateur parallèle de la langue, conservé d'un tour à l'autre; None pour générer dans le fil de réflexion
+        if self.nb_processus == 1 or langue is None:
+            return None
+        generateur = self.__generateurs.get(langue)
+        if generateur is None:
+            generateur = GenerateurParallele(langue, self.nb_processus, CacheCoups.partage(lexique))
+            self.__generateurs[langue] = generateur
+        return generateur
+
+    def choisir_coup(self, plateau, lexique, inconnus, delai, annulation=None, langue=None):
+        """
+        Choisit un coup et remplit moves (vide si aucun coup n'est possible: le joueur passe son tour).
+        :param plateau: Plateau, le plateau sur lequel choisir. Ses jetons ne sont pas modifiés, mais ses vérifications
+                croisées sont mises à jour (voir GenerateurCoups.generer): depuis un autre fil d'exécution que celui de
+                la partie, passer une copie du plateau de la partie (voir reflechir).
+        :param lexique: Lexique, le lexique de la partie.
+        :param inconnus: Jeton list, les jetons que le joueur ne voit pas (sac et chevalets adverses).
+        :param delai: float, le nombre de secondes disponibles pour choisir.
+        :param annulation: (Event, optionnel) si signalé, la réflexion est abandonnée et moves n'est pas modifié.
+        :param langue: (str, optionnel) la langue de la partie, requise par les stratégies par simulation.
+        :return: Coup, le coup choisi ou None si aucun coup n'est possible ou si la réflexion a été annulée.
+        """
+        debut = perf_counter()
+
+        # La stratégie travaille sur une copie du chevalet: il peut changer pendant la réflexion
+        copie = copie_chevalet(self)
+        contexte = ContexteTour(copie, plateau, lexique, inconnus, debut + delai, annulation, langue,
+                                self.__generateur(lexique, langue))
+        debut_generation = perf_counter()
+        coups = contexte.generateur.generer(contexte.plateau, copie)
+        duree_generation = perf_counter() - debut_generation
+        coup = self.strategie.choisir(coups, contexte) if coups else None
+
+        # Sous verrou: une annulation (voir annuler) ne peut pas survenir entre la vérification et l'écriture de moves
+        with self.__verrou:
+            if contexte.est_annule():
+                return None
+            self.moves = {} if coup is None else coup.moves
+        self.nb_candidats = len(coups)
+        self.duree_generation = duree_generation
+        self.generation_en_cache = contexte.generateur.depuis_cache
+        self.duree_reflexion = perf_counter() - debut
+        return coup
+
+    def reflechir(self, partie, rappel):
+        """
+        Démarre la réflexion du tour dans un fil d'exécution séparé et retourne immédiatement.
+        :param partie: Scrabble, la partie en cours.
+        :param rappel: fonction appelée avec ce joueur une fois moves rempli, sauf si la réflexion a été annulée.
+        :return: rien
+        """
+        annulation = Event()
+        self.__annulation = annulation
+        temps_restant = partie.temps_restant or partie.TEMPS_PAR_TOUR
+        delai = min(self.delai_max, Simulateur.delai_tour(temps_restant, JoueurIA.MARGE))
+
+        # Copié ici, par le fil de la partie: une copie faite par le fil de réflexion pourrait surprendre le plateau
+        # au milieu d'une modification (ex: annuler un coup)
+        plateau = partie.plateau.copier()
+        inconnus = jetons_inconnus(partie, self)
+
+        def tour():
+            debut = perf_counter()
+            try:
+                lexique = partie.dictionnaire
+            except ScrabbleError:
+                lexique = None
+            if annulation.is_set():
+                return
+
+            if lexique is None:
+                self.moves = {}
+            else:
+                self.choisir_coup(plateau, lexique, inconnus, delai - (perf_counter() - debut), annulation,
+                                  partie.langue)
+            if not annulation.is_set():
+                rappel(self)
+
+        Thread(target=tour, daemon=True).start()
+
+    def annuler(self):
+        """
+        Annule la réflexion en cours (ex: le tour a changé): elle s'arrête au plus tôt et son résultat est ignoré.
+        :return: rien
+        """
+        with self.__verrou:
+            if self.__annulation is not None:
+                self.__annulation.set()
+            self.moves = {}
+
+    def fermer(self):
+        """
+        Annule la réflexion en cours, arrête les processus de génération et libère les ressources de la stratégie (voir
+            Strategie.fermer), par exemple à la fin de la partie.
+        :return: rien
+        """
+        self.annuler()
+        for generateur in self.__generateurs.values():
+            generateur.fermer()
+        self.__generateurs = {}
+        self.strategie.fermer()
+
+
+class Conseiller:
+    """
+    Recherche en arrière-plan les meilleurs coups d'un joueur, afin de lui suggérer un coup.
+
+    La recherche se fait dans un fil d'exécution séparé, en deux temps: tous les coups légaux sont d'abord générés et
+    classés selon leur score et la valeur de leur reste (voir StrategieReste), puis les meilleurs candidats sont
+    départagés par simulation (voir simulation.Simulateur), par rondes de Conseiller.DUREE_RONDE secondes. Après
+    chaque étape, le nouveau classement est publié et la fonction de rappel est appelée depuis le fil de recherche. La
+    recherche s'arrête après delai_max secondes, JoueurIA.MARGE secondes avant la fin du tour, ou dès son annulation.
+
+    Un conseiller a pour attributs:
+    - joueur: Joueur, le joueur à conseiller.
+    - nb_suggestions: int, le nombre de coups publiés.
+    - nb_processus: int, le nombre de processus générant les coups (voir GenerateurParallele; 1 pour les générer dans
+        le fil de recherche, sans démarrer de processus).
+    - suggestions: Coup list, le dernier classement publié (le meilleur coup en premier).
+    - erreur: ScrabbleError, l'erreur ayant empêché la recherche (ex: dictionnaire non chargé), None sinon.
+    """
+    DUREE_RONDE = 1.0
+
+    def __init__(self, joueur, nb_suggestions=5, delai_max=10.0, strategie=None, nb_processus=1):
+        self.joueur = joueur
+        self.nb_suggestions = nb_suggestions
+        self.nb_processus = nb_processus
+        self.delai_max = delai_max
+        self.strategie = StrategieSimulation() if strategie is None else strategie
+        self.suggestions = []
+        self.erreur = None
+        self.__annulation = Event()
+
+    @property
+    def est_annule(self):
+        """
+        :return: bool, True si la recherche a été annulée.
+        """
+        return self.__annulation.is_set()
+
+    def annuler(self):
+        """
+        Annule la recherche: elle s'arrête au plus tôt et plus rien n'est publié.
+        :return: rien
+        """
+        self.__annulation.set()
+
+    def demarrer(self, partie, rappel):
+        """
+        Démarre la recherche dans un fil d'exécution séparé et retourne immédiatement.
+        :param partie: Scrabble, la partie en cours.
+        :param rappel: fonction appelée avec ce conseiller après chaque publication, sauf après une annulation.
+        :return: rien
+        """
+        debut = perf_counter()
+        delai = max(0.0, min(self.delai_max, (partie.temps_restant or partie.TEMPS_PAR_TOUR) - JoueurIA.MARGE))
+        plateau = partie.plateau.copier()
+        joueur = copie_chevalet(self.joueur)
+        inconnus = jetons_inconnus(partie, self.joueur)
+
+        def publier(classement):
+            if not self.est_annule:
+                self.suggestions = classement[:self.nb_suggestions]
+                rappel(self)
+
+        def rechercher():
+            try:
+                lexique = partie.dictionnaire
+            except ScrabbleError as e:
+                self.erreur = e
+                publier([])
+                return
+
+            contexte = ContexteTour(joueur, plateau, lexique, inconnus, debut + delai, self.__annulation,
+                                    partie.langue)
+            if self.nb_processus == 1:
+                coups = contexte.generateur.generer(plateau, joueur)
+            else:
+                with GenerateurParallele(partie.langue, self.nb_processus, contexte.generateur.cache) as generateur:
+                    coups = generateur.generer(plateau, joueur)
+            strategie = self.strategie
+            candidats = sorted(coups, key=lambda coup: strategie.equite(coup, contexte), reverse=True)
+            publier(candidats)
+            if not isinstance(strategie, StrategieSimulation):
+                return
+
+            # Les résultats des rondes sont cumulés; un candidat pas encore simulé est classé après les autres
+            a_priori = partial(strategie.equite, contexte=contexte)
+            cumuls = {id(coup): EvaluationCoup(coup, a_priori(coup)) for coup in candidats[:strategie.nb_candidats]}
+            candidats = [cumul.coup for cumul in cumuls.values()]
+            simulateur = Simulateur(partie.langue, len(candidats), strategie.nb_plis, strategie.nb_processus)
+            with simulateur:
+                while candidats and contexte.temps_restant() > 0:
+                    evaluations = simulateur.evaluer(plateau, joueur, inconnus, candidats,
+                                                     min(Conseiller.DUREE_RONDE, contexte.temps_restant()),
+                                                     partial(strategie.valeur_reste, langue=partie.langue),
+                                                     contexte.est_annule, a_priori)
+                    for evaluation in evaluations:
+                        cumul = cumuls[id(evaluation.coup)]
+                        cumul.total += evaluation.total
+                        cumul.nb_simulations += evaluation.nb_simulations
+                    publier([cumul.coup for cumul in EvaluationCoup.classer(cumuls.values())])
+
+        Thread(target=rechercher, daemon=True).start()
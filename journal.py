@@ -0,0 +1,198 @@
+from tp4.error import *
+
+# Types d'opérations enregistrées dans un journal
+POSE, RETRAIT, TIRAGE, POINTS = range(4)
+
+
+class Journal:
+    """
+    Journal des modifications d'une partie: jetons posés sur le plateau, jetons retirés des chevalets ou tirés du sac
+    et points ajoutés aux joueurs.
+
+    Chaque modification passe par le journal, qui l'applique et retient seulement ce qui a changé (la case ou
+    l'emplacement du chevalet, et le jeton). La défaire ne recalcule rien et ne valide rien à nouveau: revenir en
+    arrière coûte le nombre de cases et d'emplacements touchés.
+
+    Les modifications sont regroupées en coups (voir terminer_coup), qui peuvent être annulés puis refaits. Refaire
+    tous les coups à partir du début rejoue donc la partie. Toute nouvelle modification oublie les coups annulés.
+
+    Un point de contrôle (voir point_de_controle) est la position courante dans le journal: abandonner(point) défait
+    puis oublie tout ce qui a suivi, par exemple un coup refusé parce qu'un de ses mots n'est pas dans le dictionnaire,
+    ou un coup essayé pendant une recherche.
+    """
+
+    def __init__(self):
+        self.__operations = []
+        self.__curseur = 0
+        self.__fins_coups = []
+        self.__nb_coups = 0
+
+    @property
+    def nb_coups(self):
+        """
+        :return: int, le nombre de coups terminés et non annulés.
+        """
+        return self.__nb_coups
+
+    def peut_annuler(self):
+        """
+        :return: bool, True s'il y a un coup terminé à annuler.
+        """
+        return self.__nb_coups > 0
+
+    def peut_refaire(self):
+        """
+        :return: bool, True s'il y a un coup annulé à refaire.
+        """
+        return self.__nb_coups < len(self.__fins_coups)
+
+    def point_de_controle(self):
+        """
+        :return: int, la position courante dans le journal, à passer à abandonner.
+        """
+        return self.__curseur
+
+    def __oublier_coups_annules(self):
+        del self.__operations[self.__curseur:]
+        del self.__fins_coups[self.__nb_coups:]
+
+    def __enregistrer(self, operation):
+        self.__oublier_coups_annules()
+        self.__operations.append(operation)
+        self.__curseur += 1
+
+    @staticmethod
+    def __faire(operation):
+        type_operation, cible, position, jeton = operation[:4]
+        if type_operation == POSE:
+            cible.ajouter_jeton_index(jeton, position)
+        elif type_operation == RETRAIT:
+            cible.retirer_jeton(position)
+        elif type_operation == TIRAGE:
+            operation[4].remove(jeton)
+            cible.ajouter_jeton(jeton, position)
+        else:
+            cible.ajouter_points(position)
+
+    @staticmethod
+    def __defaire(operation):
+        type_operation, cible, position, jeton = operation[:4]
+        if type_operation == POSE:
+            cible.retirer_jeton_index(position)
+        elif type_operation == RETRAIT:
+            cible.ajouter_jeton(jeton, position)
+        elif type_operation == TIRAGE:
+            cible.retirer_jeton(position)
+            operation[4].append(jeton)
+        else:
+            cible.ajouter_points(-position)
+
+    def poser(self, plateau, jeton, index):
+        """
+        Ajoute un jeton sur le plateau (voir Plateau.ajouter_jeton_index).
+        :param plateau: Plateau, le plateau.
+        :param jeton: Jeton, le jeton à poser.
+        :param index: int, l'index de la case (ligne * DIMENSION + colonne).
+        :return: rien
+        :exception: PositionNonVideError si la case est occupée (rien n'est alors enregistré).
+        """
+        plateau.ajouter_jeton_index(jeton, index)
+        self.__enregistrer((POSE, plateau, index, jeton))
+
+    def retirer_du_chevalet(self, joueur, position):
+        """
+        Retire un jeton du chevalet d'un joueur (voir Joueur.retirer_jeton).
+        :param joueur: Joueur, le joueur.
+        :param position: int, la position du jeton sur le chevalet.
+        :return: Jeton, le jeton retiré.
+        :exception: PositionInvalidError ou PositionVideError comme Joueur.retirer_jeton (rien n'est alors
+                    enregistré).
+        """
+        jeton = joueur.retirer_jeton(position)
+        self.__enregistrer((RETRAIT, joueur, position, jeton))
+        return jeton
+
+    def piocher(self, joueur, jeton, sac):
+        """
+        Met sur le premier emplacement libre du chevalet d'un joueur un jeton qui vient d'être retiré du sac (voir
+            Scrabble.tirer_jetons). Annuler le tirage remet le jeton dans le sac; le refaire l'en retire à nouveau.
+        :param joueur: Joueur, le joueur.
+        :param jeton: Jeton, le jeton tiré.
+        :param sac: Jeton list, le sac dont le jeton a été retiré (Scrabble.jetons_libres).
+        :return: rien
+        """
+        position = joueur.jetons.index(None)
+        joueur.ajouter_jeton(jeton, position)
+        self.__enregistrer((TIRAGE, joueur, position, jeton, sac))
+
+    def ajouter_points(self, joueur, points):
+        """
+        Ajoute des points à un joueur (voir Joueur.ajouter_points).
+        :param joueur: Joueur, le joueur.
+        :param points: int, les points à ajouter.
+        :return: rien
+        """
+        joueur.ajouter_points(points)
+        self.__enregistrer((POINTS, joueur, points, None))
+
+    def terminer_coup(self):
+        """
+        Marque la fin d'un coup: annuler défera toutes les modifications faites depuis la fin du coup précédent. Un
+            coup peut être vide (un joueur qui passe son tour).
+        :return: rien
+        """
+        self.__oublier_coups_annules()
+        self.__fins_coups.append(self.__curseur)
+        self.__nb_coups += 1
+
+    def __defaire_jusqua(self, point):
+        while self.__curseur > point:
+            self.__curseur -= 1
+            Journal.__defaire(self.__operations[self.__curseur])
+
+    def abandonner(self, point):
+        """
+        Défait, de la plus récente à la plus ancienne, toutes les modifications faites depuis un point de contrôle, et
+            les oublie (elles ne peuvent pas être refaites).
+        :param point: int, un point de contrôle obtenu de point_de_controle.
+        :return: rien
+        :exception: ScrabbleSystemError si le point de contrôle n'est pas dans le journal.
+        """
+        if not 0 <= point <= self.__curseur:
+            raise ScrabbleSystemError("Point de contrôle {} absent du journal.".format(point))
+        self.__oublier_coups_annules()
+        self.__defaire_jusqua(point)
+        del self.__operations[point:]
+        while self.__fins_coups and self.__fins_coups[-1] > point:
+            self.__fins_coups.pop()
+        self.__nb_coups = len(self.__fins_coups)
+
+    def annuler(self):
+        """
+        Annule le dernier coup terminé. Les modifications d'un coup en cours sont d'abord abandonnées.
+        :return: bool, False s'il n'y avait aucun coup à annuler.
+        """
+        fin_dernier = self.__fins_coups[self.__nb_coups - 1] if self.__nb_coups else 0
+        if self.__curseur > fin_dernier:
+            self.abandonner(fin_dernier)
+        if not self.__nb_coups:
+            return False
+
+        self.__nb_coups -= 1
+        self.__defaire_jusqua(self.__fins_coups[self.__nb_coups - 1] if self.__nb_coups else 0)
+        return True
+
+    def refaire(self):
+        """
+        Refait le prochain coup annulé.
+        :return: bool, False s'il n'y avait aucun coup à refaire.
+        """
+        if not self.peut_refaire():
+            return False
+
+        fin = self.__fins_coups[self.__nb_coups]
+        while self.__curseur < fin:
+            Journal.__faire(self.__operations[self.__curseur])
+            self.__curseur += 1
+        self.__nb_coups += 1
+        return True
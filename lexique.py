@@ -0,0 +1,712 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from threading import Lock, Thread
+from tp4.error import *
+
+# Code de la lettre A: la lettre de code c a le rang c - ORD_A dans l'alphabet (masques, compteurs, tables)
+ORD_A = ord('A')
+
+
+class _NoeudConstruction:
+    """
+    Noeud temporaire utilisé uniquement pendant la construction d'un GrapheMots.
+    """
+    __slots__ = ('terminal', 'enfants', 'numero')
+
+    def __init__(self):
+        self.terminal = False
+        self.enfants = {}
+        self.numero = -1
+
+    def cle(self):
+        # Deux noeuds sont équivalents s'ils ont le même statut terminal et les mêmes transitions
+        return self.terminal, tuple((lettre, enfant.numero) for lettre, enfant in self.enfants.items())
+
+
+class GrapheMots:
+    """
+    Graphe acyclique de mots minimal (DAWG) stocké de façon compacte.
+
+    Les noeuds sont numérotés de 0 à nb_noeuds - 1. Les transitions d'un noeud n occupent l'intervalle
+    [debuts[n], debuts[n + 1]) des tableaux lettres et cibles, triées par lettre.
+
+    Les attributs d'un graphe sont:
+    - racine: int, numéro du noeud racine.
+    - debuts: memoryview d'int, index de la première transition de chaque noeud (taille nb_noeuds + 1).
+    - lettres: bytes, code ASCII de la lettre de chaque transition.
+    - cibles: memoryview d'int, noeud atteint par chaque transition.
+    - terminaux: bytes, 1 si le noeud termine un mot, 0 sinon.
+
+    Un graphe construit n'est jamais modifié: tous ses tableaux sont en lecture seule et il peut être partagé entre
+    plusieurs parties et plusieurs fils d'exécution.
+    """
+
+    def __init__(self, sequences):
+        """
+        Construit le graphe minimal à partir d'une liste de chaînes triées et sans doublon (algorithme incrémental de
+        Daciuk et al.): les suffixes identiques sont fusionnés au fur et à mesure de l'insertion.
+        :param sequences: str iterable, chaînes triées en ordre croissant et sans doublon.
+        :exception: ScrabbleSystemError si les chaînes ne sont pas triées.
+        """
+        registre = {}
+        noeuds = []
+        non_verifies = []
+        racine = _NoeudConstruction()
+        precedent = ''
+
+        def minimiser(profondeur):
+            # Fusionne les noeuds non vérifiés plus profonds que la profondeur donnée avec leurs équivalents
+            while len(non_verifies) > profondeur:
+                parent, lettre, enfant = non_verifies.pop()
+                cle = enfant.cle()
+                equivalent = registre.get(cle)
+                if equivalent is None:
+                    enfant.numero = len(noeuds)
+                    registre[cle] = enfant
+                    noeuds.append(enfant)
+                else:
+                    parent.enfants[lettre] = equivalent
+
+        for sequence in sequences:
+            if sequence <= precedent and precedent:
+                raise ScrabbleSystemError("Les mots doivent être triés et sans doublon.")
+
+            commun = 0
+            for a, b in zip(sequence, precedent):
+                if a != b:
+                    break
+                commun += 1
+
+            minimiser(commun)
+            noeud = non_verifies[-1][2] if non_verifies else racine
+            for lettre in sequence[commun:]:
+                enfant = _NoeudConstruction()
+                noeud.enfants[lettre] = enfant
+                non_verifies.append((noeud, lettre, enfant))
+                noeud = enfant
+            noeud.terminal = True
+            precedent = sequence
+
+        minimiser(0)
+        racine.numero = len(noeuds)
+        noeuds.append(racine)
+
+        # Aplatissement en tableaux compacts, exposés en lecture seule pour pouvoir être partagés
+        debuts = array('I', [0])
+        cibles = array('I')
+        lettres = bytearray()
+        terminaux = bytearray()
+        for noeud in noeuds:
+            for lettre, enfant in noeud.enfants.items():
+                lettres.append(ord(lettre))
+                cibles.append(enfant.numero)
+            debuts.append(len(cibles))
+            terminaux.append(noeud.terminal)
+
+        self.racine = racine.numero
+        self.debuts = memoryview(debuts).toreadonly()
+        self.cibles = memoryview(cibles).toreadonly()
+        self.lettres = bytes(lettres)
+        self.terminaux = bytes(terminaux)
+
+    @staticmethod
+    def depuis_tampons(racine, debuts, lettres, cibles, terminaux):
+        """
+        Reconstruit un graphe à partir de ses tableaux, sans copie (ex: des vues sur un fichier projeté en mémoire).
+        :param racine: int, numéro du noeud racine.
+        :param debuts: séquence d'int, index de la première transition de chaque noeud.
+        :param lettres: bytes, code ASCII de la lettre de chaque transition.
+        :param cibles: séquence d'int, noeud atteint par chaque transition.
+        :param terminaux: séquence d'octets, 1 si le noeud termine un mot.
+        :return: GrapheMots, le graphe reconstruit.
+        """
+        graphe = GrapheMots.__new__(GrapheMots)
+        graphe.racine = racine
+        graphe.debuts = debuts
+        graphe.lettres = lettres
+        graphe.cibles = cibles
+        graphe.terminaux = terminaux
+        return graphe
+
+    @property
+    def nb_noeuds(self):
+        return len(self.terminaux)
+
+    @property
+    def nb_transitions(self):
+        return len(self.lettres)
+
+    def enfant(self, noeud, lettre):
+        """
+        Permet de suivre la transition étiquetée par une lettre.
+        :param noeud: int, noeud de départ.
+        :param lettre: str, lettre de la transition.
+        :return: int, le noeud atteint ou None si la transition n'existe pas.
+        """
+        i = self.lettres.find(ord(lettre), self.debuts[noeud], self.debuts[noeud + 1])
+        return None if i < 0 else self.cibles[i]
+
+    def enfants(self, noeud):
+        """
+        Permet de parcourir les transitions d'un noeud en ordre alphabétique.
+        :param noeud: int, noeud de départ.
+        :return: générateur de tuples (str, int), la lettre et le noeud atteint.
+        """
+        for i in range(self.debuts[noeud], self.debuts[noeud + 1]):
+            yield chr(self.lettres[i]), self.cibles[i]
+
+    def est_terminal(self, noeud):
+        """
+        :param noeud: int, noeud à vérifier.
+        :return: True si le chemin menant à ce noeud forme un mot complet, False sinon.
+        """
+        return self.terminaux[noeud] == 1
+
+    def suivre(self, chaine, noeud=None):
+        """
+        Permet de suivre toutes les lettres d'une chaîne à partir d'un noeud.
+        :param chaine: str, lettres à suivre.
+        :param noeud: (int, optionnel) noeud de départ, la racine par défaut.
+        :return: int, le noeud atteint ou None si le chemin n'existe pas.
+        """
+        noeud = self.racine if noeud is None else noeud
+        for lettre in chaine:
+            noeud = self.enfant(noeud, lettre)
+            if noeud is None:
+                return None
+        return noeud
+
+    def sequences(self, noeud=None, prefixe=''):
+        """
+        Permet d'énumérer en ordre alphabétique toutes les chaînes atteignables à partir d'un noeud.
+        :param noeud: (int, optionnel) noeud de départ, la racine par défaut.
+        :param prefixe: (str, optionnel) préfixe ajouté à chaque chaîne retournée.
+        :return: générateur de str.
+        """
+        noeud = self.racine if noeud is None else noeud
+        pile = [(noeud, prefixe)]
+        while pile:
+            noeud, chaine = pile.pop()
+            if self.terminaux[noeud]:
+                yield chaine
+            # Empilées à l'envers pour sortir en ordre alphabétique
+            for i in range(self.debuts[noeud + 1] - 1, self.debuts[noeud] - 1, -1):
+                pile.append((self.cibles[i], chaine + chr(self.lettres[i])))
+
+    def nombres_sequences(self):
+        """
+        Permet de compter, pour chaque noeud, le nombre de chaînes atteignables à partir de ce noeud. Ces nombres
+            permettent de calculer le rang alphabétique d'une chaîne pendant un parcours (hachage parfait minimal): le
+            rang augmente du statut terminal du noeud quitté et des nombres des transitions sautées.
+        :return: memoryview d'int, le nombre de chaînes de chaque noeud.
+        """
+        # Les noeuds sont numérotés après leurs enfants: un seul passage en ordre croissant suffit
+        nombres = array('I', bytes(4 * self.nb_noeuds))
+        for noeud in range(self.nb_noeuds):
+            total = self.terminaux[noeud]
+            for i in range(self.debuts[noeud], self.debuts[noeud + 1]):
+                total += nombres[self.cibles[i]]
+            nombres[noeud] = total
+        return memoryview(nombres).toreadonly()
+
+    def resumes_noeuds(self):
+        """
+        Permet de résumer, pour chaque noeud, les chaînes atteignables à partir de ce noeud. Ces résumés permettent
+            d'élaguer un parcours dès qu'un sous-graphe ne peut plus contenir de chaîne acceptable.
+        :return: tuple (memoryview d'int, memoryview d'int, memoryview d'int), pour chaque noeud: le masque des lettres
+                (bit 0 pour A) présentes dans les chaînes atteignables, la longueur minimale et la longueur maximale de
+                ces chaînes.
+        """
+        masques = array('I', bytes(4 * self.nb_noeuds))
+        minimums = array('B', bytes(self.nb_noeuds))
+        maximums = array('B', bytes(self.nb_noeuds))
+        for noeud in range(self.nb_noeuds):
+            masque, minimum, maximum = 0, 0 if self.terminaux[noeud] else 255, 0
+            for i in range(self.debuts[noeud], self.debuts[noeud + 1]):
+                cible = self.cibles[i]
+                masque |= masques[cible] | (1 << (self.lettres[i] - ORD_A))
+                minimum = min(minimum, minimums[cible] + 1)
+                maximum = max(maximum, maximums[cible] + 1)
+            masques[noeud], minimums[noeud], maximums[noeud] = masque, minimum, maximum
+        return memoryview(masques).toreadonly(), memoryview(minimums).toreadonly(), memoryview(maximums).toreadonly()
+
+    def __contains__(self, chaine):
+        noeud = self.suivre(chaine)
+        return noeud is not None and self.terminaux[noeud] == 1
+
+    def taille_memoire(self):
+        """
+        :return: int, nombre d'octets occupés par les tableaux du graphe.
+        """
+        return sum(memoryview(x).nbytes for x in (self.debuts, self.lettres, self.cibles, self.terminaux))
+
+
+class Lexique:
+    """
+    Dictionnaire de mots d'une partie, représenté par un graphe de mots minimal (DAWG).
+
+    En plus de la vérification d'appartenance (en O(longueur du mot)), le lexique expose le graphe pour permettre aux
+    algorithmes de génération de coups et d'aide de le parcourir directement, ainsi que des parcours par préfixe et par
+    suffixe.
+
+    Les attributs d'un lexique sont:
+    - graphe: GrapheMots, le graphe des mots lus de gauche à droite.
+    - graphe_inverse: GrapheMots, le graphe des mots lus de droite à gauche (construit au besoin).
+    - gaddag: GrapheMots, la variante GADDAG du graphe (construit au besoin). Pour un mot ABC, il contient les chemins
+            A>BC, BA>C et CBA où > est Lexique.SEPARATEUR.
+    - anagrammes: IndexAnagrammes, l'index des mots par signature (lettres triées) pour les requêtes de chevalet
+            (construit au besoin).
+
+    Un lexique peut être compilé une seule fois dans un fichier binaire (même nom que le fichier texte, extension
+    .lex) puis rechargé presque instantanément par projection en mémoire (voir Lexique.charger). Le fichier compilé
+    est invalidé automatiquement si le fichier texte change (taille, date de modification puis empreinte SHA-256) ou
+    si Lexique.VERSION_CACHE change. Si seule la date a changé (ex: fichier copié ou extrait à nouveau), la nouvelle
+    date est inscrite dans le fichier compilé, pour ne pas recalculer l'empreinte à chaque chargement.
+    """
+    SEPARATEUR = '>'
+    JOKER = '?'
+    VERSION_CACHE = 1
+    EXTENSION_CACHE = '.lex'
+
+    # magie, version, ordre des octets, taille source, mtime source (ns), empreinte, racine, noeuds, transitions, mots
+    __ENTETE = struct.Struct('<6sHBQQ32sIIII')
+    __MAGIE = b'TP4LEX'
+    __DATE = struct.Struct('<Q')
+    __POSITION_DATE = struct.calcsize('<6sHBQ')
+
+    def __init__(self, mots, gaddag=False):
+        """
+        Construit un lexique à partir d'une liste de mots.
+        :param mots: str iterable, les mots (en majuscules) du lexique, dans n'importe quel ordre.
+        :param gaddag: (bool, optionnel) construire immédiatement la variante GADDAG.
+        """
+        mots = sorted(set(mots))
+        self.graphe = GrapheMots(mots)
+        self.__nb_mots = len(mots)
+        self.__graphe_inverse = None
+        self.__gaddag = GrapheMots(Lexique.__sequences_gaddag(mots)) if gaddag else None
+        self.__anagrammes = None
+        self.__resumes = None
+
+    @staticmethod
+    def depuis_fichier(nom_fichier, gaddag=False):
+        """
+        Construit un lexique à partir d'un fichier texte contenant un mot par ligne. Les mots d'une seule lettre sont
+            ignorés.
+        :param nom_fichier: str, le chemin du fichier de dictionnaire.
+        :param gaddag: (bool, optionnel) construire immédiatement la variante GADDAG.
+        :return: Lexique, le lexique construit.
+        """
+        with open(nom_fichier, 'r') as f:
+            mots = [x.strip().upper() for x in f]
+        return Lexique([x for x in mots if len(x) > 1], gaddag)
+
+    @staticmethod
+    def charger(nom_fichier):
+        """
+        Charge le lexique d'un fichier texte en passant par sa version compilée. Si le fichier compilé est absent ou
+            périmé, le lexique est construit à partir du texte puis compilé pour les prochains chargements.
+        :param nom_fichier: str, le chemin du fichier texte de dictionnaire.
+        :return: Lexique, le lexique chargé.
+        """
+        lexique = Lexique.__lire_cache(nom_fichier)
+        if lexique is None:
+            lexique = Lexique.depuis_fichier(nom_fichier)
+            try:
+                lexique.compiler(nom_fichier)
+            except OSError:
+                pass  # Le cache n'est qu'une optimisation (ex: répertoire en lecture seule)
+        return lexique
+
+    def compiler(self, nom_fichier):
+        """
+        Écrit la version binaire du lexique à côté de son fichier texte source.
+        :param nom_fichier: str, le chemin du fichier texte dont le lexique est issu.
+        :return: str, le chemin du fichier compilé.
+        """
+        taille, mtime, empreinte = Lexique.__signature_source(nom_fichier, avec_empreinte=True)
+        graphe = self.graphe
+        entete = Lexique.__ENTETE.pack(Lexique.__MAGIE, Lexique.VERSION_CACHE, sys.byteorder == 'little',
+                                       taille, mtime, empreinte, graphe.racine, graphe.nb_noeuds,
+                                       graphe.nb_transitions, len(self))
+
+        nom_cache = os.path.splitext(nom_fichier)[0] + Lexique.EXTENSION_CACHE
+        nom_temporaire = '{}.{}.tmp'.format(nom_cache, os.getpid())
+        with open(nom_temporaire, 'wb') as f:
+            f.write(entete)
+            f.write(array('I', graphe.debuts).tobytes())
+            f.write(array('I', graphe.cibles).tobytes())
+            f.write(graphe.lettres)
+            f.write(graphe.terminaux)
+        os.replace(nom_temporaire, nom_cache)
+        return nom_cache
+
+    @staticmethod
+    def __signature_source(nom_fichier, avec_empreinte):
+        stat = os.stat(nom_fichier)
+        empreinte = b''
+        if avec_empreinte:
+            with open(nom_fichier, 'rb') as f:
+                empreinte = hashlib.sha256(f.read()).digest()
+        return stat.st_size, stat.st_mtime_ns, empreinte
+
+    @staticmethod
+    def __inscrire_date(nom_cache, mtime):
+        # Contenu inchangé, date différente: seule la date de l'en-tête est réécrite
+        try:
+            with open(nom_cache, 'r+b') as f:
+                f.seek(Lexique.__POSITION_DATE)
+                f.write(Lexique.__DATE.pack(mtime))
+        except OSError:
+            pass  # Le cache reste valide, l'empreinte sera simplement recalculée au prochain chargement
+
+    @staticmethod
+    def __lire_cache(nom_fichier):
+        nom_cache = os.path.splitext(nom_fichier)[0] + Lexique.EXTENSION_CACHE
+        try:
+            with open(nom_cache, 'rb') as f:
+                tampon = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(tampon) < Lexique.__ENTETE.size:
+            return None
+        magie, version, petit_boutiste, taille, mtime, empreinte, racine, nb_noeuds, nb_transitions, nb_mots = \
+            Lexique.__ENTETE.unpack_from(tampon)
+        if magie != Lexique.__MAGIE or version != Lexique.VERSION_CACHE \
+                or petit_boutiste != (sys.byteorder == 'little'):
+            return None
+
+        # Taille et date identiques: on fait confiance au cache, sinon on compare le contenu
+        taille_source, mtime_source, _ = Lexique.__signature_source(nom_fichier, avec_empreinte=False)
+        if taille_source != taille:
+            return None
+        if mtime_source != mtime:
+            if Lexique.__signature_source(nom_fichier, avec_empreinte=True)[2] != empreinte:
+                return None
+            Lexique.__inscrire_date(nom_cache, mtime_source)
+
+        debut = Lexique.__ENTETE.size
+        fin = debut + 4 * (nb_noeuds + 1) + 4 * nb_transitions + nb_transitions + nb_noeuds
+        if len(tampon) != fin:
+            return None
+
+        vue = memoryview(tampon)
+        debuts = vue[debut:debut + 4 * (nb_noeuds + 1)].cast('I')
+        debut += 4 * (nb_noeuds + 1)
+        cibles = vue[debut:debut + 4 * nb_transitions].cast('I')
+        debut += 4 * nb_transitions
+        lettres = bytes(vue[debut:debut + nb_transitions])  # bytes.find est requis pour le parcours
+        debut += nb_transitions
+        terminaux = vue[debut:debut + nb_noeuds]
+
+        lexique = Lexique.__new__(Lexique)
+        lexique.graphe = GrapheMots.depuis_tampons(racine, debuts, lettres, cibles, terminaux)
+        lexique.__nb_mots = nb_mots
+        lexique.__graphe_inverse = None
+        lexique.__gaddag = None
+        lexique.__anagrammes = None
+        lexique.__resumes = None
+        return lexique
+
+    @staticmethod
+    def __sequences_gaddag(mots):
+        sequences = []
+        for mot in mots:
+            for i in range(1, len(mot)):
+                sequences.append(mot[i - 1::-1] + Lexique.SEPARATEUR + mot[i:])
+            sequences.append(mot[::-1])
+        sequences.sort()
+        return sequences
+
+    @property
+    def graphe_inverse(self):
+        if self.__graphe_inverse is None:
+            self.__graphe_inverse = GrapheMots(sorted(mot[::-1] for mot in self))
+        return self.__graphe_inverse
+
+    @property
+    def gaddag(self):
+        if self.__gaddag is None:
+            self.__gaddag = GrapheMots(Lexique.__sequences_gaddag(list(self)))
+        return self.__gaddag
+
+    @property
+    def anagrammes(self):
+        if self.__anagrammes is None:
+            from tp4.anagrammes import IndexAnagrammes
+            self.__anagrammes = IndexAnagrammes(self)
+        return self.__anagrammes
+
+    def mot_permis(self, mot):
+        """
+        :param mot: str, mot à vérifier (en majuscules).
+        :return: bool, True si le mot est dans le lexique, False sinon.
+        """
+        return mot in self.graphe
+
+    def noeud_prefixe(self, prefixe):
+        """
+        :param prefixe: str, début de mot.
+        :return: int, le noeud du graphe atteint par le préfixe ou None si aucun mot ne commence ainsi.
+        """
+        return self.graphe.suivre(prefixe)
+
+    def mots_avec_prefixe(self, prefixe):
+        """
+        :param prefixe: str, début de mot.
+        :return: générateur de str, les mots commençant par le préfixe en ordre alphabétique.
+        """
+        noeud = self.graphe.suivre(prefixe)
+        return iter(()) if noeud is None else self.graphe.sequences(noeud, prefixe)
+
+    def mots_avec_suffixe(self, suffixe):
+        """
+        :param suffixe: str, fin de mot.
+        :return: générateur de str, les mots se terminant par le suffixe.
+        """
+        noeud = self.graphe_inverse.suivre(suffixe[::-1])
+        if noeud is None:
+            return iter(())
+        return (mot[::-1] for mot in self.graphe_inverse.sequences(noeud, suffixe[::-1]))
+
+    def chercher(self, motif, contient='', longueur=None, disponibles=None):
+        """
+        Permet de trouver les mots correspondant à un motif par un parcours du graphe (sans balayer tout le lexique).
+
+        Ex: chercher("?A??E", contient="XZ", longueur=range(5, 9)) trouve les mots de 5 à 8 lettres dont la 2e lettre
+            est A, la 5e est E, et contenant au moins un X et un Z.
+
+        :param motif: str, une lettre fixe ou Lexique.JOKER pour chaque position du début du mot. Les positions
+                au-delà du motif sont libres.
+        :param contient: (str, optionnel) lettres que le mot doit contenir (avec répétitions), n'importe où.
+        :param longueur: (int ou range, optionnel) longueur(s) permise(s) du mot. Par défaut, la longueur du motif.
+        :param disponibles: (str, optionnel) si précisé, les positions libres doivent être remplies avec ces lettres
+                (ex: celles d'un chevalet), chacune au plus une fois.
+        :return: str list, les mots trouvés en ordre alphabétique.
+        :exception: ScrabbleSystemError si motif, contient ou disponibles contient autre chose que des lettres de A à Z
+                (minuscules acceptées) ou, pour motif, Lexique.JOKER.
+        """
+        motif, contient = motif.upper(), contient.upper()
+        if disponibles is not None:
+            disponibles = disponibles.upper()
+        for lettres_parametre in (motif.replace(Lexique.JOKER, ''), contient, disponibles or ''):
+            for lettre in lettres_parametre:
+                if not 'A' <= lettre <= 'Z':
+                    raise ScrabbleSystemError("Lettre invalide dans une recherche: {!r}.".format(lettre))
+
+        if longueur is None:
+            longueur = range(len(motif), len(motif) + 1)
+        elif isinstance(longueur, int):
+            longueur = range(longueur, longueur + 1)
+        if len(longueur) == 0:
+            return []
+        longueur_min, longueur_max = min(longueur), max(longueur)
+
+        requis = [0] * 26
+        for lettre in contient:
+            requis[ord(lettre) - ORD_A] += 1
+        reserve = None
+        if disponibles is not None:
+            reserve = [0] * 26
+            for lettre in disponibles:
+                reserve[ord(lettre) - ORD_A] += 1
+
+        if self.__resumes is None:
+            self.__resumes = self.graphe.resumes_noeuds()
+        masques, minimums, maximums = self.__resumes
+        graphe = self.graphe
+        debuts, lettres, cibles, terminaux = graphe.debuts, graphe.lettres, graphe.cibles, graphe.terminaux
+        resultats = []
+
+        def parcourir(noeud, mot, nb_requis, masque_requis):
+            profondeur = len(mot)
+            if terminaux[noeud] and nb_requis == 0 and profondeur in longueur:
+                resultats.append(mot)
+
+            # Élagage: les lettres requises et la longueur permise doivent rester atteignables sous ce noeud
+            if profondeur == longueur_max or nb_requis > longueur_max - profondeur \
+                    or masque_requis & masques[noeud] != masque_requis \
+                    or profondeur + maximums[noeud] < longueur_min or profondeur + minimums[noeud] > longueur_max:
+                return
+
+            fixe = motif[profondeur] if profondeur < len(motif) else Lexique.JOKER
+            if fixe != Lexique.JOKER:
+                i = lettres.find(ord(fixe), debuts[noeud], debuts[noeud + 1])
+                transitions = () if i < 0 else (i,)
+            else:
+                transitions = range(debuts[noeud], debuts[noeud + 1])
+
+            for i in transitions:
+                index = lettres[i] - ORD_A
+                libre = fixe == Lexique.JOKER and reserve is not None
+                if libre:
+                    if reserve[index] == 0:
+                        continue
+                    reserve[index] -= 1
+
+                if requis[index] > 0:
+                    requis[index] -= 1
+                    masque = masque_requis if requis[index] else masque_requis & ~(1 << index)
+                    parcourir(cibles[i], mot + chr(lettres[i]), nb_requis - 1, masque)
+                    requis[index] += 1
+                else:
+                    parcourir(cibles[i], mot + chr(lettres[i]), nb_requis, masque_requis)
+
+                if libre:
+                    reserve[index] += 1
+
+        parcourir(graphe.racine, '', len(contient), sum(1 << i for i in range(26) if requis[i]))
+        return resultats
+
+    def taille_memoire(self):
+        """
+        :return: int, nombre d'octets occupés par les graphes construits du lexique.
+        """
+        graphes = [self.graphe, self.__graphe_inverse, self.__gaddag]
+        taille = sum(g.taille_memoire() for g in graphes if g is not None)
+        return taille if self.__anagrammes is None else taille + self.__anagrammes.taille_memoire()
+
+    def __contains__(self, mot):
+        return mot in self.graphe
+
+    def __iter__(self):
+        return self.graphe.sequences()
+
+    def __len__(self):
+        return self.__nb_mots
+
+
+class RegistreLexiques:
+    """
+    Registre des lexiques partagés par toutes les parties du processus.
+
+    Chaque langue est chargée au plus une fois (via Lexique.charger); les appels suivants, de n'importe quelle partie ou
+    de n'importe quel fil d'exécution, reçoivent le même objet Lexique en lecture seule.
+
+    Le chargement peut être démarré en arrière-plan dès que la langue est connue (voir precharger), obtenir n'attend
+    alors que le temps restant au chargement.
+
+    Le registre possède une variable de classe:
+    - FICHIERS: dict, le fichier de dictionnaire associé à chaque langue supportée.
+    """
+    FICHIERS = {'FR': 'dictionnaire_francais.txt', 'EN': 'dictionnaire_anglais.txt'}
+
+    __lexiques = {}
+    __chargements = {}
+    __erreurs = {}
+    __verrou = Lock()
+
+    @staticmethod
+    def __valider_langue(langue):
+        langue = langue.upper()
+        if langue not in RegistreLexiques.FICHIERS:
+            raise ScrabbleSystemError('Langue {} non supportée.'.format(langue))
+        return langue
+
+    @staticmethod
+    def precharger(langue):
+        """
+        Démarre le chargement du lexique d'une langue dans un fil d'exécution d'arrière-plan et retourne immédiatement.
+            Rien n'est fait si le lexique est déjà chargé ou en cours de chargement.
+        :param langue: str, FR ou EN (insensible à la casse).
+        :return: rien
+        :exception: ScrabbleSystemError si la langue n'est pas supportée.
+        """
+        langue = RegistreLexiques.__valider_langue(langue)
+        with RegistreLexiques.__verrou:
+            if langue in RegistreLexiques.__lexiques or langue in RegistreLexiques.__chargements:
+                return
+            chargement = Thread(target=RegistreLexiques.__charger, args=(langue,), daemon=True)
+            RegistreLexiques.__chargements[langue] = chargement
+            chargement.start()
+
+    @staticmethod
+    def __charger(langue):
+        lexique, erreur = None, None
+        try:
+            lexique = Lexique.charger(RegistreLexiques.FICHIERS[langue])
+        except Exception as e:
+            erreur = e
+
+        with RegistreLexiques.__verrou:
+            if lexique is not None:
+                RegistreLexiques.__lexiques[langue] = lexique
+            else:
+                RegistreLexiques.__erreurs[langue] = erreur
+            RegistreLexiques.__chargements.pop(langue, None)
+
+    @staticmethod
+    def obtenir(langue, delai=None):
+        """
+        Permet d'obtenir le lexique partagé d'une langue. Si le lexique n'est pas encore chargé, son chargement est
+            démarré au besoin puis attendu au plus delai secondes.
+        :param langue: str, FR ou EN (insensible à la casse).
+        :param delai: (float, optionnel) nombre maximal de secondes d'attente, sans limite par défaut.
+        :return: Lexique, le lexique partagé de la langue.
+        :exception: ScrabbleSystemError si la langue n'est pas supportée.
+        :exception: DictionnaireNonChargeError si le chargement n'est pas terminé à l'échéance du délai.
+        """
+        langue = RegistreLexiques.__valider_langue(langue)
+        lexique = RegistreLexiques.__lexiques.get(langue)
+        if lexique is not None:
+            return lexique
+
+        RegistreLexiques.precharger(langue)
+        chargement = RegistreLexiques.__chargements.get(langue)
+        if chargement is not None:
+            chargement.join(delai)
+
+        with RegistreLexiques.__verrou:
+            lexique = RegistreLexiques.__lexiques.get(langue)
+            erreur = RegistreLexiques.__erreurs.pop(langue, None)
+
+        if erreur is not None:
+            raise erreur
+        if lexique is None:
+            raise DictionnaireNonChargeError
+        return lexique
+
+    @staticmethod
+    def est_charge(langue):
+        """
+        :param langue: str, FR ou EN (insensible à la casse).
+        :return: True si le lexique de la langue est chargé et peut être obtenu sans attente, False sinon.
+        """
+        return langue.upper() in RegistreLexiques.__lexiques
+
+    @staticmethod
+    def langues_chargees():
+        """
+        :return: str list, les langues dont le lexique est déjà chargé.
+        """
+        return sorted(RegistreLexiques.__lexiques.keys())
+
+    @staticmethod
+    def taille_memoire():
+        """
+        Permet de connaître l'empreinte mémoire du registre.
+        :return: dict, le nombre d'octets occupés par le lexique de chaque langue chargée.
+        """
+        return {langue: lexique.taille_memoire() for langue, lexique in RegistreLexiques.__lexiques.items()}
+
+    @staticmethod
+    def vider():
+        """
+        Oublie tous les lexiques chargés (ils seront rechargés à la prochaine demande). Les parties qui détiennent
+            déjà un lexique continuent de l'utiliser.
+        :return: rien
+        """
+        with RegistreLexiques.__verrou:
+            RegistreLexiques.__lexiques.clear()
+            RegistreLexiques.__erreurs.clear()
+
+
+if __name__ == '__main__':
+    # Étape de compilation: python -m tp4.lexique dictionnaire_francais.txt dictionnaire_anglais.txt
+    for nom in sys.argv[1:] or ['dictionnaire_francais.txt', 'dictionnaire_anglais.txt']:
+        print(Lexique.depuis_fichier(nom).compiler(nom))
@@ -1,7 +1,15 @@
+from random import Random
 from tp4.error import *
+from tp4.lexique import ORD_A
 from tp4.ui.theme_manager import Theme
 
 
+def _table_zobrist(nb_cases, graine=0x5C7AB81E):
+    # Un nombre aléatoire de 64 bits par couple (case, lettre), toujours le même d'un processus à l'autre
+    hasard = Random(graine)
+    return [[hasard.getrandbits(64) for _ in range(26)] for _ in range(nb_cases)]
+
+
 class Jeton:
     """
     Cette classe représente un jeton.
@@ -10,23 +18,48 @@ class Jeton:
     - lettre: str, représentant la lettre écrite sur le jeton. Par convention toutes les lettres au scrabble sont en
                 majuscules. Dans ce travail nous ne considérons pas les jetons jokers qui n'ont aucune lettre inscrite.
     - valeur: int, compris entre 0 et 20 inclusivement et représentant le nombre de points associé au jeton.
+
+    Les jetons sont immuables et partagés (poids mouche): Jeton(lettre, valeur) retourne toujours le même objet pour
+    une même lettre et une même valeur, soit un seul objet par lettre de chaque langue, peu importe le nombre de jetons
+    de cette lettre dans le sac. Deux jetons identiques peuvent donc être comparés avec is, et une partie sauvegardée
+    ne contient chaque jeton qu'une fois (voir Scrabble.lire_sauvegarde pour les parties sauvegardées avant le
+    partage des jetons).
     """
-    def __init__(self, lettre, valeur):
+    __slots__ = ('lettre', 'valeur')
+    __instances = {}
+
+    def __new__(cls, lettre, valeur):
         """
-        Constructeur de la classe. Permet de créer un Jeton à partir d'une lettre et d'un nombre de points
+        Constructeur de la classe. Permet d'obtenir le Jeton d'une lettre et d'un nombre de points
         :param lettre: str, représentant la lettre écrite sur le jeton.
         :param valeur: int, > 0 représentant le nombre de points associé au jeton.
         :exception: Levez une exception avec assert si la valeur ne respecte pas
         la condition suivante 0 <= valeur <= 20 ou si la lettre n'est pas en majuscule.
         """
+        jeton = Jeton.__instances.get((lettre, valeur))
+        if jeton is not None:
+            return jeton
+
         if len(lettre) != 1 or not lettre.isupper() or not lettre.isalpha():
             raise ScrabbleSystemError("La Lettre d'un jeton doit être compris entre A et Z.")
 
         if valeur <= 0 or valeur > 20:
             raise ScrabbleSystemError("La valeur du jeton doit être comprise entre 0 et 20 (inclusivement)")
 
-        self.lettre = lettre
-        self.valeur = valeur
+        jeton = super().__new__(cls)
+        object.__setattr__(jeton, 'lettre', lettre)
+        object.__setattr__(jeton, 'valeur', valeur)
+        return Jeton.__instances.setdefault((lettre, valeur), jeton)
+
+    def __setattr__(self, nom, valeur):
+        raise AttributeError("Un jeton ne peut pas être modifié.")
+
+    def __delattr__(self, nom):
+        raise AttributeError("Un jeton ne peut pas être modifié.")
+
+    def __reduce__(self):
+        # Seules la lettre et la valeur sont sauvegardées: le jeton partagé est retrouvé au chargement
+        return Jeton, (self.lettre, self.valeur)
 
     def __str__(self):
         """ *** Vous n'avez pas à coder cette méthode ***
@@ -54,6 +87,7 @@ class Case:
                  None si la case n'est pas spéciale.
     - jeton_occupant: Jeton,
     """
+    __slots__ = ('multiplicateur', 'type', 'jeton_occupant')
 
     def __init__(self, multiplicateur=1, case_type=None):
         """
@@ -74,6 +108,13 @@ class Case:
         self.type = case_type
         self.jeton_occupant: Jeton = None
 
+    def __setstate__(self, etat):
+        # État (None, attributs) d'une case à __slots__, ou dictionnaire d'une case sauvegardée avant leur ajout
+        if isinstance(etat, tuple):
+            etat = etat[1]
+        for nom, valeur in etat.items():
+            setattr(self, nom, valeur)
+
     def est_vide(self):
         """
         Vérifie si une case est vide ou pas (jeton_occupant est None ou pas).
@@ -171,6 +212,141 @@ class Case:
         return "\x1b[0;30;{}m{:^4s}\x1b[0m".format(self.code_couleur, s)
 
 
+class VueCase(Case):
+    """
+    Case d'un plateau, telle que présentée à l'interface (voir Plateau.cases). Une vue ne contient rien: son
+    multiplicateur, son type et son jeton sont lus dans les tableaux du plateau, et y placer ou en retirer un jeton
+    modifie le plateau.
+    """
+    __slots__ = ('__plateau', '__index')
+
+    def __init__(self, plateau, index):
+        """
+        :param plateau: Plateau, le plateau de la case.
+        :param index: int, l'index de la case (ligne * DIMENSION + colonne).
+        """
+        self.__plateau = plateau
+        self.__index = index
+
+    @property
+    def multiplicateur(self):
+        return max(Plateau.BONUS_LETTRE[self.__index], Plateau.BONUS_MOT[self.__index])
+
+    @property
+    def type(self):
+        if Plateau.BONUS_LETTRE[self.__index] > 1:
+            return 'L'
+        return 'M' if Plateau.BONUS_MOT[self.__index] > 1 else None
+
+    @property
+    def jeton_occupant(self):
+        return self.__plateau.jeton(self.__index)
+
+    def placer_jeton(self, jeton):
+        self.__plateau.ajouter_jeton_index(jeton, self.__index)
+
+    def retirer_jeton(self):
+        return self.__plateau.retirer_jeton_index(self.__index)
+
+
+class VueRangees:
+    """
+    Vue des rangées d'un plateau (voir Plateau.rangees): ses lignes, ou ses colonnes pour la vue transposée. La rangée
+    r d'une vue horizontale est la ligne r, et celle d'une vue verticale est la colonne r, dont la case c est la case
+    (c, r) du plateau. Un algorithme écrit pour les lignes s'applique donc tel quel aux colonnes.
+
+    Les rangées sont des memoryview (en lecture seule, avec un pas de DIMENSION pour les colonnes) sur les tableaux
+    plats du plateau: rien n'est copié, et elles restent à jour quand des jetons sont ajoutés ou retirés.
+
+    Les attributs d'une vue sont:
+    - horizontal: bool, True pour les lignes, False pour les colonnes.
+    - lettres: memoryview list, pour chaque rangée, le code de la lettre de chaque case (0 si elle est vide).
+    - valeurs: memoryview list, pour chaque rangée, la valeur du jeton de chaque case (0 si elle est vide).
+    - bonus_lettre, bonus_mot: memoryview list, pour chaque rangée, les multiplicateurs de chaque case.
+    - index: tuple tuple, pour chaque rangée, l'index (ligne * DIMENSION + colonne) de chaque case.
+    - coordonnees: tuple tuple, pour chaque index, la rangée et la position dans la rangée de la case (l'inverse de
+                index).
+    """
+    __slots__ = ('horizontal', 'lettres', 'valeurs', 'bonus_lettre', 'bonus_mot', 'index', 'coordonnees')
+
+    def __init__(self, lettres, valeurs, horizontal):
+        """
+        :param lettres: bytearray, le tableau des codes des lettres du plateau.
+        :param valeurs: bytearray, le tableau des valeurs des jetons du plateau.
+        :param horizontal: bool, True pour les lignes, False pour les colonnes.
+        """
+        n = Plateau.DIMENSION
+        self.horizontal = horizontal
+        self.index, self.coordonnees = Plateau.index_rangees(horizontal), Plateau.coordonnees_rangees(horizontal)
+        self.lettres, self.valeurs, self.bonus_lettre, self.bonus_mot = (
+            [tableau[r * n:(r + 1) * n] if horizontal else tableau[r::n] for r in range(n)]
+            for tableau in (memoryview(t).toreadonly() for t in (lettres, valeurs, Plateau.BONUS_LETTRE,
+                                                                   Plateau.BONUS_MOT)))
+
+
+def _disposition(dimension):
+    """
+    Cases spéciales d'un vrai plateau de scrabble.
+    :return: tuple (bytes, bytes), les multiplicateurs de lettre et de mot de chaque case (ligne * dimension + colonne).
+    """
+    cases = [[Case() for _ in range(dimension)] for _ in range(dimension)]
+    for (i, j) in [(0, 0), (0, 7), (0, 14), (7, 0), (7, 14), (14, 0), (14, 7), (14, 14)]:
+        cases[i][j] = Case(3, 'M')
+    for (i, j) in [(1, 5), (1, 9), (5, 1), (5, 5), (5, 9), (5, 13),
+                   (9, 1), (9, 5), (9, 9), (9, 13), (13, 5), (13, 9)]:
+        cases[i][j] = Case(3, 'L')
+    for i in [1, 2, 3, 4]:
+        cases[i][i] = Case(2, 'M')
+        cases[i][dimension - i - 1] = Case(2, 'M')
+        cases[dimension - i - 1][dimension - i - 1] = Case(2, 'M')
+        cases[dimension - i - 1][i] = Case(2, 'M')
+    for i, j in [(1, 1), (4, 0), (0, 4), (5, 1), (1, 5), (7, 4)]:
+        cases[7 - i][7 - j] = Case(2, 'L')
+        cases[7 + i][7 - j] = Case(2, 'L')
+        cases[7 - i][7 + j] = Case(2, 'L')
+        cases[7 + i][7 + j] = Case(2, 'L')
+    cases[7][7] = Case(2, 'M')
+
+    return (bytes(case.multiplicateur if case.type == 'L' else 1 for ligne in cases for case in ligne),
+            bytes(case.multiplicateur if case.type == 'M' else 1 for ligne in cases for case in ligne))
+
+
+def _tables_positions(dimension):
+    """
+    Tables de conversion des positions, calculées une seule fois.
+    :return: tuple (str list, dict, tuple list, tuple list), pour chaque index (ligne * dimension + colonne): son code
+            « XY », puis l'index de chaque code « XY » ou « xy » valide, et pour chaque index: ses coordonnées
+            (ligne, colonne) et les index de ses cases voisines (haut, bas, gauche, droite).
+    """
+    codes, index_codes, coordonnees, voisins = [], {}, [], []
+    for index in range(dimension * dimension):
+        ligne, colonne = divmod(index, dimension)
+        code = "{}{}".format(chr(ligne + ORD_A), colonne + 1)
+        codes.append(code)
+        index_codes[code] = index_codes[code.lower()] = index
+        coordonnees.append((ligne, colonne))
+        voisins.append(tuple(i * dimension + j for i, j in ((ligne - 1, colonne), (ligne + 1, colonne),
+                                                             (ligne, colonne - 1), (ligne, colonne + 1))
+                             if 0 <= i < dimension and 0 <= j < dimension))
+    return codes, index_codes, coordonnees, voisins
+
+
+def _tables_rangees(dimension):
+    """
+    :return: tuple list, pour les lignes puis pour les colonnes: l'index (ligne * dimension + colonne) de chaque case de
+            chaque rangée, puis la rangée et la position dans la rangée de chaque index.
+    """
+    lignes = tuple(tuple(r * dimension + c for c in range(dimension)) for r in range(dimension))
+    tables = []
+    for rangees in (lignes, tuple(zip(*lignes))):
+        coordonnees = [None] * (dimension * dimension)
+        for r, rangee in enumerate(rangees):
+            for c, index in enumerate(rangee):
+                coordonnees[index] = (r, c)
+        tables.append((rangees, tuple(coordonnees)))
+    return tables
+
+
 class Plateau:
     """
     Cette classe représente un plateau de scrabble.
@@ -215,7 +391,7 @@ class Plateau:
             Par défaut sa valeur est de 15.
 
     Un plateau de scrabble a pour attribut:
-    - cases: Case list list, une liste de liste de cases.
+    - cases: Case list list, une liste de liste de cases (des vues sur les tableaux du plateau, voir plus bas).
             Le programmeur peut avoir accès et manipuler les cases du plateau avec des indexes i et j,
                 tels que 0 <= i < Plateau.DIMENSION et 0 <= i < Plateau.DIMENSION.
             Pour vous aider un peu:
@@ -232,8 +408,39 @@ class Plateau:
             - K9 permet de désigner la case à l'intersection de la 11ème ligne et de la 9ème colonne.
             - E15 permet de désigner la case à l'intersection de la 5ème ligne et 15ème colonne.
             Note: Vous pouvez vour servir du graphe ASCII plus haut pour une meilleure compréhension.
+
+    Le moteur de jeu (génération de coups, simulation) désigne les cases par leur index ligne * DIMENSION + colonne
+    plutôt que par leur code: chaque méthode prenant des codes a une variante suffixée _index (ex:
+    ajouter_jeton_index), et les codes sont convertis par des tables précalculées (voir index_position et
+    code_position).
+
+    Le contenu du plateau est stocké dans des tableaux plats indexés par ligne * DIMENSION + colonne: le code de la
+    lettre de chaque case (0 si elle est vide) et la valeur de son jeton dans deux bytearray (voir lettres et valeurs),
+    les jetons eux-mêmes dans une liste. Les multiplicateurs, identiques pour tous les plateaux, sont dans les bytes
+    BONUS_LETTRE et BONUS_MOT. Copier un plateau revient à copier ces tableaux (voir copier), et les cases ne sont que
+    des vues (VueCase) créées pour l'interface.
+
+    Pour la génération de coups et la validation, le plateau maintient aussi des index incrémentaux, mis à jour par
+    ajouter_jeton et retirer_jeton et jamais sauvegardés avec le plateau:
+    - le nombre de jetons posés et, pour chaque case, le nombre de voisins occupés;
+    - l'occupation de chaque ligne et de chaque colonne, sous forme de masques de bits (bit j de la ligne i pour la
+        case (i, j), bit i de la colonne j pour la même case), qui réduisent la validation d'un placement à quelques
+        opérations sur des entiers (voir valider_positions_avant_ajout);
+    - les ancres, soit les cases vides adjacentes à un jeton (voir ancres);
+    - les vérifications croisées de chaque case vide, recalculées seulement pour les cases touchées (voir
+        verifications_croisees);
+    - l'empreinte de Zobrist du plateau (voir empreinte).
+
+    Les colonnes se traitent comme les lignes grâce à la vue transposée du plateau (voir rangees), qui partage ses
+    tableaux: le calcul des scores et les vérifications croisées la parcourent directement, sans copie, et n'ont
+    qu'une version, écrite pour les lignes. La génération de coups n'a elle aussi qu'une version, mais travaille sur
+    une copie des rangées (voir GenerateurCoups.preparer).
     """
     DIMENSION = 15
+    BONUS_LETTRE, BONUS_MOT = _disposition(DIMENSION)
+    ZOBRIST = _table_zobrist(DIMENSION * DIMENSION)
+    __CODES, __INDEX_CODES, __COORDONNEES, __VOISINS = _tables_positions(DIMENSION)
+    __RANGEES = _tables_rangees(DIMENSION)
 
     def __init__(self):
         """ *** Vous n'avez pas à coder cette méthode ***
@@ -242,24 +449,149 @@ class Plateau:
         Vous pouvez commencer par créer l'attribut cases en considérant qu'aucune case n'est spéciale.
         Regardez ensuite sur un vrai plateau de scrabble quelles positions sont spéciales, créer ces cases spéciales et
             remplacez les anciennes cases.
+        La disposition des cases spéciales est calculée une seule fois (voir BONUS_LETTRE et BONUS_MOT).
         """
-        self.cases = [[Case() for _ in range(Plateau.DIMENSION)] for _ in range(Plateau.DIMENSION)]
-        for (i, j) in [(0, 0), (0, 7), (0, 14), (7, 0), (7, 14), (14, 0), (14, 7), (14, 14)]:
-            self.cases[i][j] = Case(3, 'M')
-        for (i, j) in [(1, 5), (1, 9), (5, 1), (5, 5), (5, 9), (5, 13),
-                       (9, 1), (9, 5), (9, 9), (9, 13), (13, 5), (13, 9)]:
-            self.cases[i][j] = Case(3, 'L')
-        for i in [1, 2, 3, 4]:
-            self.cases[i][i] = Case(2, 'M')
-            self.cases[i][Plateau.DIMENSION - i - 1] = Case(2, 'M')
-            self.cases[Plateau.DIMENSION - i - 1][Plateau.DIMENSION - i - 1] = Case(2, 'M')
-            self.cases[Plateau.DIMENSION - i - 1][i] = Case(2, 'M')
-        for i, j in [(1, 1), (4, 0), (0, 4), (5, 1), (1, 5), (7, 4)]:
-            self.cases[7 - i][7 - j] = Case(2, 'L')
-            self.cases[7 + i][7 - j] = Case(2, 'L')
-            self.cases[7 - i][7 + j] = Case(2, 'L')
-            self.cases[7 + i][7 + j] = Case(2, 'L')
-        self.cases[7][7] = Case(2, 'M')
+        nb_cases = Plateau.DIMENSION * Plateau.DIMENSION
+        self.__jetons = [None] * nb_cases
+        self.__lettres = bytearray(nb_cases)
+        self.__valeurs = bytearray(nb_cases)
+        self.__vues = None
+        self.__rangees = None
+        self.__initialiser_index()
+
+    def __initialiser_index(self):
+        """
+        (Re)construit les index incrémentaux à partir du contenu des cases. Les listes sont indexées par
+            ligne * DIMENSION + colonne.
+        """
+        n = Plateau.DIMENSION
+        self.__nb_jetons = 0
+        self.__empreinte = 0
+        self.__voisins_occupes = [0] * (n * n)
+        self.__ancres = set()
+        self.__masques_lignes = [0] * n
+        self.__masques_colonnes = [0] * n
+        for index, code in enumerate(self.__lettres):
+            if code:
+                i, j = divmod(index, n)
+                self.__masques_lignes[i] |= 1 << j
+                self.__masques_colonnes[j] |= 1 << i
+                self.__nb_jetons += 1
+                self.__empreinte ^= Plateau.ZOBRIST[index][code - ORD_A]
+                for voisin in Plateau.__VOISINS[index]:
+                    self.__voisins_occupes[voisin] += 1
+        for index in range(n * n):
+            if self.__voisins_occupes[index] > 0 and not self.__lettres[index]:
+                self.__ancres.add(index)
+
+        # Une liste par direction de placement (horizontale, verticale)
+        self.__verifications = ([None] * (n * n), [None] * (n * n))
+        self.__a_verifier = set(range(n * n))
+        self.__lexique_verifications = None
+
+    def __getstate__(self):
+        # Tout se déduit des jetons (et le lexique n'est pas sérialisable): le reste est reconstruit au chargement
+        return {'jetons': self.__jetons}
+
+    def __setstate__(self, etat):
+        if 'cases' in etat:
+            # Partie sauvegardée avant le passage aux tableaux plats
+            jetons = [case.jeton_occupant for ligne in etat['cases'] for case in ligne]
+        else:
+            jetons = etat['jetons']
+        # Les jetons d'une ancienne sauvegarde ne sont pas encore les jetons partagés (voir Scrabble.lire_sauvegarde)
+        self.__jetons = [None if jeton is None else Jeton(jeton.lettre, jeton.valeur) for jeton in jetons]
+        self.__lettres = bytearray(0 if jeton is None else ord(jeton.lettre) for jeton in jetons)
+        self.__valeurs = bytearray(0 if jeton is None else jeton.valeur for jeton in jetons)
+        self.__vues = None
+        self.__rangees = None
+        self.__initialiser_index()
+
+    def copier(self):
+        """
+        Permet de copier le plateau sans le sérialiser: ses tableaux et ses index sont copiés tels quels (les
+            vérifications croisées déjà calculées restent donc valides). Les jetons, qui ne sont jamais modifiés, sont
+            partagés avec l'original.
+        :return: Plateau, une copie indépendante du plateau.
+        """
+        copie = Plateau.__new__(Plateau)
+        copie.__jetons = self.__jetons[:]
+        copie.__lettres = self.__lettres[:]
+        copie.__valeurs = self.__valeurs[:]
+        copie.__vues = None
+        copie.__rangees = None
+        copie.__nb_jetons = self.__nb_jetons
+        copie.__empreinte = self.__empreinte
+        copie.__voisins_occupes = self.__voisins_occupes[:]
+        copie.__ancres = set(self.__ancres)
+        copie.__masques_lignes = self.__masques_lignes[:]
+        copie.__masques_colonnes = self.__masques_colonnes[:]
+        copie.__verifications = (self.__verifications[0][:], self.__verifications[1][:])
+        copie.__a_verifier = set(self.__a_verifier)
+        copie.__lexique_verifications = self.__lexique_verifications
+        return copie
+
+    @property
+    def cases(self):
+        """
+        Vues des cases du plateau, pour l'interface: cases[i][j] est la case de la ligne i et de la colonne j.
+        :return: Case list list, les cases du plateau (créées une seule fois).
+        """
+        if self.__vues is None:
+            n = Plateau.DIMENSION
+            self.__vues = [[VueCase(self, i * n + j) for j in range(n)] for i in range(n)]
+        return self.__vues
+
+    @property
+    def lettres(self):
+        """
+        :return: bytearray, le code de la lettre posée sur chaque case (ligne * DIMENSION + colonne), 0 si la case est
+                vide. Ne pas modifier.
+        """
+        return self.__lettres
+
+    @property
+    def valeurs(self):
+        """
+        :return: bytearray, la valeur du jeton posé sur chaque case (ligne * DIMENSION + colonne), 0 si la case est
+                vide. Ne pas modifier.
+        """
+        return self.__valeurs
+
+    def jeton(self, index):
+        """
+        :param index: int, l'index d'une case (ligne * DIMENSION + colonne).
+        :return: Jeton, le jeton posé sur la case, None si elle est vide.
+        """
+        return self.__jetons[index]
+
+    def rangees(self, horizontal):
+        """
+        Permet d'obtenir les lignes du plateau ou, transposées, ses colonnes, sans copier ses tableaux (voir
+            VueRangees).
+        :param horizontal: bool, True pour les lignes, False pour les colonnes.
+        :return: VueRangees, la vue des rangées, partagée et toujours à jour.
+        """
+        if self.__rangees is None:
+            self.__rangees = (VueRangees(self.__lettres, self.__valeurs, True),
+                              VueRangees(self.__lettres, self.__valeurs, False))
+        return self.__rangees[0 if horizontal else 1]
+
+    @staticmethod
+    def index_rangees(horizontal):
+        """
+        :param horizontal: bool, True pour les lignes, False pour les colonnes.
+        :return: tuple tuple, l'index (ligne * DIMENSION + colonne) de la case c de la rangée r, à [r][c].
+        """
+        return Plateau.__RANGEES[0 if horizontal else 1][0]
+
+    @staticmethod
+    def coordonnees_rangees(horizontal):
+        """
+        :param horizontal: bool, True pour les lignes, False pour les colonnes.
+        :return: tuple tuple, la rangée et la position dans la rangée de chaque index (l'inverse de index_rangees).
+        """
+        return Plateau.__RANGEES[0 if horizontal else 1][1]
 
     @staticmethod
     def code_position_est_valide(code):
@@ -269,6 +601,10 @@ class Plateau:
         :return: True si le code passé en argument est un code de positionnement au format « XY » ou « xy » valide.
                 En gros, c'est insensible à la casse.
         """
+        if code in Plateau.__INDEX_CODES:
+            return True
+
+        # Codes absents de la table: invalides, ou écrits autrement (ex: « a01 », « A8 » en casse mixte)
         code = code.upper()
         valide = 2 <= len(code) <= 3 and code[0].isalpha() and code[1:].isdigit()
         if valide:
@@ -289,20 +625,45 @@ class Plateau:
         :exception: Levez une exception avec assert si le code de la position est invalide. Pensez à utiliser
             Plateau.code_position_est_valide.
         """
-        if not Plateau.code_position_est_valide(code):
-            raise PositionInvalidError
-        code = code.upper()
-        index_ligne = ord(code[0]) - ord('A')
-        index_colonne = int(code[1:]) - 1
-        return index_ligne, index_colonne
+        return Plateau.__COORDONNEES[Plateau.index_position(code)]
 
     @staticmethod
     def encode_position(ligne, column):
         """
-        TODO: DOC (see above)
+        Méthode statique servant à transformer des index de ligne et de colonne en code de positionnement.
+        :param ligne: int, l'index de la ligne.
+        :param column: int, l'index de la colonne.
+        :return: str, le code de positionnement au format « XY ».
         """
+        if 0 <= ligne < Plateau.DIMENSION and 0 <= column < Plateau.DIMENSION:
+            return Plateau.__CODES[ligne * Plateau.DIMENSION + column]
         return format("{}{}".format(chr(ligne + ord('A')), column+1))
 
+    @staticmethod
+    def index_position(code):
+        """
+        Méthode statique servant à transformer un code de positionnement en index de case, par une seule consultation
+            de table dans le cas courant.
+        :param code: str au format « XY » ou « xy » représentant un code de positionnement.
+        :return: int, l'index de la case (ligne * DIMENSION + colonne).
+        :exception: PositionInvalidError si le code de la position est invalide.
+        """
+        index = Plateau.__INDEX_CODES.get(code)
+        if index is None:
+            if not Plateau.code_position_est_valide(code):
+                raise PositionInvalidError
+            code = code.upper()
+            index = (ord(code[0]) - ORD_A) * Plateau.DIMENSION + int(code[1:]) - 1
+        return index
+
+    @staticmethod
+    def code_position(index):
+        """
+        :param index: int, l'index d'une case (ligne * DIMENSION + colonne).
+        :return: str, le code de positionnement de la case au format « XY ».
+        """
+        return Plateau.__CODES[index]
+
     def case_est_vide(self, position_code):
         """
         Permet de déterminer si une case est vide, c'est-à-dire qu'elle ne contient pas de jeton.
@@ -310,15 +671,48 @@ class Plateau:
         :return: True si la case est vide, False sinon.
         :exception: Levez une exception avec assert si le code de la position est invalide.
         """
-        index_ligne, index_colonne = Plateau.decode_position(position_code)
-        return self.cases[index_ligne][index_colonne].est_vide()
+        return not self.__lettres[Plateau.index_position(position_code)]
+
+    def case_est_vide_index(self, index):
+        """
+        Comme case_est_vide, pour l'index d'une case (0 <= index < DIMENSION * DIMENSION, non vérifié).
+        """
+        return not self.__lettres[index]
 
     def est_vide(self):
         """
         Permet de déterminer si le plateau est vide, c'est à dire que toutes les cases sont vides.
         :return: True si le plateau est vide, False sinon.
         """
-        return all([case.est_vide() for ligne in self.cases for case in ligne])
+        return self.__nb_jetons == 0
+
+    @property
+    def nb_jetons(self):
+        """
+        :return: int, le nombre de jetons posés sur le plateau.
+        """
+        return self.__nb_jetons
+
+    @property
+    def empreinte(self):
+        """
+        Empreinte de Zobrist du plateau: le ou exclusif des nombres Plateau.ZOBRIST[case][lettre] de chaque jeton posé.
+            Elle est mise à jour en temps constant par ajouter_jeton et retirer_jeton, et deux plateaux portant les
+            mêmes lettres aux mêmes cases ont la même empreinte, quel que soit l'ordre des coups.
+        :return: int, l'empreinte du plateau sur 64 bits (0 pour un plateau vide).
+        """
+        return self.__empreinte
+
+    def ancres(self):
+        """
+        Permet d'obtenir les ancres du plateau: les cases vides adjacentes à au moins un jeton, ou la case centrale si le
+            plateau est vide. Tout placement valide couvre au moins une ancre.
+        :return: int set, les index (ligne * DIMENSION + colonne) des ancres. Ne pas modifier.
+        """
+        if self.__nb_jetons == 0:
+            centre = Plateau.DIMENSION // 2
+            return {centre * Plateau.DIMENSION + centre}
+        return self.__ancres
 
     def ajouter_jeton(self, jeton, position_code):
         """
@@ -329,12 +723,31 @@ class Plateau:
         :return: Ne retourne rien.
         :exception: Levez une exception avec assert si le code de la position est invalide ou la case n'est pas vide.
         """
-        index_ligne, index_colonne = Plateau.decode_position(position_code)
+        self.ajouter_jeton_index(jeton, Plateau.index_position(position_code))
 
-        if not self.case_est_vide(position_code):
+    def ajouter_jeton_index(self, jeton, index):
+        """
+        Comme ajouter_jeton, pour l'index d'une case (0 <= index < DIMENSION * DIMENSION, non vérifié).
+        """
+        if self.__lettres[index]:
             raise PositionNonVideError
 
-        self.cases[index_ligne][index_colonne].placer_jeton(jeton)
+        code = ord(jeton.lettre)
+        self.__jetons[index] = jeton
+        self.__lettres[index] = code
+        self.__valeurs[index] = jeton.valeur
+
+        index_ligne, index_colonne = Plateau.__COORDONNEES[index]
+        self.__nb_jetons += 1
+        self.__empreinte ^= Plateau.ZOBRIST[index][code - ORD_A]
+        self.__masques_lignes[index_ligne] |= 1 << index_colonne
+        self.__masques_colonnes[index_colonne] |= 1 << index_ligne
+        self.__ancres.discard(index)
+        for voisin in Plateau.__VOISINS[index]:
+            self.__voisins_occupes[voisin] += 1
+            if not self.__lettres[voisin]:
+                self.__ancres.add(voisin)
+        self.__marquer_voisinage(index_ligne, index_colonne)
 
     def retirer_jeton(self, position_code):
         """
@@ -344,14 +757,107 @@ class Plateau:
                 pour les objets de type Case.
         :exception: Levez une exception avec assert si le code de la position est invalide ou la case n'est pas vide.
         """
-        index_ligne, index_colonne = Plateau.decode_position(position_code)
+        return self.retirer_jeton_index(Plateau.index_position(position_code))
 
-        if self.case_est_vide(position_code):
+    def retirer_jeton_index(self, index):
+        """
+        Comme retirer_jeton, pour l'index d'une case (0 <= index < DIMENSION * DIMENSION, non vérifié).
+        """
+        if not self.__lettres[index]:
             raise PositionVideError
 
-        jeton = self.cases[index_ligne][index_colonne].retirer_jeton()
+        jeton = self.__jetons[index]
+        self.__jetons[index] = None
+        self.__lettres[index] = 0
+        self.__valeurs[index] = 0
+
+        index_ligne, index_colonne = Plateau.__COORDONNEES[index]
+        self.__nb_jetons -= 1
+        self.__empreinte ^= Plateau.ZOBRIST[index][ord(jeton.lettre) - ORD_A]
+        self.__masques_lignes[index_ligne] &= ~(1 << index_colonne)
+        self.__masques_colonnes[index_colonne] &= ~(1 << index_ligne)
+        for voisin in Plateau.__VOISINS[index]:
+            self.__voisins_occupes[voisin] -= 1
+            if self.__voisins_occupes[voisin] == 0:
+                self.__ancres.discard(voisin)
+        if self.__voisins_occupes[index] > 0:
+            self.__ancres.add(index)
+        self.__marquer_voisinage(index_ligne, index_colonne)
         return jeton
 
+    def __marquer_voisinage(self, index_ligne, index_colonne):
+        """
+        Marque les cases dont les vérifications croisées changent lorsque la case donnée change: la case elle-même et,
+            dans chaque direction, la première case vide au-delà des jetons contigus.
+        """
+        n, lettres = Plateau.DIMENSION, self.__lettres
+        self.__a_verifier.add(index_ligne * n + index_colonne)
+        for delta_ligne, delta_colonne in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            i, j = index_ligne + delta_ligne, index_colonne + delta_colonne
+            while 0 <= i < n and 0 <= j < n and lettres[i * n + j]:
+                i, j = i + delta_ligne, j + delta_colonne
+            if 0 <= i < n and 0 <= j < n:
+                self.__a_verifier.add(i * n + j)
+
+    def verifications_croisees(self, lexique, horizontal):
+        """
+        Permet d'obtenir, pour chaque case vide, les lettres qui peuvent y être posées en formant un mot perpendiculaire
+            valide. Seules les cases modifiées depuis le dernier appel (ou toutes si le lexique change) sont recalculées.
+            Le résultat est conservé dans le plateau, que l'appel modifie donc même s'il ne change aucun jeton: il ne
+            doit pas être fait sur le plateau de la partie depuis un autre fil d'exécution (voir copier).
+        :param lexique: Lexique, le lexique de la partie.
+        :param horizontal: bool, True pour un placement sur une ligne (les mots perpendiculaires sont sur les colonnes),
+                False pour un placement sur une colonne.
+        :return: list, indexée par ligne * DIMENSION + colonne. Chaque élément est None si la case est occupée ou n'a
+                aucun voisin perpendiculaire (toutes les lettres sont permises), sinon un tuple (int, int, str, str):
+                le masque des lettres permises (bit 0 pour A), la somme des valeurs des jetons perpendiculaires et les
+                lettres perpendiculaires avant et après la case.
+        """
+        if lexique is not self.__lexique_verifications:
+            self.__lexique_verifications = lexique
+            self.__a_verifier = set(range(Plateau.DIMENSION * Plateau.DIMENSION))
+
+        if self.__a_verifier:
+            for index in self.__a_verifier:
+                i, j = divmod(index, Plateau.DIMENSION)
+                self.__verifications[0][index] = self.__calculer_verification(lexique, i, j, True)
+                self.__verifications[1][index] = self.__calculer_verification(lexique, i, j, False)
+            self.__a_verifier = set()
+
+        return self.__verifications[0 if horizontal else 1]
+
+    def __calculer_verification(self, lexique, index_ligne, index_colonne, horizontal):
+        if self.__lettres[index_ligne * Plateau.DIMENSION + index_colonne]:
+            return None
+
+        # Le mot perpendiculaire d'un placement horizontal est sur la colonne de la case, et inversement
+        vue = self.rangees(not horizontal)
+        rangee, position = (index_colonne, index_ligne) if horizontal else (index_ligne, index_colonne)
+        lettres, valeurs = vue.lettres[rangee], vue.valeurs[rangee]
+
+        debut = position
+        while debut > 0 and lettres[debut - 1]:
+            debut -= 1
+        fin = position + 1
+        while fin < Plateau.DIMENSION and lettres[fin]:
+            fin += 1
+        if debut == position and fin == position + 1:
+            return None
+
+        avant = lettres[debut:position].tobytes().decode('ascii')
+        apres = lettres[position + 1:fin].tobytes().decode('ascii')
+        somme = sum(valeurs[debut:position]) + sum(valeurs[position + 1:fin])
+
+        graphe = lexique.graphe
+        masque = 0
+        noeud = graphe.suivre(avant)
+        if noeud is not None:
+            for lettre, enfant in graphe.enfants(noeud):
+                fin_mot = graphe.suivre(apres, enfant)
+                if fin_mot is not None and graphe.terminaux[fin_mot]:
+                    masque |= 1 << (ord(lettre) - ORD_A)
+        return masque, somme, avant, apres
+
     def cases_adjacentes_occupees(self, position_code):
         """ *** Vous n'avez pas à coder cette méthode ***
         Étant donnée une position, cette méthode permet de voir si au moins l'une de ses positions voisines est occupée.
@@ -361,14 +867,13 @@ class Plateau:
         :return: True si au moins l'une des cases voisines est occupée, False si aucune case voisine n'est occupée.
         :exception: Levez une exception avec assert si le code de la position est invalide
         """
-        index_ligne, index_colonne = Plateau.decode_position(position_code)
-        voisins = [(index_ligne, index_colonne - 1),
-                   (index_ligne, index_colonne + 1),
-                   (index_ligne + 1, index_colonne),
-                   (index_ligne - 1, index_colonne)]
-        voisins = [(i, j) for i, j in voisins if (0 <= i < Plateau.DIMENSION)
-                   and (0 <= j < Plateau.DIMENSION)]
-        return any([not self.cases[i][j].est_vide() for (i, j) in voisins])
+        return self.__voisins_occupes[Plateau.index_position(position_code)] > 0
+
+    def cases_adjacentes_occupees_index(self, index):
+        """
+        Comme cases_adjacentes_occupees, pour l'index d'une case (0 <= index < DIMENSION * DIMENSION, non vérifié).
+        """
+        return self.__voisins_occupes[index] > 0
 
     def valider_positions_avant_ajout(self, positions_codes):
         """ *** Vous n'avez pas à coder cette méthode ***
@@ -386,30 +891,50 @@ class Plateau:
          - si le plateau est vide, le centre du plateau doit être dans les positions;
          - sinon, au moins une des positions doit être adjacente à une des cases occupées
          du plateau (Pensez à réutilisez cases_adjacentes_occupees et case_est_vide).
+        Les positions sont ramenées à un masque de bits sur leur ligne (ou colonne) commune: chaque règle se vérifie
+            alors sur les masques d'occupation du plateau en quelques opérations sur des entiers.
         :param positions_codes: str list, liste de string représentant les positions où on veut ajouter des jetons.
         :return: True si les positions sont valides, False sinon.
         :exception: Levez une exception avec assert si le code d'une des positions est invalide.
         """
-        positions_decodees = [Plateau.decode_position(p) for p in positions_codes]
-        lignes, cols = zip(*positions_decodees)
-        lignes, cols = list(set(lignes)), list(set(cols))
-        meme_ligne, meme_col = len(lignes) == 1, len(cols) == 1
-        valide = meme_ligne or meme_col
-        valide = valide and all([self.case_est_vide(p) for p in positions_codes])
-        if valide:
-            if self.est_vide():
-                valide = (7, 7) in positions_decodees
-            else:
-                valide = any([self.cases_adjacentes_occupees(pos) for pos in positions_codes])
+        return self.valider_index_avant_ajout([Plateau.index_position(p) for p in positions_codes])
+
+    def valider_index_avant_ajout(self, index_cases):
+        """
+        Comme valider_positions_avant_ajout, pour les index des cases (0 <= index < DIMENSION * DIMENSION, non
+            vérifiés).
+        """
+        n = Plateau.DIMENSION
+        lignes = {index // n for index in index_cases}
+        cols = {index % n for index in index_cases}
+        if len(lignes) == 1:
+            # Placement sur une ligne: les colonnes sont les bits, les lignes voisines sont au-dessus et au-dessous
+            rangee, bits, masques = lignes.pop(), sum(1 << col for col in cols), self.__masques_lignes
+        elif len(cols) == 1:
+            rangee, bits, masques = cols.pop(), sum(1 << ligne for ligne in lignes), self.__masques_colonnes
+        else:
+            return False
 
-            if valide and meme_ligne:
-                ligne, n, m = lignes[0], min(cols), max(cols)
-                valide = all([(not self.cases[ligne][i].est_vide()) for i in range(n, m + 1) if i not in cols])
-            elif valide and meme_col:
-                col, n, m = cols[0], min(lignes), max(lignes)
-                valide = all([(not self.cases[i][col].est_vide()) for i in range(n, m + 1) if i not in lignes])
+        occupees = masques[rangee]
+        if occupees & bits:
+            return False
 
-        return valide
+        if self.__nb_jetons == 0:
+            centre = Plateau.DIMENSION // 2
+            if centre * n + centre not in index_cases:
+                return False
+        else:
+            voisines = occupees & ((bits << 1) | (bits >> 1))
+            if rangee > 0:
+                voisines |= masques[rangee - 1] & bits
+            if rangee < Plateau.DIMENSION - 1:
+                voisines |= masques[rangee + 1] & bits
+            if not voisines:
+                return False
+
+        # Les cases entre la première et la dernière position doivent toutes être couvertes
+        etendue = (1 << bits.bit_length()) - (bits & -bits)
+        return etendue & ~(occupees | bits) == 0
 
     def placer_mots(self, jetons_a_ajouter, position_codes):
         """
@@ -423,13 +948,19 @@ class Plateau:
             - Le second élément est le score obtenu si l'ajout a été fait, 0 sinon.
         :exception: Levez une exception avec assert si les positions sont invalides.
         """
-        if not self.valider_positions_avant_ajout(position_codes):
+        return self.placer_mots_index(jetons_a_ajouter, [Plateau.index_position(p) for p in position_codes])
+
+    def placer_mots_index(self, jetons_a_ajouter, index_cases):
+        """
+        Comme placer_mots, pour les index des cases (0 <= index < DIMENSION * DIMENSION, non vérifiés).
+        """
+        if not self.valider_index_avant_ajout(index_cases):
             raise PositionInvalidError()
 
-        for jeton, pos in zip(jetons_a_ajouter, position_codes):
-            self.ajouter_jeton(jeton, pos)
+        for jeton, index in zip(jetons_a_ajouter, index_cases):
+            self.ajouter_jeton_index(jeton, index)
 
-        mots, score = self.mots_score_obtenus(position_codes)
+        mots, score = self.mots_score_obtenus_index(index_cases)
         return mots, score
 
     def mots_score_obtenus(self, nouvelles_positions):
@@ -440,25 +971,84 @@ class Plateau:
             des jetons ont été ajoutés.
         :return: L'ensemble des mots formés par l'ajout de jetons aux nouvelles positions.
         """
-        positions_decodees = [Plateau.decode_position(p) for p in nouvelles_positions]
+        return self.mots_score_obtenus_index([Plateau.index_position(p) for p in nouvelles_positions])
+
+    def mots_score_obtenus_index(self, index_cases):
+        """
+        Comme mots_score_obtenus, pour les index des cases (0 <= index < DIMENSION * DIMENSION, non vérifiés).
+        """
+        jetons = self.__jetons
+        return self.__mots_et_score({index: jetons[index] for index in index_cases if jetons[index] is not None},
+                                    index_cases)
+
+    def evaluer_coup(self, chevalet, moves):
+        """
+        Permet d'évaluer un coup sans le jouer: le plateau n'est pas modifié. Plusieurs fils d'exécution peuvent donc
+            évaluer des coups en même temps sur un même plateau, tant qu'aucun ne le modifie.
+        :param chevalet: Jeton list, les jetons du chevalet du joueur (voir Joueur.jetons).
+        :param moves: dict, le code de la case du plateau où placer chaque jeton joué, par position sur le chevalet
+                (voir Joueur.moves).
+        :return: tuple (bool, str list, int): True si les positions sont valides (voir valider_positions_avant_ajout),
+                puis les mots formés et le score obtenu si le coup était joué (liste vide et 0 si les positions ne
+                sont pas valides). Les mots ne sont pas cherchés dans le dictionnaire.
+        """
+        jetons, index_cases = [], []
+        for position_chevalet, position_code in moves.items():
+            if not 0 <= position_chevalet < len(chevalet) or chevalet[position_chevalet] is None \
+                    or not Plateau.code_position_est_valide(position_code):
+                return False, [], 0
+            jetons.append(chevalet[position_chevalet])
+            index_cases.append(Plateau.index_position(position_code))
+        return self.evaluer_coup_index(jetons, index_cases)
+
+    def evaluer_coup_index(self, jetons, index_cases):
+        """
+        Comme evaluer_coup, pour des jetons et les index des cases où les placer (0 <= index < DIMENSION * DIMENSION,
+            non vérifiés).
+        """
+        if not index_cases or len(set(index_cases)) != len(index_cases) \
+                or not self.valider_index_avant_ajout(index_cases):
+            return False, [], 0
+        mots, score = self.__mots_et_score(dict(zip(index_cases, jetons)), index_cases)
+        return True, mots, score
+
+    def __mots_et_score(self, nouvelles, index_cases):
+        """
+        Trouve les mots formés par de nouveaux jetons et le score obtenu.
+        :param nouvelles: dict, le nouveau jeton de chaque index de case, qu'il soit déjà posé ou non.
+        :param index_cases: int list, les index des cases des nouveaux jetons, dans l'ordre du coup.
+        :return: tuple (str list, int), les mots formés et le score obtenu.
+        """
+        par_ligne, par_colonne = {}, {}
+        for index in sorted(set(index_cases)):
+            ligne, col = Plateau.__COORDONNEES[index]
+            par_ligne.setdefault(ligne, []).append(col)
+            par_colonne.setdefault(col, []).append(ligne)
+
+        # Les lignes et les colonnes sont parcourues dans le même ordre que les positions d'origine
         score_total = 0
-        lignes, cols = zip(*positions_decodees)
+        lignes, cols = zip(*(Plateau.__COORDONNEES[index] for index in index_cases))
         mots = []
         for ligne in set(lignes):
-            lmots, score = self.__mots_et_score_sur_ligne_ou_colonne(positions_decodees, ligne)
+            lmots, score = self.__mots_et_score_sur_ligne_ou_colonne(nouvelles, par_ligne[ligne], ligne)
             mots += lmots
             score_total += score
         for col in set(cols):
-            lmots, score = self.__mots_et_score_sur_ligne_ou_colonne(positions_decodees, colonne=col)
+            lmots, score = self.__mots_et_score_sur_ligne_ou_colonne(nouvelles, par_colonne[col], colonne=col)
             mots += lmots
             score_total += score
         return mots, score_total
 
-    def __mots_et_score_sur_ligne_ou_colonne(self, positions_decodees, ligne=None, colonne=None):
+    def __mots_et_score_sur_ligne_ou_colonne(self, nouvelles, sur_rangee, ligne=None, colonne=None):
         """ *** Vous n'avez pas à coder cette méthode ***
         Permet de trouver les mots sur une ligne ou une colonne et le score associé.
-        :param positions_decodees:  str list, liste de chaînes de caractères représentant les dernières positions où
-                des jetons ont été ajoutés.
+        Seuls les mots passant par une nouvelle position sont parcourus: à partir de chacune, on avance vers chaque
+            extrémité du mot tant que les cases sont occupées. Le coût dépend donc de la longueur des mots formés, et
+            non de la taille du plateau.
+        :param nouvelles: dict, le jeton de chacun des index (ligne * DIMENSION + colonne) des dernières positions où
+                des jetons ont été ajoutés. Ces jetons sont lus dans nouvelles: ils n'ont pas à être déjà posés.
+        :param sur_rangee: int list, la position sur la ligne (colonne) ou sur la colonne (ligne) de ceux de ces index
+                qui y sont, en ordre croissant.
         :param ligne: (int, optionel), index de la ligne d'intérêt
         :param colonne: (int, optionel), index de la colonne d'intérêt
         :return: tuple (str list, int), la liste des mots trouvés sur la ligne ou la colonne et le score total.
@@ -470,27 +1060,38 @@ class Plateau:
         if ((ligne is None) and (colonne is None)) or ((ligne is not None) and (colonne is not None)):
             raise ScrabbleSystemError("Précisez seulement la ligne ou la colonne, pas les deux.")
 
-        mots, score_total = [], 0
-        mot, score_mot, multiplicateur, pos_mot = "", 0, 1, []
-        for i in range(Plateau.DIMENSION):
-            pos = (ligne, i) if ligne is not None else (i, colonne)
-            case = self.cases[pos[0]][pos[1]]
-            if case.est_vide():
-                if len(mot) > 1 and any([p in pos_mot for p in positions_decodees]):
-                    mots.append(mot)
-                    score_total += score_mot * multiplicateur
-                mot, score_mot, multiplicateur, pos_mot = "", 0, 1, []
-            else:
-                mot += case.lettre_jeton()
-                pos_mot.append(pos)
-                if pos in positions_decodees and case.type == "L":
-                    score_mot += case.valeur_jeton() * case.multiplicateur
+        # Une colonne est parcourue comme une ligne de la vue transposée
+        vue = self.rangees(ligne is not None)
+        rangee = ligne if ligne is not None else colonne
+        lettres, valeurs, cases = vue.lettres[rangee], vue.valeurs[rangee], vue.index[rangee]
+        bonus_lettre, bonus_mot = vue.bonus_lettre[rangee], vue.bonus_mot[rangee]
+        n = Plateau.DIMENSION
+
+        mots, score_total, fin = [], 0, -1
+        for position in sur_rangee:
+            if position < fin or cases[position] not in nouvelles:
+                # Position déjà comptée dans le mot précédent, ou restée vide
+                continue
+            debut = position
+            while debut > 0 and (lettres[debut - 1] or cases[debut - 1] in nouvelles):
+                debut -= 1
+            fin = position + 1
+            while fin < n and (lettres[fin] or cases[fin] in nouvelles):
+                fin += 1
+            if fin - debut == 1:
+                continue
+
+            mot, score_mot, multiplicateur = [], 0, 1
+            for c in range(debut, fin):
+                jeton = nouvelles.get(cases[c])
+                if jeton is not None:
+                    mot.append(jeton.lettre)
+                    score_mot += jeton.valeur * bonus_lettre[c]
+                    multiplicateur *= bonus_mot[c]
                 else:
-                    score_mot += case.valeur_jeton()
-                if pos in positions_decodees and case.type == "M":
-                    multiplicateur *= case.multiplicateur
-        if len(mot) > 1 and any([p in pos_mot for p in positions_decodees]):
-            mots.append(mot)
+                    mot.append(chr(lettres[c]))
+                    score_mot += valeurs[c]
+            mots.append(''.join(mot))
             score_total += score_mot * multiplicateur
 
         return mots, score_total
@@ -523,3 +1124,30 @@ class Plateau:
             chaine += "{:^5d}".format(colonne+1)
         chaine += '\n'
         return chaine
+
+
+if __name__ == '__main__':
+    # Banc d'essai de la validation et de l'évaluation des placements: python -m tp4.plateau [répétitions]
+    import sys
+    from timeit import timeit
+
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    plateau = Plateau()
+    for colonne, lettre in enumerate('SCRABBLE', 4):
+        plateau.ajouter_jeton(Jeton(lettre, 1), 'H{}'.format(colonne))
+
+    placements = {"7 jetons sur une ligne": ['I1', 'I2', 'I3', 'I4', 'I5', 'I6', 'I7'],
+                  "7 jetons sur une colonne, autour d'un jeton": ['B5', 'C5', 'D5', 'E5', 'F5', 'G5', 'I5'],
+                  "7 jetons avec un trou": ['I1', 'I2', 'I3', 'I5', 'I6', 'I7', 'I8'],
+                  "7 jetons sans voisin": ['A1', 'A2', 'A3', 'A4', 'A5', 'A6', 'A7']}
+    for description, positions in placements.items():
+        duree = timeit(lambda: plateau.valider_positions_avant_ajout(positions), number=repetitions)
+        print("{} ({}): {:.2f} µs".format(description, plateau.valider_positions_avant_ajout(positions),
+                                          duree / repetitions * 1e6))
+
+    chevalet = [Jeton(lettre, 2) for lettre in 'MOTIVER']
+    for description, positions in placements.items():
+        moves = dict(enumerate(positions))
+        duree = timeit(lambda: plateau.evaluer_coup(chevalet, moves), number=repetitions)
+        print("Évaluation, {} {}: {:.2f} µs".format(description.lower(), plateau.evaluer_coup(chevalet, moves),
+                                                     duree / repetitions * 1e6))
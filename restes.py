@@ -0,0 +1,272 @@
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import combinations_with_replacement
+from threading import Lock
+from tp4.error import *
+from tp4.joueur import Joueur
+from tp4.lexique import ORD_A
+
+NB_LETTRES = 26
+TAILLE_MAX = Joueur.TAILLE_CHEVALET - 1
+
+# BINOMIAUX[n][k] = C(n, k), pour tous les rangs possibles d'un reste
+BINOMIAUX = [[1] + [0] * TAILLE_MAX]
+for _n in range(1, NB_LETTRES + TAILLE_MAX):
+    BINOMIAUX.append([1] + [BINOMIAUX[-1][_k - 1] + BINOMIAUX[-1][_k] for _k in range(1, TAILLE_MAX + 1)])
+
+# DEBUTS[k] = nombre de restes de moins de k lettres, soit l'index du premier reste de k lettres
+DEBUTS = [0]
+for _k in range(TAILLE_MAX + 1):
+    DEBUTS.append(DEBUTS[-1] + BINOMIAUX[NB_LETTRES + _k - 1][_k])
+
+
+class TableRestes:
+    """
+    Table de l'équité des restes d'une langue: pour chaque multiensemble de lettres pouvant rester sur un chevalet
+    après un coup (jusqu'à Joueur.TAILLE_CHEVALET - 1 lettres), le nombre de points que ce reste rapporte au tour
+    suivant, par rapport à un reste moyen. La table est produite hors ligne par des parties de l'ordinateur contre
+    lui-même (python -m tp4.restes FR).
+
+    Chaque reste a un index dans un tableau dense: ses lettres triées a1 <= a2 <= ... <= ak (de 0 à 25) deviennent
+    l'ensemble strictement croissant a1 < a2 + 1 < ... < ak + k - 1, dont le rang dans le système combinatoire est
+    C(a1, 1) + C(a2 + 1, 2) + ... + C(ak + k - 1, k). L'index est ce rang plus le nombre de restes plus courts: une
+    consultation ne coûte qu'un tri d'au plus 6 lettres et autant d'additions.
+
+    Les valeurs sont stockées en 1 / TableRestes.UNITE de point dans un array d'octets signés, compressé dans le fichier.
+
+    Une table a pour attributs:
+    - valeurs: array('b'), la valeur de chaque reste, en ordre d'index.
+    """
+    FICHIERS = {'FR': 'restes_francais.bin', 'EN': 'restes_anglais.bin'}
+    UNITE = 2
+    VERSION = 1
+    __ENTETE = struct.Struct('<6sHBI')
+    __MAGIE = b'TP4RST'
+
+    __tables = {}
+    __verrou = Lock()
+
+    def __init__(self, valeurs):
+        """
+        :param valeurs: array('b'), la valeur de chaque reste, en ordre d'index (voir TableRestes.index).
+        :exception: ScrabbleSystemError si le nombre de valeurs ne correspond pas au nombre de restes.
+        """
+        if len(valeurs) != DEBUTS[-1]:
+            raise ScrabbleSystemError('La table des restes doit contenir {} valeurs.'.format(DEBUTS[-1]))
+        self.valeurs = valeurs
+
+    @staticmethod
+    def index(lettres):
+        """
+        :param lettres: str, les lettres d'un reste (de A à Z, au plus TAILLE_MAX lettres, dans n'importe quel ordre).
+        :return: int, l'index du reste dans la table.
+        """
+        index = DEBUTS[len(lettres)]
+        for i, lettre in enumerate(sorted(lettres)):
+            index += BINOMIAUX[ord(lettre) - ORD_A + i][i + 1]
+        return index
+
+    @staticmethod
+    def restes(taille):
+        """
+        :param taille: int, un nombre de lettres.
+        :return: str generator, tous les restes de cette taille, les lettres de chacun en ordre alphabétique.
+        """
+        for codes in combinations_with_replacement(range(ORD_A, ORD_A + NB_LETTRES), taille):
+            yield bytes(codes).decode('ascii')
+
+    def valeur(self, lettres):
+        """
+        :param lettres: str, les lettres d'un reste (au plus TAILLE_MAX lettres).
+        :return: float, le nombre de points que rapporte ce reste par rapport à un reste moyen.
+        """
+        return self.valeurs[TableRestes.index(lettres)] / TableRestes.UNITE
+
+    def sauvegarder(self, nom_fichier):
+        """
+        Écrit la table dans un fichier binaire compressé.
+        :param nom_fichier: str, le chemin du fichier.
+        :return: rien
+        """
+        nom_temporaire = '{}.{}.tmp'.format(nom_fichier, os.getpid())
+        with open(nom_temporaire, 'wb') as f:
+            f.write(TableRestes.__ENTETE.pack(TableRestes.__MAGIE, TableRestes.VERSION, TAILLE_MAX, len(self.valeurs)))
+            f.write(zlib.compress(self.valeurs.tobytes(), 9))
+        os.replace(nom_temporaire, nom_fichier)
+
+    @staticmethod
+    def charger(nom_fichier):
+        """
+        Lit une table écrite par TableRestes.sauvegarder.
+        :param nom_fichier: str, le chemin du fichier.
+        :return: TableRestes, la table lue.
+        :exception: ScrabbleSystemError si le fichier n'est pas une table de cette version.
+        """
+        with open(nom_fichier, 'rb') as f:
+            donnees = f.read()
+        taille_entete = TableRestes.__ENTETE.size
+        try:
+            magie, version, taille_max, nb_valeurs = TableRestes.__ENTETE.unpack(donnees[:taille_entete])
+            valeurs = array('b', zlib.decompress(donnees[taille_entete:]))
+        except (struct.error, zlib.error):
+            raise ScrabbleSystemError('Table des restes {} illisible.'.format(nom_fichier))
+        if magie != TableRestes.__MAGIE or version != TableRestes.VERSION or taille_max != TAILLE_MAX \
+                or len(valeurs) != nb_valeurs:
+            raise ScrabbleSystemError('Table des restes {} incompatible.'.format(nom_fichier))
+        return TableRestes(valeurs)
+
+    @staticmethod
+    def obtenir(langue):
+        """
+        Permet d'obtenir la table des restes d'une langue, chargée une seule fois par processus.
+        :param langue: str, FR ou EN (insensible à la casse).
+        :return: TableRestes, la table de la langue, ou None si elle n'a pas été générée.
+        """
+        langue = langue.upper()
+        table = TableRestes.__tables.get(langue)
+        if table is not None:
+            return table
+
+        with TableRestes.__verrou:
+            if langue not in TableRestes.__tables:
+                nom_fichier = TableRestes.FICHIERS.get(langue)
+                table = None
+                if nom_fichier is not None and os.path.exists(nom_fichier):
+                    table = TableRestes.charger(nom_fichier)
+                TableRestes.__tables[langue] = table
+            return TableRestes.__tables[langue]
+
+
+def observer_parties(langue, nb_parties, hasard):
+    """
+    Fait jouer l'ordinateur contre lui-même et observe, pour chaque coup joué tant que le sac n'est pas vide, le
+        reste du chevalet et le score du coup suivant du même joueur.
+    :param langue: str, FR ou EN.
+    :param nb_parties: int, le nombre de parties à jouer.
+    :param hasard: Random, le générateur de nombres aléatoires.
+    :return: dict, pour chaque reste (lettres triées), la liste [somme des scores suivants, nombre d'observations].
+    """
+    from tp4.generateur import GenerateurCoups
+    from tp4.joueur_ia import StrategieReste
+    from tp4.lexique import RegistreLexiques
+    from tp4.plateau import Plateau, Jeton
+    from tp4.scrabble import Scrabble
+
+    generateur = GenerateurCoups(RegistreLexiques.obtenir(langue))
+    strategie = StrategieReste()
+    observations = {}
+
+    for numero in range(nb_parties):
+        plateau = Plateau()
+        sac = [Jeton(lettre, valeur) for lettre, occurences, valeur in Scrabble.DISTRIBUTIONS_JETONS[langue.upper()]
+               for _ in range(occurences)]
+        hasard.shuffle(sac)
+        joueurs = [Joueur("Joueur 1"), Joueur("Joueur 2")]
+        for joueur in joueurs:
+            for position in range(Joueur.TAILLE_CHEVALET):
+                joueur.jetons[position] = sac.pop()
+
+        en_attente = [None, None]
+        nb_passes, tour = 0, 0
+        while nb_passes < len(joueurs) and all(joueur.nb_a_tirer < Joueur.TAILLE_CHEVALET for joueur in joueurs):
+            numero_joueur = tour % len(joueurs)
+            joueur = joueurs[numero_joueur]
+            tour += 1
+
+            coups = generateur.generer(plateau, joueur)
+            if not coups:
+                nb_passes += 1
+                en_attente[numero_joueur] = None
+                continue
+            nb_passes = 0
+            coup = max(coups, key=lambda c: c.score + strategie.valeur_reste(StrategieReste.reste(joueur, c)))
+
+            if en_attente[numero_joueur] is not None:
+                observation = observations.setdefault(en_attente[numero_joueur], [0, 0])
+                observation[0] += coup.score
+                observation[1] += 1
+
+            reste = ''.join(sorted(StrategieReste.reste(joueur, coup)))
+            for position_chevalet, position in zip(coup.positions_chevalet, coup.index_plateau):
+                plateau.ajouter_jeton_index(joueur.jetons[position_chevalet], position)
+                joueur.jetons[position_chevalet] = sac.pop() if sac else None
+
+            # Une fois le sac vide, le reste n'est plus complété au hasard: il n'est plus représentatif
+            en_attente[numero_joueur] = reste if sac else None
+
+        print("Partie {}/{}: {} restes observés".format(numero + 1, nb_parties, len(observations)), file=sys.stderr)
+    return observations
+
+
+def estimer_table(observations, voyelles='AEIOUY', regularisation=50.0, nb_iterations=30):
+    """
+    Estime la valeur de tous les restes à partir des observations de parties.
+
+    Comme la plupart des restes ne sont jamais observés, la valeur d'un reste est d'abord prédite par un modèle additif:
+        une valeur par lettre et par exemplaire de cette lettre (1er, 2e, 3e), une par nombre de voyelles et une par
+        taille de reste, ajustées par moindres carrés régularisés (descente par coordonnées). La moyenne des écarts
+        observés pour le reste lui-même s'y ajoute ensuite, d'autant plus qu'il a été souvent observé.
+    :param observations: dict, le résultat de observer_parties.
+    :param voyelles: (str, optionnel) les lettres considérées comme des voyelles.
+    :param regularisation: (float, optionnel) le poids d'un modèle ou d'une moyenne face à une observation.
+    :param nb_iterations: (int, optionnel) le nombre de passes de la descente par coordonnées.
+    :return: TableRestes, la table estimée.
+    """
+    def caracteristiques(reste):
+        vues = {}
+        resultat = [('taille', len(reste)), ('voyelles', sum(1 for lettre in reste if lettre in voyelles))]
+        for lettre in reste:
+            vues[lettre] = vues.get(lettre, 0) + 1
+            if vues[lettre] <= 3:
+                resultat.append((lettre, vues[lettre]))
+        return resultat
+
+    total = sum(somme for somme, _ in observations.values())
+    nombre = sum(nb for _, nb in observations.values())
+    moyenne = total / nombre if nombre else 0.0
+
+    # Résidus et caractéristiques agrégés par reste observé
+    restes = list(observations)
+    residus = {reste: observations[reste][0] / observations[reste][1] - moyenne for reste in restes}
+    membres = {}
+    for reste in restes:
+        for caracteristique in caracteristiques(reste):
+            membres.setdefault(caracteristique, []).append(reste)
+
+    poids = dict.fromkeys(membres, 0.0)
+    for _ in range(nb_iterations):
+        for caracteristique, restes_membres in membres.items():
+            ancien = poids[caracteristique]
+            somme = sum((residus[reste] + ancien) * observations[reste][1] for reste in restes_membres)
+            nb = sum(observations[reste][1] for reste in restes_membres)
+            nouveau = somme / (nb + regularisation)
+            for reste in restes_membres:
+                residus[reste] -= nouveau - ancien
+            poids[caracteristique] = nouveau
+
+    valeurs = array('b', bytes(DEBUTS[-1]))
+    limite = 127 / TableRestes.UNITE
+    for taille in range(TAILLE_MAX + 1):
+        for reste in TableRestes.restes(taille):
+            valeur = sum(poids.get(caracteristique, 0.0) for caracteristique in caracteristiques(reste))
+            if reste in observations:
+                nb = observations[reste][1]
+                valeur += residus[reste] * nb / (nb + regularisation)
+            valeurs[TableRestes.index(reste)] = round(max(-limite, min(limite, valeur)) * TableRestes.UNITE)
+    return TableRestes(valeurs)
+
+
+if __name__ == '__main__':
+    # Génération hors ligne: python -m tp4.restes [FR|EN] [nombre de parties] [graine]
+    from random import Random
+
+    langue = (sys.argv[1] if len(sys.argv) > 1 else 'FR').upper()
+    nb_parties = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    hasard = Random(int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+
+    table = estimer_table(observer_parties(langue, nb_parties, hasard))
+    table.sauvegarder(TableRestes.FICHIERS[langue])
+    print(TableRestes.FICHIERS[langue], os.path.getsize(TableRestes.FICHIERS[langue]), 'octets')
@@ -0,0 +1,154 @@
+from tp4.plateau import Plateau
+
+
+class ScoreurLot:
+    """
+    Calcule le score de nombreux placements sur un même plateau, sans les poser et sans parcourir les mots formés.
+
+    À la création, le scoreur calcule une fois pour toutes, pour chaque case et chaque orientation (lignes, puis
+    colonnes), la somme et le nombre des jetons contigus juste avant et juste après la case, ainsi que la somme des
+    valeurs des jetons qui la précèdent sur sa ligne (ou sa colonne). Le score d'un placement se lit alors dans ces
+    tables en un nombre d'opérations proportionnel au nombre de jetons posés, quelle que soit la longueur des mots.
+
+    Les tables décrivent le plateau au moment de la création du scoreur: il faut en créer un nouveau après chaque
+    modification du plateau (voir a_jour). Les scores sont ceux de Plateau.mots_score_obtenus.
+
+    Le scoreur est un utilitaire autonome, qu'aucun autre module n'utilise: GenerateurCoups calcule déjà le score de
+    chaque coup pendant la génération. Il sert à évaluer des placements venus d'ailleurs (ex: une liste de coups
+    à comparer) quand ils sont nombreux sur un même plateau; pour un seul placement, Plateau.evaluer_coup suffit.
+    """
+
+    def __init__(self, plateau):
+        """
+        :param plateau: Plateau, le plateau sur lequel les placements seront évalués (n'est pas modifié).
+        """
+        n = Plateau.DIMENSION
+        self.__empreinte = plateau.empreinte
+        valeurs = plateau.valeurs
+        occupees = plateau.lettres
+
+        # Tables des lignes (pas de 1), puis des colonnes (pas de n)
+        self.__tables = []
+        for pas, saut in ((1, n), (n, 1)):
+            cumul, somme_avant, nb_avant = [0] * (n * n), [0] * (n * n), [0] * (n * n)
+            somme_apres, nb_apres = [0] * (n * n), [0] * (n * n)
+            for rangee in range(n):
+                cases = range(rangee * saut, rangee * saut + n * pas, pas)
+                total = somme = nb = 0
+                for case in cases:
+                    cumul[case], somme_avant[case], nb_avant[case] = total, somme, nb
+                    if occupees[case]:
+                        total += valeurs[case]
+                        somme, nb = somme + valeurs[case], nb + 1
+                    else:
+                        somme = nb = 0
+                somme = nb = 0
+                for case in reversed(cases):
+                    somme_apres[case], nb_apres[case] = somme, nb
+                    if occupees[case]:
+                        somme, nb = somme + valeurs[case], nb + 1
+                    else:
+                        somme = nb = 0
+            self.__tables.append((cumul, somme_avant, nb_avant, somme_apres, nb_apres))
+
+    def a_jour(self, plateau):
+        """
+        :param plateau: Plateau, un plateau.
+        :return: bool, True si le plateau porte les mêmes jetons que lors de la création du scoreur.
+        """
+        return plateau.empreinte == self.__empreinte
+
+    def score(self, jetons, index_cases):
+        """
+        Permet d'obtenir le score d'un placement valide (voir Plateau.valider_index_avant_ajout), mot principal et mots
+            croisés compris. La validité du placement n'est pas vérifiée.
+        :param jetons: Jeton list, les jetons posés.
+        :param index_cases: int list, les index des cases où ils sont posés (même ordre que jetons).
+        :return: int, le score obtenu si le placement était joué.
+        """
+        n = Plateau.DIMENSION
+        bonus_lettre, bonus_mot = Plateau.BONUS_LETTRE, Plateau.BONUS_MOT
+
+        if len(index_cases) == 1:
+            # Un seul jeton: le mot sur sa ligne et celui sur sa colonne sont comptés comme des mots croisés
+            case, valeur = index_cases[0], jetons[0].valeur
+            score = 0
+            for _, somme_avant, nb_avant, somme_apres, nb_apres in self.__tables:
+                if nb_avant[case] or nb_apres[case]:
+                    score += (somme_avant[case] + somme_apres[case] + valeur * bonus_lettre[case]) * bonus_mot[case]
+            return score
+
+        premiere, derniere = min(index_cases), max(index_cases)
+        horizontal = premiere // n == derniere // n
+        cumul, somme_avant, _, somme_apres, _ = self.__tables[0 if horizontal else 1]
+        _, croise_avant, nb_croise_avant, croise_apres, nb_croise_apres = self.__tables[1 if horizontal else 0]
+
+        # Mot principal: les jetons contigus de part et d'autre, ceux déjà posés entre les nouveaux, puis les nouveaux
+        score = somme_avant[premiere] + cumul[derniere] - cumul[premiere] + somme_apres[derniere]
+        multiplicateur, score_croise = 1, 0
+        for jeton, case in zip(jetons, index_cases):
+            valeur = jeton.valeur * bonus_lettre[case]
+            score += valeur
+            multiplicateur *= bonus_mot[case]
+            if nb_croise_avant[case] or nb_croise_apres[case]:
+                score_croise += (croise_avant[case] + croise_apres[case] + valeur) * bonus_mot[case]
+        return score * multiplicateur + score_croise
+
+    def scores(self, placements):
+        """
+        Permet d'obtenir le score de chacun d'un lot de placements valides (voir score).
+        :param placements: iterable de tuple (Jeton list, int list), les jetons et les index des cases de chaque
+                placement.
+        :return: int list, le score de chaque placement, dans l'ordre des placements.
+        """
+        score = self.score
+        return [score(jetons, index_cases) for jetons, index_cases in placements]
+
+
+if __name__ == '__main__':
+    # Banc d'essai: python -m tp4.scoreur [langue]
+    import random
+    import sys
+    from timeit import timeit
+    from tp4.generateur import GenerateurCoups
+    from tp4.joueur import Joueur
+    from tp4.lexique import RegistreLexiques
+    from tp4.scrabble import Scrabble
+    from tp4.plateau import Jeton
+
+    langue = sys.argv[1].upper() if len(sys.argv) > 1 else 'FR'
+    lexique = RegistreLexiques.obtenir(langue)
+    generateur = GenerateurCoups(lexique)
+    distribution = {lettre: valeur for lettre, _, valeur in Scrabble.DISTRIBUTIONS_JETONS[langue]}
+    sac = [Jeton(lettre, valeur) for lettre, nombre, valeur in Scrabble.DISTRIBUTIONS_JETONS[langue]
+           for _ in range(nombre)]
+    random.seed(0)
+    random.shuffle(sac)
+
+    # Quelques coups de plus haut score pour garnir le plateau
+    plateau, joueur = Plateau(), Joueur("Banc d'essai")
+    for _ in range(8):
+        for position, jeton in enumerate(joueur.jetons):
+            if jeton is None and sac:
+                joueur.jetons[position] = sac.pop()
+        coup = max(generateur.generer(plateau, joueur), key=lambda c: c.score, default=None)
+        if coup is None:
+            break
+        for position_chevalet, index in zip(coup.positions_chevalet, coup.index_plateau):
+            plateau.ajouter_jeton_index(joueur.jetons[position_chevalet], index)
+            joueur.jetons[position_chevalet] = None
+
+    for position, jeton in enumerate(joueur.jetons):
+        if jeton is None and sac:
+            joueur.jetons[position] = sac.pop()
+    coups = generateur.generer(plateau, joueur)
+    placements = [([Jeton(lettre, distribution[lettre]) for lettre in coup.lettres], coup.index_plateau)
+                  for coup in coups]
+
+    scoreur = ScoreurLot(plateau)
+    duree_tables = timeit(lambda: ScoreurLot(plateau), number=100) / 100
+    duree_lot = timeit(lambda: scoreur.scores(placements), number=10) / 10
+    duree_un_a_un = timeit(lambda: [plateau.evaluer_coup_index(*placement) for placement in placements], number=10) / 10
+    print("{} placements: tables {:.0f} µs, lot {:.2f} ms ({:.2f} µs par placement), un à un {:.2f} ms".format(
+        len(placements), duree_tables * 1e6, duree_lot * 1e3, duree_lot / len(placements) * 1e6,
+        duree_un_a_un * 1e3))
@@ -2,8 +2,10 @@ import pickle
 from random import randint, shuffle
 from time import sleep
 from tp4.joueur import Joueur
+from tp4.joueur_ia import JoueurIA, Conseiller
+from tp4.journal import Journal
 from tp4.plateau import Plateau, Jeton
-from tkinter import filedialog
+from tp4.lexique import RegistreLexiques
 from tp4.error import *
 from threading import Thread
 
@@ -13,35 +15,69 @@ class Scrabble:
     Classe Scrabble qui implémente aussi une partie de la logique de jeu.
 
     Les attributs d'un scrabble sont:
-    - dictionnaire: set, contient tous les mots qui peuvent être joués sur dans cette partie.
-    En gros pour savoir si un mot est permis on va regarder dans le dictionnaire.
+    - dictionnaire: Lexique, contient tous les mots qui peuvent être joués sur dans cette partie.
+    En gros pour savoir si un mot est permis on va regarder dans le dictionnaire. Le lexique est un graphe de mots
+    minimal qui peut aussi être parcouru par préfixe ou suffixe (génération de coups, aide). Il est partagé en
+    lecture seule par toutes les parties de même langue (voir RegistreLexiques) et chargé en arrière-plan: y accéder
+    attend au plus DELAI_CHARGEMENT_DICTIONNAIRE secondes la fin du chargement.
     - plateau: Plateau, un objet de la classe Plateau on y place des jetons et il nous dit le nombre de points gagnés.
     - jetons_libres: Jeton list, la liste de tous les jetons dans le sac, c'est là que chaque joueur
                     peut prendre des jetons quand il en a besoin.
     - joueurs: Joueur list,  L'ensemble des joueurs de la partie.
     - joueur_actif: Joueur, le joueur qui est entrain de jouer le tour en cours. Si aucun joueur alors None.
+    - journal: Journal, les modifications faites depuis le début de la partie (ou son chargement). Chaque tour, avec le
+                tirage du joueur suivant, y est un coup: il peut être annulé (voir annuler_coup) puis refait.
     """
     TEMPS_PAR_TOUR = 60
+    DELAI_CHARGEMENT_DICTIONNAIRE = 10
+
+    # Jetons du sac de chaque langue: (lettre, nombre d'exemplaires, valeur)
+    # Infos disponibles sur https://fr.wikipedia.org/wiki/Lettres_du_Scrabble
+    DISTRIBUTIONS_JETONS = {
+        'FR': [('E', 15, 1), ('A', 9, 1), ('I', 8, 1), ('N', 6, 1), ('O', 6, 1),
+               ('R', 6, 1), ('S', 6, 1), ('T', 6, 1), ('U', 6, 1), ('L', 5, 1),
+               ('D', 3, 2), ('M', 3, 2), ('G', 2, 2), ('B', 2, 3), ('C', 2, 3),
+               ('P', 2, 3), ('F', 2, 4), ('H', 2, 4), ('V', 2, 4), ('J', 1, 8),
+               ('Q', 1, 8), ('K', 1, 10), ('W', 1, 10), ('X', 1, 10), ('Y', 1, 10),
+               ('Z', 1, 10)],
+        'EN': [('E', 12, 1), ('A', 9, 1), ('I', 9, 1), ('N', 6, 1), ('O', 8, 1),
+               ('R', 6, 1), ('S', 4, 1), ('T', 6, 1), ('U', 4, 1), ('L', 4, 1),
+               ('D', 4, 2), ('M', 2, 3), ('G', 3, 2), ('B', 2, 3), ('C', 2, 3),
+               ('P', 2, 3), ('F', 2, 4), ('H', 2, 4), ('V', 2, 4), ('J', 1, 8),
+               ('Q', 1, 10), ('K', 1, 5), ('W', 2, 4), ('X', 1, 8), ('Y', 2, 4),
+               ('Z', 1, 10)]}
 
     # Available as a singleton
     instance = None
     ui = None
 
-    def __init__(self, ui):
+    def __init__(self, ui, interactif=True):
+        """
+        :param ui: l'interface de la partie (None si aucune).
+        :param interactif: (bool, optionnel) si False, la partie est jouée sans interface ni horloge: elle ne devient pas
+                Scrabble.instance, aucun Timer n'est démarré, les JoueurIA ne réfléchissent pas en arrière-plan (c'est
+                à l'appelant de les faire jouer) et rien n'est affiché. Plusieurs parties peuvent alors coexister.
+        """
+        self.interactif = interactif
         self.plateau = Plateau()
         self.joueur_actif = None
         self.joueurs: [Joueur] = None
         self.temps_restant = None
-        self.dictionnaire = {}
         self.nb_joueurs = None
         self.langue = None
         self.jetons_libres: [Jeton] = None
+        self.conseiller: Conseiller = None
+        self.journal = Journal()
+        self.__nb_reflexions = 0
+        self.__reflexion = None
+        self.__reflexion_terminee = None
 
-        Scrabble.instance = self
-        Scrabble.ui = ui
+        if interactif:
+            Scrabble.instance = self
+            Scrabble.ui = ui
 
     def initialiser_jeu(self, nb_joueurs, langue, plateau: Plateau=None, joueurs: [Joueur]=None, joueur_actif=None,
-                        jetons_libre=None, temps_restant=None):
+                        jetons_libre=None, temps_restant=None, nb_joueurs_ia=0):
         """
         Étant donnés un nombre de joueurs et une langue. Le constructeur crée une partie de scrabble.
         Pour une nouvelle partie de scrabble,
@@ -51,19 +87,24 @@ class Scrabble:
         - Le joueur_actif est None.
 
         :param nb_joueurs: int, nombre de joueurs de la partie au minimun 2 au maximum 4.
-        :param langue: str, FR pour la langue française, et EN pour la langue anglaise. Dépendamment de la langue, vous
-                        devez ouvrir, lire, charger en mémoire le fichier "dictionnaire_francais.txt" ou
-                        "dictionnaire_anglais.txt" ensuite il faudra ensuite extraire les mots contenus pour construire
-                        un set avec le mot clé set.
+        :param langue: str, FR pour la langue française, et EN pour la langue anglaise. Dépendamment de la langue, le
+                        lexique de "dictionnaire_francais.txt" ou "dictionnaire_anglais.txt" est préchargé en
+                        arrière-plan par le RegistreLexiques, qui ne le charge qu'une seule fois par processus. Le
+                        plateau et les chevalets sont utilisables sans attendre la fin de ce chargement.
         :param plateau: Optionnel, un plateau à utiliser
         :param joueurs: Optionnel, une liste de joueurs à utiliser
         :param joueur_actif: Optionnel, un joueur_actif à utiliser
         :param jetons_libre: Optionnel, les jetons_libre à considérer
         :param temps_restant: Optionnel, le temps restant du tours en cours
+        :param nb_joueurs_ia: Optionnel, le nombre de joueurs (les derniers) contrôlés par l'ordinateur pour une
+                                nouvelle liste de joueurs
 
         :exception: ScrabbleSystemError si la Langue n'est pas conforme (FR ou EN) ou qu'il n'y a pas de 2 à 4 joueurs
         """
-        Timer.exit()
+        if self.interactif:
+            Timer.exit()
+        if self.joueurs is not None:
+            self.liberer_ressources()
 
         if langue.upper() not in ['FR', 'EN']:
             ScrabbleSystemError('Langue {} non supportée.'.format(langue.upper()))
@@ -73,53 +114,54 @@ class Scrabble:
 
         self.plateau = Plateau() if plateau is None else plateau
         self.joueur_actif = None if joueur_actif is None else joueur_actif
-        self.joueurs: [Joueur] = \
-            [Joueur("Joueur {}".format(i + 1)) for i in range(nb_joueurs)] if joueurs is None else joueurs
+        if joueurs is None:
+            joueurs = [Joueur("Joueur {}".format(i + 1)) if i < nb_joueurs - nb_joueurs_ia
+                       else JoueurIA("Ordinateur {}".format(i + 1)) for i in range(nb_joueurs)]
+        self.joueurs: [Joueur] = joueurs
 
         if jetons_libre is None:
-            data = []
-            if langue.upper() == 'FR':
-                # Infos disponibles sur https://fr.wikipedia.org/wiki/Lettres_du_Scrabble
-                data = [('E', 15, 1), ('A', 9, 1), ('I', 8, 1), ('N', 6, 1), ('O', 6, 1),
-                        ('R', 6, 1), ('S', 6, 1), ('T', 6, 1), ('U', 6, 1), ('L', 5, 1),
-                        ('D', 3, 2), ('M', 3, 2), ('G', 2, 2), ('B', 2, 3), ('C', 2, 3),
-                        ('P', 2, 3), ('F', 2, 4), ('H', 2, 4), ('V', 2, 4), ('J', 1, 8),
-                        ('Q', 1, 8), ('K', 1, 10), ('W', 1, 10), ('X', 1, 10), ('Y', 1, 10),
-                        ('Z', 1, 10)]
-
-            elif langue.upper() == 'EN':
-                # Infos disponibles sur https://fr.wikipedia.org/wiki/Lettres_du_Scrabble
-                data = [('E', 12, 1), ('A', 9, 1), ('I', 9, 1), ('N', 6, 1), ('O', 8, 1),
-                        ('R', 6, 1), ('S', 4, 1), ('T', 6, 1), ('U', 4, 1), ('L', 4, 1),
-                        ('D', 4, 2), ('M', 2, 3), ('G', 3, 2), ('B', 2, 3), ('C', 2, 3),
-                        ('P', 2, 3), ('F', 2, 4), ('H', 2, 4), ('V', 2, 4), ('J', 1, 8),
-                        ('Q', 1, 10), ('K', 1, 5), ('W', 2, 4), ('X', 1, 8), ('Y', 2, 4),
-                        ('Z', 1, 10)]
-
+            data = Scrabble.DISTRIBUTIONS_JETONS.get(langue.upper(), [])
             self.jetons_libres = \
                 [Jeton(lettre, valeur) for lettre, occurences, valeur in data for i in range(occurences)]
         else:
             self.jetons_libres = jetons_libre
 
-        nom_fichier_dictionnaire = 'dictionnaire_francais.txt' if langue.upper() == 'FR' else 'dictionnaire_anglais.txt'
-        with open(nom_fichier_dictionnaire, 'r') as f:
-            self.dictionnaire = set([x[:-1].upper() for x in f.readlines() if len(x[:-1]) > 1])
+        RegistreLexiques.precharger(langue)
 
         self.nb_joueurs = nb_joueurs
         self.langue = langue
 
         self.temps_restant = 0.0 if temps_restant is None else temps_restant
 
+        self.annuler_suggestion()
         if joueur_actif is None:
             self.joueur_suivant()
+        else:
+            self.__demarrer_reflexion()
+        # Le tirage du premier joueur ne fait pas partie d'un coup
+        self.journal = Journal()
 
-        Timer.reset()
+        if self.interactif:
+            Timer.reset()
+
+    @property
+    def dictionnaire(self):
+        """
+        Permet d'obtenir le lexique de la partie, en attendant au besoin la fin de son chargement.
+        :return: Lexique, le lexique de la langue de la partie.
+        :exception: DictionnaireNonChargeError si aucune partie n'a été initialisée (langue inconnue), ou si le lexique
+                    n'est pas chargé après DELAI_CHARGEMENT_DICTIONNAIRE secondes.
+        """
+        if self.langue is None:
+            raise DictionnaireNonChargeError("Aucune partie en cours: la langue du dictionnaire est inconnue.")
+        return RegistreLexiques.obtenir(self.langue, Scrabble.DELAI_CHARGEMENT_DICTIONNAIRE)
 
     def mot_permis(self, mot):
         """
         Permet de savoir si un mot est permis dans la partie ou pas en regardant dans le dictionnaire.
         :param mot: str, mot à vérifier.
         :return: bool, True si le mot est dans le dictionnaire, False sinon.
+        :exception: DictionnaireNonChargeError si le dictionnaire est encore en chargement après le délai d'attente.
         """
         return mot in self.dictionnaire
 
@@ -143,6 +185,18 @@ class Scrabble:
         """
         return len(self.jetons_libres) == 0 or len(self.joueurs) < 2
 
+    def liberer_ressources(self):
+        """
+        Arrête la recherche de suggestions et la réflexion des joueurs contrôlés par l'ordinateur, et libère leurs
+            ressources (voir JoueurIA.fermer). À appeler quand la partie est terminée ou abandonnée; les joueurs restent
+            utilisables.
+        :return: rien
+        """
+        self.annuler_suggestion()
+        for joueur in self.joueurs or []:
+            if isinstance(joueur, JoueurIA):
+                joueur.fermer()
+
     def joueur_suivant(self):
         """
         Change le joueur actif.
@@ -150,15 +204,126 @@ class Scrabble:
         Si on n'a aucun joueur actif, on détermine au harsard le suivant.
         """
 
+        self.annuler_suggestion()
         if self.joueur_actif is None:
             self.joueur_actif = self.joueurs[randint(0, len(self.joueurs) - 1)]
         else:
+            if isinstance(self.joueur_actif, JoueurIA):
+                self.joueur_actif.annuler()
             self.joueur_actif.moves = {}
             self.joueur_actif = self.joueurs[(self.joueurs.index(self.joueur_actif) + 1) % len(self.joueurs)]
 
         if self.joueur_actif.nb_a_tirer > 0:
             for jeton in self.tirer_jetons(self.joueur_actif.nb_a_tirer):
-                self.joueur_actif.ajouter_jeton(jeton)
+                self.journal.piocher(self.joueur_actif, jeton, self.jetons_libres)
+        self.journal.terminer_coup()
+
+        # Le nouveau joueur dispose d'un tour complet (l'horloge fait de même à sa remise à zéro, voir Timer)
+        self.temps_restant = Scrabble.TEMPS_PAR_TOUR
+        self.__demarrer_reflexion()
+
+    def __changer_de_coup(self, possible, changement, decalage):
+        if not possible():
+            return False
+
+        self.annuler_suggestion()
+        if isinstance(self.joueur_actif, JoueurIA):
+            self.joueur_actif.annuler()
+        self.__reflexion = None
+        changement()
+
+        self.joueur_actif.moves = {}
+        self.joueur_actif = self.joueurs[(self.joueurs.index(self.joueur_actif) + decalage) % len(self.joueurs)]
+        self.temps_restant = Scrabble.TEMPS_PAR_TOUR
+        return True
+
+    def annuler_coup(self):
+        """
+        Annule le dernier tour joué (voir Journal.annuler): ses jetons quittent le plateau et retournent sur le chevalet
+            du joueur qui les avait posés, ses points lui sont retirés, les jetons tirés ensuite retournent dans le sac,
+            et ce joueur redevient le joueur actif. La réflexion d'un joueur contrôlé par l'ordinateur est arrêtée et
+            n'est pas relancée: s'il redevient le joueur actif, il ne rejoue qu'après reprendre_partie.
+        :return: bool, False s'il n'y avait aucun tour à annuler.
+        """
+        return self.__changer_de_coup(self.journal.peut_annuler, self.journal.annuler, -1)
+
+    def refaire_coup(self):
+        """
+        Rejoue le dernier tour annulé par annuler_coup, tel qu'il avait été joué. Comme pour annuler_coup, un joueur
+            contrôlé par l'ordinateur ne se met pas à réfléchir.
+        :return: bool, False s'il n'y avait aucun tour à refaire.
+        """
+        return self.__changer_de_coup(self.journal.peut_refaire, self.journal.refaire, 1)
+
+    def reprendre_partie(self):
+        """
+        Démarre la réflexion du joueur actif s'il est contrôlé par l'ordinateur, par exemple après annuler_coup ou
+            refaire_coup.
+        :return: bool, False si le joueur actif n'est pas contrôlé par l'ordinateur ou si la partie n'est pas
+                interactive.
+        """
+        if not self.interactif or not isinstance(self.joueur_actif, JoueurIA):
+            return False
+        self.__demarrer_reflexion()
+        return True
+
+    def __demarrer_reflexion(self):
+        """
+        Si le joueur actif est contrôlé par l'ordinateur (et que la partie est interactive), démarre sa réflexion en
+            arrière-plan. Une fois son coup choisi, l'interface reçoit l'évènement <<TourOrdinateur>> pour terminer le
+            tour comme le bouton "Terminer le tour", après avoir vérifié qu'il n'a pas changé (voir reflexion_terminee).
+        :return: rien
+        """
+        self.__reflexion = None
+        if not self.interactif or not isinstance(self.joueur_actif, JoueurIA):
+            return
+
+        # Chaque réflexion est identifiée par son joueur et son numéro
+        self.__nb_reflexions += 1
+        reflexion = (self.joueur_actif, self.__nb_reflexions)
+        self.__reflexion = reflexion
+
+        def fin_reflexion(joueur):
+            if joueur is self.joueur_actif and Scrabble.ui is not None:
+                self.__reflexion_terminee = reflexion
+                Scrabble.ui.event_generate('<<TourOrdinateur>>', when='tail')
+
+        self.joueur_actif.reflechir(self, fin_reflexion)
+
+    def reflexion_terminee(self):
+        """
+        Permet de vérifier, à la réception de <<TourOrdinateur>>, que le coup choisi est celui du tour en cours: le tour
+            a pu changer (fin du temps, annuler_coup) entre la fin de la réflexion et le traitement de l'évènement.
+        :return: bool, True si la réflexion du joueur actif pour le tour en cours est terminée et n'a pas encore été
+                signalée par cette méthode.
+        """
+        reflexion = self.__reflexion
+        if reflexion is None or reflexion != self.__reflexion_terminee or reflexion[0] is not self.joueur_actif:
+            return False
+        self.__reflexion = None
+        return True
+
+    def suggerer_coup(self, rappel):
+        """
+        Démarre en arrière-plan la recherche des meilleurs coups du joueur actif (voir Conseiller). Une recherche
+            précédente est annulée. La recherche est aussi annulée au changement de tour.
+        :param rappel: fonction appelée depuis le fil de recherche avec le conseiller, chaque fois que ses suggestions
+                s'améliorent.
+        :return: Conseiller, le conseiller effectuant la recherche.
+        """
+        self.annuler_suggestion()
+        self.conseiller = Conseiller(self.joueur_actif)
+        self.conseiller.demarrer(self, rappel)
+        return self.conseiller
+
+    def annuler_suggestion(self):
+        """
+        Annule la recherche de suggestions en cours, s'il y en a une.
+        :return: rien
+        """
+        if self.conseiller is not None:
+            self.conseiller.annuler()
+            self.conseiller = None
 
     def tirer_jetons(self, n):
         """
@@ -174,7 +339,8 @@ class Scrabble:
 
         shuffle(self.jetons_libres)
         res = self.jetons_libres[:n]
-        self.jetons_libres = self.jetons_libres[n:]
+        # Le sac est modifié en place: le journal y remet les jetons d'un tirage annulé
+        del self.jetons_libres[:n]
         return res
 
     def demander_positions(self):
@@ -223,27 +389,25 @@ class Scrabble:
         La liste des déplacement de jetons sont pris sans le joueur_actif, propriété "moves"
         """
         if len(self.joueur_actif.moves) > 0:
-            pos_chevalet = list(self.joueur_actif.moves.keys())
-            pos_plateau = list(self.joueur_actif.moves.values())
-
-            # Valider que les positions du plateau sont valide avant de retirer les jetons
-            if not self.plateau.valider_positions_avant_ajout(pos_plateau):
+            # Évaluer le coup sans toucher au plateau ni au chevalet: un coup refusé n'a rien à défaire
+            valide, mots, score = self.plateau.evaluer_coup(self.joueur_actif.jetons, self.joueur_actif.moves)
+            if not valide:
                 raise PositionPlateauError
 
-            # Retirer les jetons du chevalets
-            jetons = [self.joueur_actif.retirer_jeton(p) for p in pos_chevalet]
-
-            # calculer le nouveau score
-            mots, score = self.plateau.placer_mots(jetons, pos_plateau)
-            if any([not self.mot_permis(m) for m in mots]):
-                for i, pos in enumerate(pos_plateau):
-                    jeton = self.plateau.retirer_jeton(pos)
-                    self.joueur_actif.ajouter_jeton(jeton, pos_chevalet[i])
+            # Attendre le dictionnaire (s'il est encore en chargement) avant de modifier le plateau
+            dictionnaire = self.dictionnaire
+            if any([m not in dictionnaire for m in mots]):
                 raise MotAbsentError
-            else:
+
+            # Retirer les jetons du chevalets et les placer, en notant chaque modification au journal
+            for position_chevalet, position_code in self.joueur_actif.moves.items():
+                jeton = self.journal.retirer_du_chevalet(self.joueur_actif, position_chevalet)
+                self.journal.poser(self.plateau, jeton, Plateau.index_position(position_code))
+
+            if self.interactif:
                 print("Mots formés:", mots)
                 print("Score obtenu:", score)
-                self.joueur_actif.ajouter_points(score)
+            self.journal.ajouter_points(self.joueur_actif, score)
 
     def sauvegarder_partie(self):
         """ *** Vous n'avez pas à coder cette méthode ***
@@ -252,6 +416,8 @@ class Scrabble:
         :return: True si la sauvegarde s'est bien passé, False si une erreur s'est passé durant la sauvegarde.
         """
 
+        # Importé au besoin: le moteur de jeu reste utilisable sans tkinter (voir tournoi.py)
+        from tkinter import filedialog
         nom_fichier = filedialog.asksaveasfilename(initialdir="/", title='Sauvegarder la partie')
         if nom_fichier is None:
             return False
@@ -274,10 +440,12 @@ class Scrabble:
         :return: rien
         """
 
+        # Importé au besoin: le moteur de jeu reste utilisable sans tkinter (voir tournoi.py)
+        from tkinter import filedialog
         nom_fichier = filedialog.askopenfilename(initialdir="/", title='Charger une partie')
 
         with open(nom_fichier, "rb") as f:
-            liste = pickle.load(f)
+            liste = Scrabble.lire_sauvegarde(f)
 
         plateau = liste[0]
         joueurs = liste[1]
@@ -295,6 +463,51 @@ class Scrabble:
                                           jetons_libres,
                                           temps_restant)
 
+    @staticmethod
+    def lire_sauvegarde(fichier):
+        """
+        Lit une partie écrite par sauvegarder_partie, y compris une partie sauvegardée avant le partage des jetons
+            (voir plateau.Jeton): tous les jetons lus sont remplacés par les jetons partagés.
+        :param fichier: fichier binaire ouvert en lecture.
+        :return: list, les éléments sauvegardés par sauvegarder_partie, dans le même ordre.
+        """
+        liste = _ChargeurPartie(fichier).load()
+        joueurs, jetons_libres = liste[1], liste[5]
+        for joueur in joueurs:
+            for position, jeton in enumerate(joueur.jetons):
+                if jeton is not None:
+                    joueur.jetons[position] = Jeton(jeton.lettre, jeton.valeur)
+        jetons_libres[:] = [Jeton(jeton.lettre, jeton.valeur) for jeton in jetons_libres]
+        return liste
+
+
+class _JetonSauvegarde:
+    """
+    Jeton lu par _ChargeurPartie. Une partie sauvegardée avant le partage des jetons crée chaque jeton sans argument,
+    puis lui donne sa lettre et sa valeur (__setstate__): un objet temporaire est alors nécessaire, remplacé ensuite par
+    le jeton partagé. Une partie plus récente donne la lettre et la valeur (voir Jeton.__reduce__) et obtient
+    directement le jeton partagé.
+    """
+    __slots__ = ('lettre', 'valeur')
+
+    def __new__(cls, *args):
+        return Jeton(*args) if args else super().__new__(cls)
+
+    def __setstate__(self, etat):
+        self.lettre = etat['lettre']
+        self.valeur = etat['valeur']
+
+
+class _ChargeurPartie(pickle.Unpickler):
+    """
+    Lecteur d'une partie sauvegardée, qui lit les jetons avec _JetonSauvegarde.
+    """
+
+    def find_class(self, module, nom):
+        if (module, nom) == ('tp4.plateau', 'Jeton'):
+            return _JetonSauvegarde
+        return super().find_class(module, nom)
+
 
 class Timer(Thread):
     """
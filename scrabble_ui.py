@@ -3,6 +3,7 @@ from time import sleep
 from threading import Thread
 from tp4.ui.scrabble_components import *
 from tp4.scrabble import Scrabble
+from tp4.lexique import RegistreLexiques
 from tp4.ui.theme_manager import Theme
 
 
@@ -123,7 +124,7 @@ class ScrabbleUI(Tk):
 class TopMenu(Menu):
     """
     Voici le menu de haut de fenêtre.
-    Il ne compose que 2 section, soit fichier et À propos.
+    Il se compose de 4 sections, soit Fichier, Partie, Thème et À propos.
 
     Les action de niveau administrative sont ici (Nouvelle partie, charger, sauvegarder, quitter, règlement, etc...)
 
@@ -144,6 +145,16 @@ class TopMenu(Menu):
         menu_fichier.add_command(label='Quitter', command=self.message_sauvegarde_avant_quitter)
         self.add_cascade(label='Fichier', menu=menu_fichier)
 
+        # Création du sous-menu Partie
+        menu_partie = Menu(self)
+        menu_partie.add_command(label='Suggérer un coup', command=lambda: master.event_generate('<<SuggererCoup>>'))
+        menu_partie.add_separator()
+        menu_partie.add_command(label='Annuler le coup', command=lambda: master.event_generate('<<AnnulerCoup>>'))
+        menu_partie.add_command(label='Refaire le coup', command=lambda: master.event_generate('<<RefaireCoup>>'))
+        menu_partie.add_command(label="Faire jouer l'ordinateur",
+                                command=lambda: master.event_generate('<<ReprendrePartie>>'))
+        self.add_cascade(label='Partie', menu=menu_partie)
+
         # Création du sous-menu Thème
         menu_theme = Menu(self)
         for i, theme in enumerate(Theme.theme_list.keys()):
@@ -211,8 +222,9 @@ class TopMenu(Menu):
 
 class NewGamePopup(Toplevel):
     """
-    Nouvelle fenêtre permettant de sélectionner le nombre de joueurs et la langue de jeu.
-    Les valeurs par défaut est de 2 joueurs et fr
+    Nouvelle fenêtre permettant de sélectionner le nombre de joueurs, la langue de jeu et le nombre de joueurs
+    contrôlés par l'ordinateur.
+    Les valeurs par défaut est de 2 joueurs, fr et aucun joueur contrôlé par l'ordinateur
     :return: 2, 3 ou 4, soit le nombre de joueurs sélectionnés ainsi que fr ou en, soit la langue sélectionnée
     """
 
@@ -232,19 +244,38 @@ class NewGamePopup(Toplevel):
         Radiobutton(self, text="4 joueurs", padx=20, variable=self.nbre_joueurs, value=4).grid(sticky="w")
 
         Label(self, text="Veuillez choisir la langue de jeu pour la partie:", padx=20).grid(sticky="w")
-        Radiobutton(self, text="Français", padx=20, variable=self.choix_langue, value="fr").grid(sticky="w")
-        Radiobutton(self, text="Anglais", padx=20, variable=self.choix_langue, value="en").grid(sticky="w")
+        Radiobutton(self, text="Français", padx=20, variable=self.choix_langue, value="fr",
+                    command=self.precharger_dictionnaire).grid(sticky="w")
+        Radiobutton(self, text="Anglais", padx=20, variable=self.choix_langue, value="en",
+                    command=self.precharger_dictionnaire).grid(sticky="w")
+
+        self.nbre_joueurs_ia = IntVar()
+        self.nbre_joueurs_ia.set(0)
+        Label(self, text="Nombre de joueurs contrôlés par l'ordinateur:", padx=20).grid(sticky="w")
+        for nb in range(4):
+            Radiobutton(self, text=str(nb), padx=20, variable=self.nbre_joueurs_ia, value=nb).grid(sticky="w")
 
         Button(self, text="OK", command=self.close).grid()
 
         ScrabbleMessages.ui.message("")
 
+        # Le chargement du dictionnaire commence dès que la langue est connue
+        self.precharger_dictionnaire()
+
+    def precharger_dictionnaire(self):
+        """
+        Démarre en arrière-plan le chargement du dictionnaire de la langue sélectionnée
+        :return: rien
+        """
+        RegistreLexiques.precharger(self.choix_langue.get())
+
     def close(self):
         """
         Fermeture de la fenêtre
         :return: rien
         """
-        Scrabble.instance.initialiser_jeu(self.nbre_joueurs.get(), self.choix_langue.get())
+        Scrabble.instance.initialiser_jeu(self.nbre_joueurs.get(), self.choix_langue.get(),
+                                          nb_joueurs_ia=min(self.nbre_joueurs_ia.get(), self.nbre_joueurs.get()))
         self.master.clear()
         self.master.dessiner()
         self.destroy()
@@ -0,0 +1,262 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from random import Random
+from time import time
+from tp4.generateur import GenerateurCoups, CacheCoups
+from tp4.joueur import Joueur
+from tp4.journal import Journal
+from tp4.lexique import RegistreLexiques
+
+
+class EvaluationCoup:
+    """
+    Résultat de la simulation d'un coup candidat.
+
+    Les attributs d'une évaluation sont:
+    - coup: Coup, le coup candidat.
+    - a_priori: float, l'équité estimée du coup sans simulation (par défaut son score).
+    - total: float, la somme des équités obtenues par les simulations.
+    - nb_simulations: int, le nombre de simulations effectuées.
+
+    L'équité moyenne des simulations (qui déduit les réponses de l'adversaire) et l'équité a priori ne sont pas sur la
+    même échelle: un coup simulé est donc toujours classé avant un coup qui ne l'a pas été (voir classer).
+    """
+
+    def __init__(self, coup, a_priori=None, total=0.0, nb_simulations=0):
+        self.coup = coup
+        self.a_priori = float(coup.score) if a_priori is None else a_priori
+        self.total = total
+        self.nb_simulations = nb_simulations
+
+    @property
+    def equite(self):
+        """
+        :return: float, l'équité moyenne du coup (son équité a priori si aucune simulation n'a pu être faite).
+        """
+        return self.total / self.nb_simulations if self.nb_simulations else self.a_priori
+
+    @staticmethod
+    def classer(evaluations):
+        """
+        Classe des évaluations: d'abord les coups simulés, par équité moyenne décroissante, puis les autres, par équité
+            a priori décroissante.
+        :param evaluations: EvaluationCoup list, les évaluations à classer.
+        :return: EvaluationCoup list, les évaluations classées (la meilleure en premier).
+        """
+        return sorted(evaluations, key=lambda evaluation: (evaluation.nb_simulations > 0, evaluation.equite),
+                      reverse=True)
+
+    def __str__(self):
+        return "{} -> {:.1f} ({} simulations)".format(self.coup, self.equite, self.nb_simulations)
+
+
+def _jouer_meilleur(generateur, plateau, joueur, journal):
+    """
+    Joue sur le plateau le coup de plus haut score d'un joueur et retire ses jetons du chevalet. Les jetons posés sont
+        notés au journal.
+    :return: tuple (int, str), le score obtenu (0 si le joueur passe) et les lettres restées sur le chevalet.
+    """
+    coup = max(generateur.generer(plateau, joueur), key=lambda c: c.score, default=None)
+    if coup is not None:
+        for position_chevalet, position in zip(coup.positions_chevalet, coup.index_plateau):
+            journal.poser(plateau, joueur.jetons[position_chevalet], position)
+            joueur.jetons[position_chevalet] = None
+    return (0 if coup is None else coup.score), ''.join(jeton.lettre for jeton in joueur.jetons if jeton is not None)
+
+
+def _completer(joueur, sac):
+    for position, jeton in enumerate(joueur.jetons):
+        if jeton is None and sac:
+            joueur.jetons[position] = sac.pop()
+
+
+def _simuler(generateur, plateau, jetons, coup, inconnus, nb_plis, valeur_reste, hasard):
+    """
+    Simule une suite possible de la partie après un coup candidat: l'adversaire reçoit un chevalet tiré au hasard parmi
+        les jetons inconnus, puis chaque joueur joue à son tour son coup de plus haut score pendant nb_plis coups.
+    :return: float, l'équité du coup: son score, plus les scores du joueur, moins ceux de l'adversaire, plus la
+            valeur du dernier reste du joueur.
+    """
+    sac = list(inconnus)
+    hasard.shuffle(sac)
+    adversaire, joueur = Joueur("Adversaire"), Joueur("Simulation")
+    _completer(adversaire, sac)
+    for position, jeton in enumerate(jetons):
+        if position not in coup.positions_chevalet:
+            joueur.jetons[position] = jeton
+
+    journal = Journal()
+    try:
+        for position_chevalet, position in zip(coup.positions_chevalet, coup.index_plateau):
+            journal.poser(plateau, jetons[position_chevalet], position)
+        equite = coup.score
+        reste = ''.join(jeton.lettre for jeton in joueur.jetons if jeton is not None)
+        _completer(joueur, sac)
+
+        for pli in range(nb_plis):
+            if pli % 2 == 0:
+                score, _ = _jouer_meilleur(generateur, plateau, adversaire, journal)
+                equite -= score
+                _completer(adversaire, sac)
+            else:
+                score, reste = _jouer_meilleur(generateur, plateau, joueur, journal)
+                equite += score
+                _completer(joueur, sac)
+    finally:
+        journal.abandonner(0)
+
+    return equite + (valeur_reste(reste) if valeur_reste is not None else 0)
+
+
+def _simuler_lot(generateur, plateau, jetons, coups, inconnus, nb_plis, valeur_reste, echeance, graine, arret=None):
+    """
+    Simule les coups à tour de rôle jusqu'à l'échéance (selon time.time) ou jusqu'à ce que arret() soit vrai.
+    :return: list de tuples (float, int), la somme des équités et le nombre de simulations de chaque coup.
+    """
+    hasard = Random(graine)
+    resultats = [[0.0, 0] for _ in coups]
+    while True:
+        for coup, resultat in zip(coups, resultats):
+            if time() >= echeance or (arret is not None and arret()):
+                return resultats
+            resultat[0] += _simuler(generateur, plateau, jetons, coup, inconnus, nb_plis, valeur_reste, hasard)
+            resultat[1] += 1
+
+
+# Générateur propre à chaque processus de travail (voir Simulateur)
+_generateur_processus = None
+
+
+def _initialiser_processus(langue):
+    global _generateur_processus
+    lexique = RegistreLexiques.obtenir(langue)
+    _generateur_processus = GenerateurCoups(lexique, CacheCoups.partage(lexique))
+
+
+def _simuler_lot_processus(plateau, jetons, coups, inconnus, nb_plis, valeur_reste, echeance, graine):
+    return _simuler_lot(_generateur_processus, pickle.loads(plateau), jetons, coups, inconnus, nb_plis, valeur_reste,
+                        echeance, graine)
+
+
+class Simulateur:
+    """
+    Moteur de simulation Monte-Carlo pour évaluer les coups candidats d'un joueur.
+
+    Chaque simulation tire au hasard le chevalet de l'adversaire (et les jetons de remplacement) parmi les jetons
+    inconnus du joueur, soit ceux du sac et des chevalets adverses, joue le coup candidat, puis laisse chaque joueur
+    jouer son coup de plus haut score pendant nb_plis coups. Les candidats simulés sont classés selon leur équité
+    moyenne, avant ceux que le délai n'a pas permis de simuler (voir EvaluationCoup.classer).
+
+    Les simulations sont réparties entre nb_processus processus de travail: chacun reçoit tous les candidats et les
+    simule à tour de rôle avec sa propre graine jusqu'à l'échéance, puis les sommes sont additionnées. Avec un seul
+    processus, les simulations sont faites dans le fil d'exécution appelant. Les processus sont créés au premier besoin
+    et arrêtés par fermer (ou à la sortie d'un bloc with).
+
+    Un simulateur a pour attributs:
+    - langue: str, la langue du lexique utilisé.
+    - nb_candidats: int, le nombre maximal de coups simulés (ceux de plus haut score).
+    - nb_plis: int, le nombre de coups joués après le candidat dans chaque simulation (2 à 4 en pratique).
+    - nb_processus: int, le nombre de processus de travail.
+    """
+    PERIODE_VERIFICATION = 0.05
+
+    def __init__(self, langue, nb_candidats=10, nb_plis=2, nb_processus=None):
+        """
+        :param langue: str, FR ou EN.
+        :param nb_candidats: (int, optionnel) le nombre maximal de coups simulés.
+        :param nb_plis: (int, optionnel) le nombre de coups joués après le candidat.
+        :param nb_processus: (int, optionnel) le nombre de processus, par défaut le nombre de coeurs de la machine.
+        """
+        self.langue = langue
+        self.nb_candidats = nb_candidats
+        self.nb_plis = nb_plis
+        self.nb_processus = nb_processus or os.cpu_count() or 1
+        self.__executeur = None
+        self.__hasard = Random()
+
+    def __getstate__(self):
+        # Les processus de travail ne sont jamais sauvegardés
+        etat = self.__dict__.copy()
+        etat['_Simulateur__executeur'] = None
+        return etat
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fermer()
+
+    @staticmethod
+    def delai_tour(temps_par_tour, marge):
+        """
+        :param temps_par_tour: int, la durée d'un tour (Scrabble.TEMPS_PAR_TOUR).
+        :param marge: float, le nombre de secondes à garder pour jouer le coup choisi.
+        :return: float, le nombre de secondes disponibles pour simuler.
+        """
+        return max(0.0, temps_par_tour - marge)
+
+    def evaluer(self, plateau, joueur, inconnus, coups, delai, valeur_reste=None, arret=None, a_priori=None):
+        """
+        Permet de classer des coups candidats par simulation.
+        :param plateau: Plateau, le plateau de la partie (n'est pas modifié).
+        :param joueur: Joueur, le joueur qui joue les coups (n'est pas modifié).
+        :param inconnus: Jeton list, les jetons que le joueur ne voit pas (sac et chevalets adverses).
+        :param coups: Coup list, les coups candidats; seuls les nb_candidats de plus haute équité a priori sont
+                simulés, en commençant par les meilleurs.
+        :param delai: float, le nombre de secondes disponibles.
+        :param valeur_reste: (fonction, optionnel) valeur des lettres restant au joueur à la fin d'une simulation. Doit
+                pouvoir être transmise à un autre processus (ex: une méthode d'un objet).
+        :param arret: (fonction, optionnel) retourne True si l'évaluation doit être abandonnée au plus tôt.
+        :param a_priori: (fonction, optionnel) l'équité estimée d'un coup sans simulation, par défaut son score.
+        :return: EvaluationCoup list, les candidats classés selon EvaluationCoup.classer.
+        """
+        a_priori = (lambda coup: float(coup.score)) if a_priori is None else a_priori
+        evaluations = sorted((EvaluationCoup(coup, a_priori(coup)) for coup in coups),
+                             key=lambda evaluation: evaluation.a_priori, reverse=True)[:self.nb_candidats]
+        candidats = [evaluation.coup for evaluation in evaluations]
+        if not candidats:
+            return evaluations
+
+        echeance = time() + delai
+        jetons = list(joueur.jetons)
+        if self.nb_processus == 1:
+            lexique = RegistreLexiques.obtenir(self.langue)
+            generateur = GenerateurCoups(lexique, CacheCoups.partage(lexique))
+            lots = [_simuler_lot(generateur, plateau.copier(), jetons, candidats, inconnus,
+                                 self.nb_plis, valeur_reste, echeance, self.__hasard.random(), arret)]
+        else:
+            lots = self.__simuler_en_parallele(plateau, jetons, candidats, inconnus, valeur_reste, echeance, arret)
+
+        for lot in lots:
+            for evaluation, (total, nb_simulations) in zip(evaluations, lot):
+                evaluation.total += total
+                evaluation.nb_simulations += nb_simulations
+        return EvaluationCoup.classer(evaluations)
+
+    def __simuler_en_parallele(self, plateau, jetons, candidats, inconnus, valeur_reste, echeance, arret):
+        if self.__executeur is None:
+            self.__executeur = ProcessPoolExecutor(self.nb_processus, initializer=_initialiser_processus,
+                                                   initargs=(self.langue,))
+        donnees = pickle.dumps(plateau)
+        en_cours = {self.__executeur.submit(_simuler_lot_processus, donnees, jetons, candidats, inconnus,
+                                            self.nb_plis, valeur_reste, echeance, self.__hasard.random())
+                    for _ in range(self.nb_processus)}
+
+        lots = []
+        while en_cours:
+            if arret is not None and arret():
+                # Les processus s'arrêtent d'eux-mêmes à l'échéance; leurs résultats sont ignorés
+                return []
+            terminees, en_cours = wait(en_cours, Simulateur.PERIODE_VERIFICATION, FIRST_COMPLETED)
+            lots += [terminee.result() for terminee in terminees]
+        return lots
+
+    def fermer(self):
+        """
+        Arrête les processus de travail.
+        :return: rien
+        """
+        if self.__executeur is not None:
+            self.__executeur.shutdown()
+            self.__executeur = None
@@ -0,0 +1,51 @@
+"""
+Outils communs aux tests.
+
+Les tests utilisent les dictionnaires du dépôt: ils se lancent depuis sa racine, par exemple avec
+    python -m unittest discover -s tests
+"""
+import random
+from tp4.generateur import GenerateurCoups
+from tp4.joueur import Joueur
+from tp4.lexique import RegistreLexiques
+from tp4.plateau import Plateau, Jeton
+from tp4.scrabble import Scrabble
+
+
+def remplir_chevalet(joueur, sac):
+    """
+    Complète le chevalet d'un joueur avec les derniers jetons du sac.
+    :param joueur: Joueur, le joueur.
+    :param sac: Jeton list, le sac (modifié).
+    :return: rien
+    """
+    for position, jeton in enumerate(joueur.jetons):
+        if jeton is None and sac:
+            joueur.jetons[position] = sac.pop()
+
+
+def plateau_aleatoire(langue, graine, nb_coups):
+    """
+    Permet d'obtenir une position de jeu reproductible: un sac mélangé selon la graine, puis nb_coups coups de plus
+        haut score joués par un même joueur.
+    :param langue: str, FR ou EN.
+    :param graine: int, la graine du mélange du sac.
+    :param nb_coups: int, le nombre de coups joués (moins si le joueur doit passer son tour).
+    :return: tuple (Plateau, Joueur, Jeton list), le plateau, le joueur avec un chevalet plein et le reste du sac.
+    """
+    generateur = GenerateurCoups(RegistreLexiques.obtenir(langue))
+    sac = [Jeton(lettre, valeur) for lettre, nombre, valeur in Scrabble.DISTRIBUTIONS_JETONS[langue]
+           for _ in range(nombre)]
+    random.Random(graine).shuffle(sac)
+
+    plateau, joueur = Plateau(), Joueur("Test")
+    for _ in range(nb_coups):
+        remplir_chevalet(joueur, sac)
+        coup = max(generateur.generer(plateau, joueur), key=lambda c: c.score, default=None)
+        if coup is None:
+            break
+        for position_chevalet, index in zip(coup.positions_chevalet, coup.index_plateau):
+            plateau.ajouter_jeton_index(joueur.jetons[position_chevalet], index)
+            joueur.jetons[position_chevalet] = None
+    remplir_chevalet(joueur, sac)
+    return plateau, joueur, sac
@@ -0,0 +1,99 @@
+import unittest
+from itertools import permutations
+from tp4.generateur import GenerateurCoups, GenerateurParallele, CacheCoups
+from tp4.lexique import RegistreLexiques
+from tp4.plateau import Plateau
+from tp4.tests.outils import plateau_aleatoire
+
+# (graine, nombre de coups joués avant la génération)
+POSITIONS = [(0, 0), (1, 2), (2, 5), (3, 9), (4, 14)]
+
+
+def placements_bruts(plateau, joueur, lexique, nb_jetons_max):
+    """
+    Énumère tous les placements d'au plus nb_jetons_max jetons du chevalet, en ne gardant que ceux que
+        Scrabble.jouer_un_tour accepterait (placement valide, mots du lexique).
+    :return: set de frozenset de tuple (int, str), les cases et les lettres de chaque placement légal.
+    """
+    n = Plateau.DIMENSION
+    vides = [index for index in range(n * n) if plateau.case_est_vide_index(index)]
+    groupes = [[index] for index in vides]
+    if nb_jetons_max >= 2:
+        groupes += [[i, j] for i in vides for j in vides if i < j and (i // n == j // n or i % n == j % n)]
+
+    legaux = set()
+    for index_cases in groupes:
+        if not plateau.valider_index_avant_ajout(index_cases):
+            continue
+        for positions in permutations([p for p, jeton in enumerate(joueur.jetons) if jeton is not None],
+                                      len(index_cases)):
+            jetons = [joueur.jetons[position] for position in positions]
+            valide, mots, _ = plateau.evaluer_coup_index(jetons, index_cases)
+            if valide and mots and all(lexique.mot_permis(mot) for mot in mots):
+                legaux.add(frozenset(zip(index_cases, (jeton.lettre for jeton in jetons))))
+    return legaux
+
+
+class TestGenerateurCoups(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lexique = RegistreLexiques.obtenir('FR')
+        cls.generateur = GenerateurCoups(cls.lexique)
+
+    def test_coups_courts_identiques_a_la_force_brute(self):
+        for graine, nb_coups in POSITIONS:
+            with self.subTest(graine=graine, nb_coups=nb_coups):
+                plateau, joueur, _ = plateau_aleatoire('FR', graine, nb_coups)
+                coups = self.generateur.generer(plateau, joueur)
+                generes = {frozenset(zip(coup.index_plateau, coup.lettres)) for coup in coups
+                           if len(coup.lettres) <= 2}
+                self.assertEqual(generes, placements_bruts(plateau, joueur, self.lexique, 2))
+
+    def test_coups_utilisent_le_chevalet(self):
+        for graine, nb_coups in POSITIONS:
+            plateau, joueur, _ = plateau_aleatoire('FR', graine, nb_coups)
+            for coup in self.generateur.generer(plateau, joueur):
+                self.assertEqual(len(set(coup.positions_chevalet)), len(coup.positions_chevalet))
+                self.assertEqual(coup.lettres, ''.join(joueur.jetons[p].lettre for p in coup.positions_chevalet))
+
+    def test_score_egal_a_placer_mots(self):
+        for graine, nb_coups in POSITIONS:
+            plateau, joueur, _ = plateau_aleatoire('FR', graine, nb_coups)
+            coups = self.generateur.generer(plateau, joueur)
+            self.assertTrue(coups)
+            for coup in coups:
+                copie = plateau.copier()
+                jetons = [joueur.jetons[position] for position in coup.positions_chevalet]
+                mots, score = copie.placer_mots(jetons, coup.positions_plateau)
+                self.assertEqual(score, coup.score, str(coup))
+                self.assertEqual(sorted(mots), sorted(coup.mots), str(coup))
+                self.assertTrue(all(self.lexique.mot_permis(mot) for mot in mots), str(coup))
+
+
+class TestGenerateurParallele(unittest.TestCase):
+
+    @staticmethod
+    def signatures(coups):
+        return sorted((coup.positions_plateau, coup.lettres, coup.positions_chevalet, coup.score) for coup in coups)
+
+    def test_memes_coups_que_le_generateur(self):
+        generateur = GenerateurCoups(RegistreLexiques.obtenir('FR'))
+        for nb_processus in (1, 2):
+            with GenerateurParallele('FR', nb_processus, CacheCoups()) as parallele:
+                for graine, nb_coups in POSITIONS:
+                    with self.subTest(nb_processus=nb_processus, graine=graine):
+                        plateau, joueur, _ = plateau_aleatoire('FR', graine, nb_coups)
+                        attendus = self.signatures(generateur.generer(plateau, joueur))
+                        coups = parallele.generer(plateau, joueur)
+                        self.assertFalse(parallele.depuis_cache)
+                        self.assertEqual(self.signatures(coups), attendus)
+                        self.assertEqual([coup.score for coup in coups],
+                                         sorted((coup.score for coup in coups), reverse=True))
+
+                        self.assertEqual(self.signatures(parallele.generer(plateau, joueur)), attendus)
+                        self.assertTrue(parallele.depuis_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
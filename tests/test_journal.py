@@ -0,0 +1,127 @@
+import random
+import unittest
+from tp4.error import MotAbsentError, PositionPlateauError
+from tp4.joueur import Joueur
+from tp4.joueur_ia import JoueurIA, Strategie, jetons_inconnus
+from tp4.journal import Journal
+from tp4.lexique import RegistreLexiques
+from tp4.plateau import Plateau, Jeton
+from tp4.scrabble import Scrabble
+
+NB_TOURS = 12
+
+
+def etat(partie):
+    """
+    :return: tuple, tout ce qu'un coup peut modifier dans la partie (plateau et ses index, chevalets, points, contenu
+            du sac et joueur actif). L'ordre du sac n'en fait pas partie: il est mélangé avant chaque tirage.
+    """
+    plateau = partie.plateau
+    return (bytes(plateau.lettres), bytes(plateau.valeurs), plateau.empreinte, plateau.nb_jetons,
+            sorted(plateau.ancres()), tuple(tuple(joueur.jetons) for joueur in partie.joueurs),
+            tuple(joueur.points for joueur in partie.joueurs),
+            sorted((jeton.lettre, jeton.valeur) for jeton in partie.jetons_libres), partie.joueur_actif.nom)
+
+
+class TestJournal(unittest.TestCase):
+
+    def test_point_de_controle(self):
+        plateau, joueur, journal = Plateau(), Joueur("Test"), Journal()
+        joueur.jetons[0] = Jeton('A', 1)
+        centre = Plateau.index_position('H8')
+
+        journal.poser(plateau, journal.retirer_du_chevalet(joueur, 0), centre)
+        journal.ajouter_points(joueur, 2)
+        journal.terminer_coup()
+        point = journal.point_de_controle()
+        sac = [Jeton('B', 3), Jeton('C', 3)]
+        journal.piocher(joueur, sac.pop(0), sac)
+        journal.ajouter_points(joueur, 5)
+
+        journal.abandonner(point)
+        self.assertEqual((joueur.jetons[0], joueur.points, len(sac)), (None, 2, 2))
+        self.assertEqual(plateau.lettres[centre], ord('A'))
+        self.assertFalse(journal.peut_refaire())
+
+        self.assertTrue(journal.annuler())
+        self.assertEqual((joueur.jetons[0], joueur.points, plateau.nb_jetons), (Jeton('A', 1), 0, 0))
+        self.assertFalse(journal.annuler())
+        self.assertTrue(journal.refaire())
+        self.assertEqual((joueur.jetons[0], joueur.points, plateau.nb_jetons), (None, 2, 1))
+
+
+class TestAnnulerRefaire(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lexique = RegistreLexiques.obtenir('FR')
+
+    def setUp(self):
+        random.seed(4)
+        self.partie = Scrabble(None, interactif=False)
+        self.partie.initialiser_jeu(2, 'FR', joueurs=[JoueurIA("A", Strategie(), 1), JoueurIA("B", Strategie(), 1)])
+
+    def jouer(self, nb_tours):
+        etats = [etat(self.partie)]
+        for _ in range(nb_tours):
+            joueur = self.partie.joueur_actif
+            joueur.choisir_coup(self.partie.plateau, self.lexique, jetons_inconnus(self.partie, joueur), 1,
+                                langue='FR')
+            self.partie.jouer_un_tour()
+            self.partie.joueur_suivant()
+            etats.append(etat(self.partie))
+        return etats
+
+    def test_annuler_puis_refaire_tous_les_tours(self):
+        etats = self.jouer(NB_TOURS)
+        self.assertEqual(self.partie.journal.nb_coups, NB_TOURS)
+
+        for tour in range(NB_TOURS, 0, -1):
+            self.assertTrue(self.partie.annuler_coup())
+            self.assertEqual(etat(self.partie), etats[tour - 1], tour)
+        self.assertFalse(self.partie.annuler_coup())
+
+        for tour in range(1, NB_TOURS + 1):
+            self.assertTrue(self.partie.refaire_coup())
+            self.assertEqual(etat(self.partie), etats[tour], tour)
+        self.assertFalse(self.partie.refaire_coup())
+
+    def test_nouveau_coup_oublie_les_coups_annules(self):
+        etats = self.jouer(NB_TOURS)
+        self.partie.annuler_coup()
+        self.partie.annuler_coup()
+        self.partie.jouer_un_tour()
+        self.partie.joueur_suivant()
+        self.assertFalse(self.partie.refaire_coup())
+        self.assertTrue(self.partie.annuler_coup())
+        self.assertEqual(etat(self.partie), etats[-3])
+
+    def test_coups_refuses_sans_trace(self):
+        self.jouer(NB_TOURS)
+        avant = etat(self.partie)
+        joueur = self.partie.joueur_actif
+        position = next(p for p, jeton in enumerate(joueur.jetons) if jeton is not None)
+
+        nb_refuses = 0
+        for index in sorted(self.partie.plateau.ancres()):
+            joueur.moves = {position: Plateau.code_position(index)}
+            point = self.partie.journal.point_de_controle()
+            try:
+                self.partie.jouer_un_tour()
+            except MotAbsentError:
+                nb_refuses += 1
+            else:
+                self.partie.journal.abandonner(point)
+            self.assertEqual(etat(self.partie), avant, Plateau.code_position(index))
+
+        # Placement invalide: deux jetons éloignés
+        autre = next(p for p, jeton in enumerate(joueur.jetons) if jeton is not None and p != position)
+        joueur.moves = {position: 'A1', autre: 'O15'}
+        with self.assertRaises(PositionPlateauError):
+            self.partie.jouer_un_tour()
+        self.assertEqual(etat(self.partie), avant)
+        self.assertGreater(nb_refuses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
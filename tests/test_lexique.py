@@ -0,0 +1,77 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from tp4.error import ScrabbleSystemError
+from tp4.lexique import Lexique
+
+MOTS = ['ARBRE', 'ARBRES', 'BAR', 'BARRE', 'RABE']
+
+
+class TestCacheLexique(unittest.TestCase):
+
+    def setUp(self):
+        self.repertoire = tempfile.mkdtemp()
+        self.source = os.path.join(self.repertoire, 'mots.txt')
+        self.cache = os.path.join(self.repertoire, 'mots' + Lexique.EXTENSION_CACHE)
+        with open(self.source, 'w') as f:
+            f.write('\n'.join(MOTS))
+
+    def tearDown(self):
+        shutil.rmtree(self.repertoire)
+
+    def date_cache(self):
+        with open(self.cache, 'rb') as f:
+            entete = f.read(struct.calcsize('<6sHBQQ'))
+        return struct.unpack_from('<Q', entete, struct.calcsize('<6sHBQ'))[0]
+
+    def test_cache_compile_puis_relu(self):
+        self.assertEqual(sorted(Lexique.charger(self.source)), MOTS)
+        self.assertTrue(os.path.exists(self.cache))
+        self.assertEqual(self.date_cache(), os.stat(self.source).st_mtime_ns)
+        self.assertEqual(sorted(Lexique.charger(self.source)), MOTS)
+
+    def test_date_modifiee_contenu_identique(self):
+        Lexique.charger(self.source)
+        inode = os.stat(self.cache).st_ino
+        os.utime(self.source, ns=(0, os.stat(self.source).st_mtime_ns + 10 ** 9))
+
+        # Le cache est relu (une recompilation le remplacerait par un nouveau fichier) et porte la nouvelle date
+        self.assertEqual(sorted(Lexique.charger(self.source)), MOTS)
+        self.assertEqual(os.stat(self.cache).st_ino, inode)
+        self.assertEqual(self.date_cache(), os.stat(self.source).st_mtime_ns)
+
+    def test_contenu_modifie(self):
+        Lexique.charger(self.source)
+        with open(self.source, 'w') as f:
+            f.write('\n'.join(MOTS[:-1] + ['RAVE']))
+        self.assertEqual(sorted(Lexique.charger(self.source)), ['ARBRE', 'ARBRES', 'BAR', 'BARRE', 'RAVE'])
+
+
+class TestChercher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        repertoire = tempfile.mkdtemp()
+        try:
+            source = os.path.join(repertoire, 'mots.txt')
+            with open(source, 'w') as f:
+                f.write('\n'.join(MOTS))
+            cls.lexique = Lexique.charger(source)
+        finally:
+            shutil.rmtree(repertoire)
+
+    def test_minuscules(self):
+        self.assertEqual(self.lexique.chercher('?A', contient='r', longueur=range(3, 6)), ['BAR', 'BARRE', 'RABE'])
+        self.assertEqual(self.lexique.chercher('ar???', disponibles='ber'), ['ARBRE'])
+
+    def test_lettres_invalides(self):
+        for parametres in ({'motif': '?É'}, {'motif': 'A1'}, {'motif': '?', 'contient': 'é'},
+                           {'motif': '?', 'disponibles': 'A-'}):
+            with self.assertRaises(ScrabbleSystemError):
+                self.lexique.chercher(**parametres)
+
+
+if __name__ == '__main__':
+    unittest.main()
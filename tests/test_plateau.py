@@ -0,0 +1,79 @@
+import io
+import pickle
+import unittest
+from unittest import mock
+import tp4.plateau
+from tp4.joueur import Joueur
+from tp4.plateau import Plateau, Jeton
+from tp4.scrabble import Scrabble
+
+
+class JetonAncien:
+    """
+    Jeton tel qu'il était avant le partage des jetons: un objet ordinaire, sauvegardé avec ses attributs.
+    """
+
+    def __init__(self, lettre, valeur):
+        self.lettre = lettre
+        self.valeur = valeur
+
+
+def sauvegarde(plateau, joueurs, jetons_libres):
+    # Mêmes éléments que Scrabble.sauvegarder_partie
+    return pickle.dumps([plateau, joueurs, joueurs[0], len(joueurs), 'FR', jetons_libres, 42.0])
+
+
+class TestJeton(unittest.TestCase):
+
+    def test_jetons_partages(self):
+        self.assertIs(Jeton('E', 1), Jeton('E', 1))
+        self.assertIsNot(Jeton('E', 1), Jeton('E', 2))
+
+    def test_arguments_requis(self):
+        with self.assertRaises(TypeError):
+            Jeton()
+        with self.assertRaises(TypeError):
+            Jeton('E')
+
+    def test_jeton_immuable(self):
+        jeton = Jeton('E', 1)
+        with self.assertRaises(AttributeError):
+            jeton.valeur = 3
+        with self.assertRaises(AttributeError):
+            del jeton.lettre
+        self.assertEqual((jeton.lettre, jeton.valeur), ('E', 1))
+
+    def test_sauvegarde(self):
+        plateau, joueur = Plateau(), Joueur("Test")
+        plateau.ajouter_jeton(Jeton('E', 1), 'H8')
+        joueur.ajouter_jeton(Jeton('S', 1), 0)
+
+        liste = Scrabble.lire_sauvegarde(io.BytesIO(sauvegarde(plateau, [joueur], [Jeton('Z', 10)])))
+        self.assertIs(liste[0].jeton(Plateau.index_position('H8')), Jeton('E', 1))
+        self.assertIs(liste[1][0].jetons[0], Jeton('S', 1))
+        self.assertIs(liste[5][0], Jeton('Z', 10))
+
+    def test_ancienne_sauvegarde(self):
+        # Les jetons sont sauvegardés comme avant le partage: créés sans argument, puis remplis avec leurs attributs
+        with mock.patch.object(tp4.plateau, 'Jeton', JetonAncien):
+            JetonAncien.__module__, JetonAncien.__qualname__ = 'tp4.plateau', 'Jeton'
+            try:
+                plateau, joueur = Plateau(), Joueur("Test")
+                plateau.ajouter_jeton(JetonAncien('E', 1), 'H8')
+                joueur.ajouter_jeton(JetonAncien('S', 1), 0)
+                donnees = sauvegarde(plateau, [joueur], [JetonAncien('Z', 10), JetonAncien('Z', 10)])
+            finally:
+                JetonAncien.__module__, JetonAncien.__qualname__ = __name__, 'JetonAncien'
+
+        liste = Scrabble.lire_sauvegarde(io.BytesIO(donnees))
+        plateau = liste[0]
+        self.assertIs(plateau.jeton(Plateau.index_position('H8')), Jeton('E', 1))
+        self.assertEqual(plateau.lettres[Plateau.index_position('H8')], ord('E'))
+        self.assertIs(liste[1][0].jetons[0], Jeton('S', 1))
+        self.assertIs(liste[2], liste[1][0])
+        self.assertEqual(liste[5], [Jeton('Z', 10), Jeton('Z', 10)])
+        self.assertIs(liste[5][0], Jeton('Z', 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
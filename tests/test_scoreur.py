@@ -0,0 +1,56 @@
+import random
+import unittest
+from tp4.generateur import GenerateurCoups
+from tp4.lexique import RegistreLexiques
+from tp4.plateau import Plateau, Jeton
+from tp4.scoreur import ScoreurLot
+from tp4.tests.outils import plateau_aleatoire
+
+
+class TestScoreurLot(unittest.TestCase):
+
+    def test_scores_des_coups_generes(self):
+        generateur = GenerateurCoups(RegistreLexiques.obtenir('FR'))
+        for graine, nb_coups in [(0, 0), (1, 3), (2, 8), (3, 14)]:
+            with self.subTest(graine=graine, nb_coups=nb_coups):
+                plateau, joueur, _ = plateau_aleatoire('FR', graine, nb_coups)
+                coups = generateur.generer(plateau, joueur)
+                placements = [([joueur.jetons[position] for position in coup.positions_chevalet], coup.index_plateau)
+                              for coup in coups]
+                self.assertEqual(ScoreurLot(plateau).scores(placements), [coup.score for coup in coups])
+
+    def test_scores_de_placements_aleatoires(self):
+        # Plateaux quelconques (les mots n'ont pas à exister): tous les placements valides sont comparés
+        aleatoire = random.Random(2)
+        n = Plateau.DIMENSION
+        for _ in range(200):
+            plateau = Plateau()
+            for _ in range(aleatoire.randint(0, 80)):
+                index = aleatoire.randrange(n * n)
+                if plateau.case_est_vide_index(index):
+                    plateau.ajouter_jeton_index(Jeton(chr(65 + aleatoire.randrange(26)), aleatoire.randint(1, 10)),
+                                                index)
+
+            placements = []
+            for _ in range(30):
+                rangee, colonnes = aleatoire.randrange(n), aleatoire.sample(range(n), aleatoire.randint(1, 7))
+                index_cases = [rangee * n + c for c in colonnes] if aleatoire.random() < 0.5 else \
+                    [c * n + rangee for c in colonnes]
+                if plateau.valider_index_avant_ajout(index_cases):
+                    placements.append(([Jeton(chr(65 + aleatoire.randrange(26)), aleatoire.randint(1, 10))
+                                        for _ in index_cases], index_cases))
+
+            scoreur = ScoreurLot(plateau)
+            self.assertTrue(scoreur.a_jour(plateau))
+            self.assertEqual(scoreur.scores(placements),
+                             [plateau.evaluer_coup_index(*placement)[2] for placement in placements])
+
+    def test_a_jour(self):
+        plateau = Plateau()
+        scoreur = ScoreurLot(plateau)
+        plateau.ajouter_jeton_index(Jeton('A', 1), Plateau.index_position('H8'))
+        self.assertFalse(scoreur.a_jour(plateau))
+
+
+if __name__ == '__main__':
+    unittest.main()
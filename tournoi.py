@@ -0,0 +1,145 @@
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from tp4.joueur_ia import JoueurIA, Strategie, StrategieReste, StrategieSimulation, jetons_inconnus
+from tp4.lexique import RegistreLexiques
+from tp4.scrabble import Scrabble
+
+STRATEGIES = {'score': Strategie, 'reste': StrategieReste, 'simulation': StrategieSimulation}
+
+
+class ResultatPartie:
+    """
+    Résultat d'une partie jouée par jouer_partie.
+
+    Les attributs d'un résultat sont:
+    - scores: int list, le score final de chaque joueur, dans l'ordre des stratégies de la partie.
+    - latences: float list, la durée en secondes de chaque génération de coups de la partie, sauf celles dont les coups
+        ont été lus dans le cache (voir CacheCoups), qui ne durent presque rien et fausseraient les percentiles.
+    - nb_coups: int, le nombre de tours joués (passes comprises).
+    - nb_succes_cache: int, le nombre de tours dont les coups ont été lus dans le cache.
+    """
+
+    def __init__(self, scores, latences, nb_coups, nb_succes_cache=0):
+        self.scores = scores
+        self.latences = latences
+        self.nb_coups = nb_coups
+        self.nb_succes_cache = nb_succes_cache
+
+
+def jouer_partie(langue, strategies, delai, graine=None):
+    """
+    Joue une partie complète entre des JoueurIA, sans interface, sans horloge et sans fil d'exécution: chaque joueur
+        choisit son coup à son tour, puis le coup est joué comme par le bouton "Terminer le tour". La partie se termine
+        selon Scrabble.partie_terminee, ou quand tous les joueurs passent leur tour de suite.
+    :param langue: str, FR ou EN.
+    :param strategies: str list, le nom de la stratégie de chaque joueur (voir STRATEGIES).
+    :param delai: float, le nombre maximal de secondes de réflexion par tour.
+    :param graine: (int, optionnel) la graine du hasard de la partie (tirages et premier joueur).
+    :return: ResultatPartie, le résultat de la partie.
+    """
+    if graine is not None:
+        random.seed(graine)
+
+    joueurs = [JoueurIA("{} {}".format(nom, i + 1), STRATEGIES[nom](), delai) for i, nom in enumerate(strategies)]
+    partie = Scrabble(None, interactif=False)
+    partie.initialiser_jeu(len(joueurs), langue, joueurs=joueurs)
+    lexique = RegistreLexiques.obtenir(langue)
+
+    latences, nb_coups, nb_passes, nb_succes_cache = [], 0, 0, 0
+    try:
+        while not partie.partie_terminee() and nb_passes < len(joueurs):
+            joueur = partie.joueur_actif
+            joueur.choisir_coup(partie.plateau, lexique, jetons_inconnus(partie, joueur), delai, langue=langue)
+            if joueur.generation_en_cache:
+                nb_succes_cache += 1
+            else:
+                latences.append(joueur.duree_generation)
+            nb_passes = 0 if joueur.moves else nb_passes + 1
+            nb_coups += 1
+
+            partie.jouer_un_tour()
+            partie.joueur_suivant()
+    finally:
+        partie.liberer_ressources()
+
+    return ResultatPartie([joueur.points for joueur in joueurs], latences, nb_coups, nb_succes_cache)
+
+
+def _jouer_lot(langue, strategies, delai, graines):
+    return [jouer_partie(langue, strategies, delai, graine) for graine in graines]
+
+
+def percentile(valeurs_triees, rang):
+    """
+    :param valeurs_triees: float list, des valeurs en ordre croissant (non vide).
+    :param rang: float, le rang du percentile, entre 0 et 100.
+    :return: float, la plus petite valeur supérieure ou égale à rang % des valeurs.
+    """
+    index = max(0, -(-len(valeurs_triees) * rang // 100) - 1)
+    return valeurs_triees[int(index)]
+
+
+def tournoi(langue, strategies, nb_parties, delai, nb_processus=1, graine=0):
+    """
+    Joue nb_parties parties et affiche le débit, le score moyen de chaque stratégie et les percentiles de la latence
+        de génération des coups (hors coups lus dans le cache, comptés à part).
+    :param langue: str, FR ou EN.
+    :param strategies: str list, le nom de la stratégie de chaque joueur (voir STRATEGIES).
+    :param nb_parties: int, le nombre de parties.
+    :param delai: float, le nombre maximal de secondes de réflexion par tour.
+    :param nb_processus: (int, optionnel) le nombre de processus jouant des parties en parallèle.
+    :param graine: (int, optionnel) la graine de la première partie (les suivantes en découlent).
+    :return: ResultatPartie list, le résultat de chaque partie.
+    """
+    # Le lexique est chargé avant de démarrer le chrono (et, par fork, hérité des processus de travail)
+    RegistreLexiques.obtenir(langue)
+    graines = list(range(graine, graine + nb_parties))
+
+    debut = perf_counter()
+    if nb_processus == 1:
+        resultats = _jouer_lot(langue, strategies, delai, graines)
+    else:
+        with ProcessPoolExecutor(nb_processus) as executeur:
+            lots = [executeur.submit(_jouer_lot, langue, strategies, delai, graines[i::nb_processus])
+                    for i in range(nb_processus)]
+            resultats = [resultat for lot in lots for resultat in lot.result()]
+    duree = perf_counter() - debut
+
+    print("{} parties en {:.1f} s: {:.2f} parties/s, {:.1f} coups/s".format(
+        len(resultats), duree, len(resultats) / duree, sum(resultat.nb_coups for resultat in resultats) / duree))
+
+    for i, nom in enumerate(strategies):
+        scores = [resultat.scores[i] for resultat in resultats]
+        victoires = sum(1 for resultat in resultats if resultat.scores[i] == max(resultat.scores))
+        print("Joueur {} ({}): score moyen {:.1f}, {} victoires (égalités comprises)".format(
+            i + 1, nom, sum(scores) / len(scores), victoires))
+
+    latences = sorted(latence for resultat in resultats for latence in resultat.latences)
+    if latences:
+        print("Latence de génération (ms): p50 {:.1f}, p90 {:.1f}, p99 {:.1f}, max {:.1f}".format(
+            *(percentile(latences, rang) * 1000 for rang in (50, 90, 99, 100))))
+    nb_succes_cache = sum(resultat.nb_succes_cache for resultat in resultats)
+    print("{} générations mesurées, {} tours servis par le cache des coups (exclus des percentiles)".format(
+        len(latences), nb_succes_cache))
+    return resultats
+
+
+if __name__ == '__main__':
+    # Tournoi sans interface: python -m tp4.tournoi -n 1000 -s score reste
+    analyseur = argparse.ArgumentParser(description="Fait jouer l'ordinateur contre lui-même, sans interface.")
+    analyseur.add_argument('-l', '--langue', default='FR', choices=['FR', 'EN'], type=str.upper)
+    analyseur.add_argument('-n', '--parties', default=100, type=int, help="nombre de parties")
+    analyseur.add_argument('-s', '--strategies', default=['score', 'reste'], nargs='+', choices=sorted(STRATEGIES),
+                           help="stratégie de chaque joueur (2 à 4 joueurs)")
+    analyseur.add_argument('-d', '--delai', default=1.0, type=float, help="secondes de réflexion maximales par tour")
+    analyseur.add_argument('-p', '--processus', default=1, type=int, help="parties jouées en parallèle (0: un par coeur)")
+    analyseur.add_argument('-g', '--graine', default=0, type=int, help="graine de la première partie")
+    arguments = analyseur.parse_args()
+
+    if not 2 <= len(arguments.strategies) <= 4:
+        analyseur.error("il faut entre 2 et 4 joueurs")
+    tournoi(arguments.langue, arguments.strategies, arguments.parties, arguments.delai,
+            arguments.processus or os.cpu_count() or 1, arguments.graine)
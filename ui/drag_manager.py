@@ -80,6 +80,9 @@ class DragManager:
             - Compenser un déplacement invalide
                 Si la cible du dépôt n'est pas l'une des 2 situation précédente, on retourne le jeton à son origine
 
+        Quand les déplacements du tour changent, l'évènement <<ApercuCoup>> est envoyé pour afficher l'aperçu du coup
+            (mots formés et score, évalués sans modifier le plateau).
+
         :param event: évènement généré par tkinter
         :return: rien
         """
@@ -94,6 +97,7 @@ class DragManager:
             self.__canvas.move_lettre(self.__items[1], x, y)
 
             self.__moves.update({self.__index_jeton: Plateau.encode_position(x, y)})
+            self.__canvas.master.event_generate('<<ApercuCoup>>', when='tail')
 
             return
 
@@ -116,6 +120,7 @@ class DragManager:
 
             if self.__index_jeton in self.__moves.keys():
                 self.__moves.pop(self.__index_jeton)
+                self.__canvas.master.event_generate('<<ApercuCoup>>', when='tail')
 
             return
 
@@ -4,6 +4,8 @@ from tp4.scrabble import Scrabble, Timer
 from tp4.error import *
 from tp4.plateau import Plateau
 from tp4.joueur import Joueur
+from tp4.joueur_ia import JoueurIA
+from tp4.lexique import RegistreLexiques
 from tkinter import *
 from tp4.ui.theme_manager import Theme
 
@@ -38,6 +40,23 @@ class ScrabbleActions(ScrabbleComponent):
         # référence aux id d'objets
         self.__button_next_turn = None
         self.__label_next_turn = None
+        self.__button_suggestion = None
+        self.__label_suggestion = None
+
+        # Un joueur contrôlé par l'ordinateur termine son tour comme s'il avait cliqué sur le bouton
+        self.__canvas.master.bind('<<TourOrdinateur>>', self.jouer_tour_ordinateur)
+
+        # Suggestions: demandées par le bouton ou le menu, publiées depuis le fil de recherche
+        self.__canvas.master.bind('<<SuggererCoup>>', self.suggerer_coup)
+        self.__canvas.master.bind('<<Suggestion>>', self.afficher_suggestion)
+
+        # Aperçu du coup en cours, à chaque jeton déposé (voir DragManager)
+        self.__canvas.master.bind('<<ApercuCoup>>', self.afficher_apercu)
+
+        # Annuler et refaire un coup, faire jouer l'ordinateur ensuite: demandés par le menu
+        self.__canvas.master.bind('<<AnnulerCoup>>', self.annuler_coup)
+        self.__canvas.master.bind('<<RefaireCoup>>', self.refaire_coup)
+        self.__canvas.master.bind('<<ReprendrePartie>>', self.reprendre_partie)
 
     def jouer_un_tour(self, event=None):
         """
@@ -62,13 +81,17 @@ class ScrabbleActions(ScrabbleComponent):
                     gagnant.points,
                     *divmod(int(gagnant.temps_jeu_total), 60)))
 
-                # Supression du bouton, puisqu'il n'y a plus de tour à jouer
-                self.__canvas.delete(self.__button_next_turn, self.__label_next_turn)
+                # Supression des boutons, puisqu'il n'y a plus de tour à jouer
+                self.__canvas.delete(self.__button_next_turn, self.__label_next_turn,
+                                     self.__button_suggestion, self.__label_suggestion)
                 self.__button_next_turn = None
                 self.__label_next_turn = None
+                self.__button_suggestion = None
+                self.__label_suggestion = None
 
                 # Supression du joueur actif (partie terminé, utilisé par plusieurs composantes pour ne plus se dessiner
                 Scrabble.instance.joueur_actif = None
+                Scrabble.instance.liberer_ressources()
             else:
                 # Si la partie n'est pas terminer, on change de joueur, et on redessine l'écran
                 Scrabble.instance.joueur_suivant()
@@ -79,6 +102,135 @@ class ScrabbleActions(ScrabbleComponent):
             # Si une erreur est détecté, on la communique à l'usager pour qu'il corrige son tour.
             ScrabbleMessages.ui.message(message=e.message)
 
+    def annuler_coup(self, event=None):
+        """
+        Actions du menu "Annuler le coup": annule le dernier tour joué (voir Scrabble.annuler_coup) et redessine l'écran
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        self.__changer_de_coup(Scrabble.instance.annuler_coup, "Aucun coup à annuler.")
+
+    def refaire_coup(self, event=None):
+        """
+        Actions du menu "Refaire le coup": rejoue le dernier tour annulé (voir Scrabble.refaire_coup) et redessine
+            l'écran
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        self.__changer_de_coup(Scrabble.instance.refaire_coup, "Aucun coup à refaire.")
+
+    def __changer_de_coup(self, changement, message_aucun_coup):
+        # Rien à annuler ni à refaire une fois la partie terminée
+        if Scrabble.instance.joueur_actif is None:
+            return
+
+        if not changement():
+            ScrabbleMessages.ui.message(message=message_aucun_coup)
+            return
+
+        # Le joueur actif a changé: son chrono repart à zéro, mais l'ordinateur attend qu'on le fasse jouer
+        Timer.reset()
+        joueur = Scrabble.instance.joueur_actif
+        if isinstance(joueur, JoueurIA):
+            ScrabbleMessages.ui.message(message="Au tour de {} (Partie > Faire jouer l'ordinateur)".format(joueur.nom))
+        else:
+            ScrabbleMessages.ui.message(message="Au tour de {}".format(joueur.nom))
+        self.__canvas.master.dessiner()
+
+    def reprendre_partie(self, event=None):
+        """
+        Actions du menu "Faire jouer l'ordinateur": le joueur actif, s'il est contrôlé par l'ordinateur, choisit son
+            coup en arrière-plan puis termine son tour (voir Scrabble.reprendre_partie)
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        if Scrabble.instance.joueur_actif is None:
+            return
+
+        if Scrabble.instance.reprendre_partie():
+            ScrabbleMessages.ui.message(message="{} réfléchit...".format(Scrabble.instance.joueur_actif.nom))
+        else:
+            ScrabbleMessages.ui.message(message="Le joueur actif n'est pas contrôlé par l'ordinateur.")
+
+    def suggerer_coup(self, event=None):
+        """
+        Actions du bouton "Suggestion": démarre la recherche d'un coup pour le joueur actif, sans bloquer l'affichage
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        if Scrabble.instance.joueur_actif is None or isinstance(Scrabble.instance.joueur_actif, JoueurIA):
+            return
+
+        ScrabbleMessages.ui.message(message="Recherche d'une suggestion...")
+
+        # Appelé depuis le fil de recherche: l'affichage est fait par le fil de tkinter, via l'évènement <<Suggestion>>
+        def publier(conseiller):
+            self.__canvas.master.event_generate('<<Suggestion>>', when='tail')
+
+        Scrabble.instance.suggerer_coup(publier)
+
+    def jouer_tour_ordinateur(self, event=None):
+        """
+        Termine le tour d'un joueur contrôlé par l'ordinateur une fois son coup choisi, comme le bouton "Terminer le
+            tour"
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+
+        # Le tour a changé (fin du temps, coup annulé) depuis la fin de la réflexion: le coup choisi n'est plus valable
+        if not Scrabble.instance.reflexion_terminee():
+            return
+
+        self.jouer_un_tour()
+
+    def afficher_suggestion(self, event=None):
+        """
+        Affiche la meilleure suggestion connue (voir ScrabblePlateau pour sa mise en évidence sur le plateau)
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        conseiller = Scrabble.instance.conseiller
+
+        # La recherche a été annulée (changement de tour) depuis la publication
+        if conseiller is None or conseiller.est_annule:
+            return
+
+        if conseiller.erreur is not None:
+            ScrabbleMessages.ui.message(message=conseiller.erreur.message)
+        elif not conseiller.suggestions:
+            ScrabbleMessages.ui.message(message="Aucun coup possible, passez votre tour.")
+        else:
+            coup = conseiller.suggestions[0]
+            ScrabbleMessages.ui.message(message="Suggestion: {} ({} points)".format(", ".join(coup.mots), coup.score))
+        self.__canvas.master.dessiner()
+
+    def afficher_apercu(self, event=None):
+        """
+        Affiche les mots formés et le score du coup en cours de placement, évalués sans modifier le plateau (voir
+            Plateau.evaluer_coup). Les mots absents du dictionnaire sont signalés s'il est déjà chargé.
+        :param event: non utilisé, requis pour être bindé sur un évènement
+        :return: rien
+        """
+        joueur = Scrabble.instance.joueur_actif
+        if joueur is None or isinstance(joueur, JoueurIA):
+            return
+
+        if not joueur.moves:
+            ScrabbleMessages.ui.message(message="")
+            return
+
+        valide, mots, score = Scrabble.instance.plateau.evaluer_coup(joueur.jetons, joueur.moves)
+        if not valide:
+            ScrabbleMessages.ui.message(message="Placement invalide")
+            return
+
+        message = "Aperçu: {} ({} points)".format(", ".join(mots), score)
+        if RegistreLexiques.est_charge(Scrabble.instance.langue):
+            absents = [mot for mot in mots if not Scrabble.instance.mot_permis(mot)]
+            if absents:
+                message += "\nAbsent du dictionnaire: {}".format(", ".join(absents))
+        ScrabbleMessages.ui.message(message=message)
+
     def dessiner(self):
         """
         Permet de dessiner les boutons et d'y attacher leurs évènement
@@ -111,6 +263,22 @@ class ScrabbleActions(ScrabbleComponent):
                                   width=4)
         self.__canvas.itemconfig(self.__label_next_turn, fill=Theme.theme_actif.major)
 
+        # Bouton de suggestion, à gauche du bouton "Terminer le tour"
+        if self.__button_suggestion is None:
+            self.__button_suggestion = self.__canvas.add_rectangle(0, 0, fill=Theme.theme_actif.medium,
+                                                                   tags="actions")
+            self.__label_suggestion = self.__canvas.add_text(0, 0,
+                                                             font=('Times', '{}'.format(self.__canvas.unit_size // 2)),
+                                                             text="Suggestion")
+            self.__canvas.tag_bind(self.__button_suggestion, "<ButtonPress-1>", self.suggerer_coup)
+            self.__canvas.tag_bind(self.__label_suggestion, "<ButtonPress-1>", self.suggerer_coup)
+
+        self.__canvas.move_shape(self.__button_suggestion, Plateau.DIMENSION + 1, Plateau.DIMENSION - 1, width=3)
+        self.__canvas.itemconfig(self.__button_suggestion, fill=Theme.theme_actif.medium)
+
+        self.__canvas.move_lettre(self.__label_suggestion, Plateau.DIMENSION + 1, Plateau.DIMENSION - 1, width=3)
+        self.__canvas.itemconfig(self.__label_suggestion, fill=Theme.theme_actif.major)
+
 
 class ScrabbleMessages(ScrabbleComponent):
     """
@@ -179,6 +347,14 @@ class ScrabblePlateau(ScrabbleComponent):
         """
         plateau_case = Scrabble.instance.plateau.cases
 
+        # Jetons de la meilleure suggestion en cours, mis en évidence sur les cases vides
+        suggestion = {}
+        conseiller = Scrabble.instance.conseiller
+        if conseiller is not None and conseiller.suggestions:
+            coup = conseiller.suggestions[0]
+            suggestion = {Plateau.decode_position(position): lettre
+                          for lettre, position in zip(coup.lettres, coup.positions_plateau)}
+
         # Lazy-Loading des cases du plateau
         if self.__cases is None:
             self.__cases = []
@@ -202,7 +378,14 @@ class ScrabblePlateau(ScrabbleComponent):
                 self.__canvas.move_shape(self.__cases[i][j][0], i, j)
                 self.__canvas.move_lettre(self.__cases[i][j][1], i, j)
 
-                if plateau_case[i][j].est_vide():  # affichage d'une case 'vide'
+                if plateau_case[i][j].est_vide() and (i, j) in suggestion:  # affichage d'un jeton suggéré
+                    self.__canvas.itemconfigure(self.__cases[i][j][0],
+                                                fill=Theme.theme_actif.minor)
+                    self.__canvas.itemconfigure(self.__cases[i][j][1],
+                                                font=('Times', '{}'.format(self.__canvas.unit_size // 2)),
+                                                text=suggestion[(i, j)])
+
+                elif plateau_case[i][j].est_vide():  # affichage d'une case 'vide'
 
                     case_text = plateau_case[i][j].text_case
                     size = self.__canvas.unit_size // 4